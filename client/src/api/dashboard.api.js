@@ -19,4 +19,16 @@ const createInstance = () => {
 const api = createInstance();
 
 export const getDashboardOverview = () => api.get('/dashboard/overview/');
-export const getTaskTimeline = (taskId) => api.get(`/tasks/${taskId}/timeline/`);
+// The timeline is cursor-paginated ({ timeline, next }); follow `next` until
+// it is null so tasks with long histories are shown in full.
+export const getTaskTimeline = async (taskId) => {
+  let res = await api.get(`/tasks/${taskId}/timeline/`);
+  const timeline = [...(res.data.timeline || [])];
+  let cursor = res.data.next;
+  while (cursor) {
+    res = await api.get(`/tasks/${taskId}/timeline/`, { params: { cursor } });
+    timeline.push(...(res.data.timeline || []));
+    cursor = res.data.next;
+  }
+  return { ...res, data: { ...res.data, next: null, timeline } };
+};
@@ -61,7 +61,10 @@ const tasksApi = createApiInstance(`${URL}/api/v1/tasks`);
 const empleadosApi = createApiInstance(`${URL}/api/v1/empleados`);
 const eventosApi = createApiInstance(`${URL}/api/v1/tasks`);
 
-export const getAllTasks = () => tasksApi.get('/');
+// The tasks list is cursor-paginated ({ next, previous, results }). Fetch one
+// page at a time: pass the previous page's `next` (an absolute URL, which axios
+// uses as-is over baseURL) to load the following page on demand.
+export const getTasksPage = (next = null) => tasksApi.get(next || '/');
 export const getTask = id => tasksApi.get(`/${id}/`);
 export const createTask = task => tasksApi.post('/', task);
 // Create task with upload progress callback (for file uploads)
@@ -2,6 +2,13 @@ import PropTypes from 'prop-types';
 import { useNavigate } from 'react-router-dom';
 import LazyImage from './LazyImage';
 
+// Prefer the server-generated resized copy (WebP, then JPEG) over the original upload
+const variantUrl = (task, campo, variante = 'thumb') => {
+  const variantes = (task.foto_variantes || []).filter((v) => v.campo === campo && v.variante === variante);
+  const best = variantes.find((v) => v.formato === 'webp') || variantes[0];
+  return best ? best.url : task[campo];
+};
+
 const TaskCard = ({ task }) => {
   const navigate = useNavigate();
 
@@ -47,7 +54,7 @@ const TaskCard = ({ task }) => {
       <p className="text-gray-600 text-lg text-center mb-4">{task.description}</p>
       {task.foto_inicial && (
         <LazyImage
-          src={task.foto_inicial}
+          src={variantUrl(task, 'foto_inicial')}
           alt="Foto inicial"
           className="mb-4 rounded-lg shadow-md"
           width="350px"
@@ -66,7 +73,7 @@ const TaskCard = ({ task }) => {
       </p>
       {task.foto_final && (
         <LazyImage
-          src={task.foto_final}
+          src={variantUrl(task, 'foto_final')}
           alt="Foto final"
           className="rounded-lg shadow-md"
           width="350px"
@@ -86,6 +93,12 @@ TaskCard.propTypes = {
     description: PropTypes.string.isRequired,
     foto_inicial: PropTypes.string,
     foto_final: PropTypes.string,
+    foto_variantes: PropTypes.arrayOf(PropTypes.shape({
+      campo: PropTypes.string,
+      variante: PropTypes.string,
+      formato: PropTypes.string,
+      url: PropTypes.string,
+    })),
   fecha_resolucion: PropTypes.oneOfType([PropTypes.instanceOf(Date), PropTypes.string]),
   fecha_creacion: PropTypes.oneOfType([PropTypes.instanceOf(Date), PropTypes.string]),
   }).isRequired,
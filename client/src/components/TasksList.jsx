@@ -3,7 +3,7 @@ import TaskCard from './TaskCard.jsx';
 import { useReportes } from '../context/ReportesContext.jsx';
 
 const TasksList = () => {
-  const { tasks, fetchTasks } = useReportes();
+  const { tasks, tasksNext, loading, fetchTasks, fetchMoreTasks } = useReportes();
 
   useEffect(() => {
     fetchTasks();
@@ -16,6 +16,17 @@ const TasksList = () => {
       ) : (
         tasks.map((task) => <TaskCard key={task.id} task={task} />)
       )}
+      {tasksNext && (
+        <div className="w-full flex justify-center my-4">
+          <button
+            className="px-4 py-2 bg-white text-blue-900 rounded disabled:opacity-50"
+            disabled={loading}
+            onClick={() => fetchMoreTasks().catch(err => console.error('Error loading more tasks', err))}
+          >
+            {loading ? 'Cargando…' : 'Cargar más'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -14,21 +14,27 @@ export const ReportesProvider = ({ children }) => {
 	const start = () => dispatch({ type: actionTypes.START });
 	const fail = err => dispatch({ type: actionTypes.FAIL, payload: err });
 
+	// Normalize date fields to Date objects so UI can parse consistently
+	const normalizeTask = t => ({
+		...t,
+		fecha_creacion: t.fecha_creacion ? new Date(t.fecha_creacion) : t.fecha_creacion,
+		fecha_resolucion: t.fecha_resolucion ? new Date(t.fecha_resolucion) : t.fecha_resolucion,
+	});
+
+	// The list is cursor-paginated: fetchTasks loads the first page and
+	// fetchMoreTasks the next one while `tasksNext` is set.
+	const loadTasksPage = async next => {
+		const res = await tasksApi.getTasksPage(next);
+		const data = res.data || res;
+		const tasks = Array.isArray(data) ? data : (data && data.results) || [];
+		return { tasks: tasks.map(normalizeTask), next: Array.isArray(data) ? null : data.next };
+	};
+
 	const fetchTasks = useCallback(async () => {
 		start();
 		try {
-			const res = await tasksApi.getAllTasks();
-			// If the API returns { data: [...] }
-			let tasks = res.data || res;
-			// Normalize date fields to ISO strings so UI can parse consistently
-			if (Array.isArray(tasks)) {
-				tasks = tasks.map(t => ({
-					...t,
-					fecha_creacion: t.fecha_creacion ? new Date(t.fecha_creacion) : t.fecha_creacion,
-					fecha_resolucion: t.fecha_resolucion ? new Date(t.fecha_resolucion) : t.fecha_resolucion,
-				}));
-			}
-			dispatch({ type: actionTypes.SET_TASKS, payload: tasks });
+			const { tasks, next } = await loadTasksPage();
+			dispatch({ type: actionTypes.SET_TASKS, payload: tasks, next });
 			return tasks;
 		} catch (error) {
 			fail(error);
@@ -36,6 +42,19 @@ export const ReportesProvider = ({ children }) => {
 		}
 	}, []);
 
+	const fetchMoreTasks = useCallback(async () => {
+		if (!state.tasksNext) return [];
+		start();
+		try {
+			const { tasks, next } = await loadTasksPage(state.tasksNext);
+			dispatch({ type: actionTypes.APPEND_TASKS, payload: tasks, next });
+			return tasks;
+		} catch (error) {
+			fail(error);
+			throw error;
+		}
+	}, [state.tasksNext]);
+
 	const fetchTask = useCallback(async id => {
 		start();
 		try {
@@ -181,6 +200,7 @@ export const ReportesProvider = ({ children }) => {
 	const value = {
 		...state,
 		fetchTasks,
+		fetchMoreTasks,
 		fetchTask,
 		createTask,
 		updateTask,
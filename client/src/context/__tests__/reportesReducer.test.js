@@ -32,6 +32,15 @@ describe('reportesReducer', () => {
     expect(s4.tasks.find(t => t.id === 1)).toBeUndefined();
   });
 
+  it('should append task pages and track the next cursor', () => {
+    const s = reducer(initialState, { type: actionTypes.SET_TASKS, payload: [{ id: 1 }, { id: 2 }], next: '/?cursor=a' });
+    expect(s.tasksNext).toBe('/?cursor=a');
+
+    const s2 = reducer(s, { type: actionTypes.APPEND_TASKS, payload: [{ id: 2 }, { id: 3 }], next: null });
+    expect(s2.tasks.map(t => t.id)).toEqual([1, 2, 3]);
+    expect(s2.tasksNext).toBeNull();
+  });
+
   it('should set eventos and add/remove evento for task', () => {
     const taskId = 10;
     const eventos = [{ id: 100, text: 'e1' }];
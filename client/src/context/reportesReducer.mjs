@@ -1,6 +1,7 @@
 // ESM version for Vite / browser runtime
 const initialState = {
   tasks: [],
+  tasksNext: null, // cursor URL of the next tasks page, null when all are loaded
   currentTask: null,
   empleados: [],
   eventos: {},
@@ -12,6 +13,7 @@ const actionTypes = {
   START: 'START',
   FAIL: 'FAIL',
   SET_TASKS: 'SET_TASKS',
+  APPEND_TASKS: 'APPEND_TASKS',
   SET_CURRENT_TASK: 'SET_CURRENT_TASK',
   ADD_TASK: 'ADD_TASK',
   UPDATE_TASK: 'UPDATE_TASK',
@@ -30,7 +32,17 @@ function reducer(state = initialState, action) {
     case actionTypes.FAIL:
       return { ...state, loading: false, error: action.payload };
     case actionTypes.SET_TASKS:
-      return { ...state, loading: false, tasks: action.payload };
+      return { ...state, loading: false, tasks: action.payload, tasksNext: action.next || null };
+    case actionTypes.APPEND_TASKS: {
+      // a task created meanwhile may already be in the list
+      const seen = new Set(state.tasks.map(t => t.id));
+      return {
+        ...state,
+        loading: false,
+        tasks: [...state.tasks, ...action.payload.filter(t => !seen.has(t.id))],
+        tasksNext: action.next || null,
+      };
+    }
     case actionTypes.SET_CURRENT_TASK:
       return { ...state, loading: false, currentTask: action.payload };
     case actionTypes.ADD_TASK:
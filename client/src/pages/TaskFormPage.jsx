@@ -72,6 +72,7 @@ export function TaskFormPage() {
   const [coordLat, setCoordLat] = useState(null);
   const [coordLon, setCoordLon] = useState(null);
   const [coordNameInput, setCoordNameInput] = useState('');
+  const [coordNameDefault, setCoordNameDefault] = useState('');
   const [openEventosModal, setOpenEventosModal] = useState(false);
   const [loading, setLoading] = useState(false);
   const [uploadProgress, setUploadProgress] = useState(0);
@@ -178,9 +179,11 @@ export function TaskFormPage() {
       try {
         const defaultName = user && user.username ? `Ubicación de ${user.username}` : '';
         setCoordNameInput(defaultName);
+        setCoordNameDefault(defaultName);
       } catch (err) {
         console.debug('Error prefilling ubicacion nombre', err);
         setCoordNameInput('');
+        setCoordNameDefault('');
       }
 
       // open modal for user confirmation/editing
@@ -701,13 +704,19 @@ export function TaskFormPage() {
                 return;
               }
 
-              const payload = { lat: coordLat, lon: coordLon, nombre: coordNameInput.trim() };
+              // a name the user typed is kept; the prefilled one is replaced by the geocoded name
+              const payload = {
+                lat: coordLat,
+                lon: coordLon,
+                nombre: coordNameInput.trim(),
+                nombre_explicito: coordNameInput.trim() !== coordNameDefault.trim(),
+              };
               const resp = await api.post('/api/v1/ubicaciones/lookup/', payload);
 
               // Build a local preview object so the form shows coordinates immediately
               const localPreview = {
                 id: resp?.data?.id || (resp?.headers && resp.headers.location && resp.headers.location.split('/').filter(Boolean).pop()) || null,
-                nombre: coordNameInput.trim(),
+                nombre: resp?.data?.nombre || coordNameInput.trim(),
                 lat: coordLat,
                 lon: coordLon,
                 status: (resp && (resp.status === 201 || resp.status === 200)) ? 'ready' : 'pending',
@@ -723,25 +732,35 @@ export function TaskFormPage() {
               } else if (resp.status === 202) {
                 Swal.fire({ title: 'Ubicación en cola', text: 'Guardada. Mostrando coordenadas mientras procesamos el nombre refinado.', timer: 1400, showConfirmButton: false });
 
-                // If server returned an id, poll for status updates and replace the name when ready
+                // If server returned an id, long-poll until the refined name is ready
                 const returnedId = localPreview.id;
                 if (returnedId) {
-                  const poll = async (id, attempts = 0) => {
+                  // keep waiting until the deadline: each request may return after only ~2s
+                  // (no Redis pub/sub) and the geocode can queue behind the 1 req/s limit
+                  const deadline = Date.now() + 45000;
+                  const waitReady = async (id) => {
                     try {
-                      const r = await api.get(`/api/v1/ubicaciones/${id}/`);
-                      if (r && r.data && r.data.status === 'ready') {
+                      // the server holds the request open until the geocode finishes (or ~25s)
+                      const r = await api.get(`/api/v1/ubicaciones/${id}/wait/`);
+                      if (r && r.data && r.data.status !== 'pending' && r.data.status !== 'processing') {
                         const loc2 = r.data;
                         // update both preview and form title with the refined name
-                        setUbicacionDetail(prev => ({ ...(prev || {}), nombre: loc2.nombre, lat: loc2.lat, lon: loc2.lon, status: 'ready' }));
-                        setValue('title', loc2.nombre || coordNameInput || '');
-                        Swal.fire({ icon: 'success', title: 'Ubicación lista', timer: 900, showConfirmButton: false });
+                        setUbicacionDetail(prev => ({ ...(prev || {}), nombre: loc2.nombre, lat: loc2.lat, lon: loc2.lon, status: loc2.status }));
+                        if (loc2.status === 'ready') {
+                          setValue('title', loc2.nombre || coordNameInput || '');
+                          Swal.fire({ icon: 'success', title: 'Ubicación lista', timer: 900, showConfirmButton: false });
+                        }
                         return;
                       }
-                    } catch (e) { console.debug('poll error', e); }
-                    if (attempts < 15) setTimeout(() => poll(id, attempts + 1), 2000);
-                    else console.debug('Ubicación: polling timed out for id', id);
+                    } catch (e) {
+                      console.debug('wait error', e);
+                      if (Date.now() < deadline) setTimeout(() => waitReady(id), 2000);
+                      return;
+                    }
+                    if (Date.now() < deadline) waitReady(id);
+                    else console.debug('Ubicación: wait timed out for id', id);
                   };
-                  poll(returnedId);
+                  waitReady(returnedId);
                 }
               }
             } catch (err) {
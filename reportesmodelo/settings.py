@@ -267,3 +267,127 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 
+
+# --- Cache configuration ---
+# Shared cache for computed payloads (dashboard overview, ...). Use Redis when
+# DJANGO_CACHE_URL is set so invalidations reach every gunicorn worker; fall
+# back to the per-process local-memory cache for development and tests.
+DJANGO_CACHE_URL = os.getenv('DJANGO_CACHE_URL')
+if DJANGO_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': DJANGO_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds the dashboard overview may be served from cache. Writes invalidate
+# it immediately; the timeout only bounds the sliding "next 7 days" window.
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', '300'))
+
+# Seconds a task timeline snapshot may be served from cache; eventos and
+# compromisos invalidate their task's snapshot on write.
+TIMELINE_CACHE_TIMEOUT = int(os.getenv('TIMELINE_CACHE_TIMEOUT', '600'))
+
+# --- Reverse-geocode cache ---
+# Decimal places kept when rounding coordinates into a cache cell (4 ~ 11 m),
+# entry lifetime in seconds and maximum rows kept (least recently used first).
+GEOCODE_CACHE_PRECISION = int(os.getenv('GEOCODE_CACHE_PRECISION', '4'))
+GEOCODE_CACHE_TTL = int(os.getenv('GEOCODE_CACHE_TTL', str(30 * 24 * 3600)))
+GEOCODE_CACHE_MAX_ENTRIES = int(os.getenv('GEOCODE_CACHE_MAX_ENTRIES', '10000'))
+
+# --- Reverse geocoder ---
+# Backend used by reverse_geocode_and_update. Set GEOCODER_BACKEND to
+# 'tasks.geocoders.OfflineGeocoder' and GEOCODER_GAZETTEER to a JSON file to
+# resolve names locally (development/CI) without network access.
+GEOCODER_BACKEND = os.getenv('GEOCODER_BACKEND', 'tasks.geocoders.NominatimGeocoder')
+GEOCODER_GAZETTEER = os.getenv('GEOCODER_GAZETTEER')
+GEOCODER_USER_AGENT = os.getenv('GEOCODER_USER_AGENT', 'reportesmodelo/1.0 (+https://example.com)')
+# Nominatim usage policy: at most 1 request per second across all workers.
+GEOCODER_RATE_LIMIT = float(os.getenv('GEOCODER_RATE_LIMIT', '1'))
+GEOCODER_RATE_BURST = int(os.getenv('GEOCODER_RATE_BURST', '1'))
+
+# ubicacion_lookup reuses the name of a ready Ubicacion within this many
+# metres instead of scheduling a reverse-geocode job (0 disables reuse).
+UBICACION_REUSE_RADIUS_M = float(os.getenv('UBICACION_REUSE_RADIUS_M', '30'))
+
+# Seconds a scheduled/running reverse-geocode job holds its per-Ubicacion
+# lock; duplicate enqueue requests inside that window are dropped.
+GEOCODE_JOB_LOCK_TIMEOUT = int(os.getenv('GEOCODE_JOB_LOCK_TIMEOUT', '600'))
+
+# Pub/sub used to wake long-polling ubicacion requests when a geocode job
+# finishes. Redis reaches every process; the in-process backend only helps
+# when web and worker share a process (development, tests).
+PUBSUB_REDIS_URL = os.getenv('PUBSUB_REDIS_URL', DJANGO_CACHE_URL)
+PUBSUB_BACKEND = os.getenv(
+    'PUBSUB_BACKEND',
+    'tasks.pubsub.RedisPubSub' if PUBSUB_REDIS_URL else 'tasks.pubsub.InProcessPubSub',
+)
+# Longest a /ubicaciones/<pk>/wait/ request stays open (keep it below the
+# gunicorn/proxy timeouts). Each open wait holds a gunicorn thread (gthread
+# workers, see Procfile). Without a cross-process pub/sub (Redis) waits are
+# cut to UBICACION_WAIT_LOCAL_TIMEOUT, since worker publishes cannot arrive.
+UBICACION_WAIT_TIMEOUT = float(os.getenv('UBICACION_WAIT_TIMEOUT', '25'))
+UBICACION_WAIT_LOCAL_TIMEOUT = float(os.getenv('UBICACION_WAIT_LOCAL_TIMEOUT', '2'))
+
+# Batch ubicaciones endpoint: id limit per request, and Cache-Control
+# max-age (seconds) for responses whose rows are all ready.
+UBICACIONES_BATCH_MAX = int(os.getenv('UBICACIONES_BATCH_MAX', '500'))
+UBICACIONES_READY_MAX_AGE = int(os.getenv('UBICACIONES_READY_MAX_AGE', '86400'))
+
+# Task map (tasks/map/): cluster cells per 256px tile, zoom from which
+# individual tasks are returned instead of clusters, and their cap.
+TASK_MAP_CELLS_PER_TILE = int(os.getenv('TASK_MAP_CELLS_PER_TILE', '4'))
+TASK_MAP_DETAIL_ZOOM = int(os.getenv('TASK_MAP_DETAIL_ZOOM', '17'))
+TASK_MAP_MAX_POINTS = int(os.getenv('TASK_MAP_MAX_POINTS', '1000'))
+
+# Resized copies generated for each Task photo: name -> longest side in px.
+# Each size is written as WebP and JPEG at TASK_IMAGE_QUALITY.
+TASK_IMAGE_VARIANTS = {'thumb': 320, 'medium': 1024}
+TASK_IMAGE_QUALITY = int(os.getenv('TASK_IMAGE_QUALITY', '80'))
+
+# Resumable chunked photo uploads: where partial files live (must be shared
+# by every web process), the largest accepted file and chunk, in bytes.
+CHUNKED_UPLOAD_DIR = os.getenv('CHUNKED_UPLOAD_DIR', os.path.join(BASE_DIR, 'uploads_tmp'))
+CHUNKED_UPLOAD_MAX_SIZE = int(os.getenv('CHUNKED_UPLOAD_MAX_SIZE', str(50 * 1024 * 1024)))
+CHUNKED_UPLOAD_MAX_CHUNK = int(os.getenv('CHUNKED_UPLOAD_MAX_CHUNK', str(8 * 1024 * 1024)))
+
+# GPT generation: backend (tasks.llm.StubLLM answers offline) and default
+# model options; GPT jobs with the same prompt and options reuse the answer.
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'tasks.llm.OpenAIChatLLM')
+GPT_MODEL = os.getenv('GPT_MODEL', 'gpt-3.5-turbo')
+GPT_MAX_TOKENS = int(os.getenv('GPT_MAX_TOKENS', '150'))
+GPT_TEMPERATURE = float(os.getenv('GPT_TEMPERATURE', '0.7'))
+
+# Event notifications: WhatsApp sender (tasks.whatsapp.FakeWhatsApp keeps
+# messages in memory) and how many WhatsApp messages are sent in parallel.
+WHATSAPP_BACKEND = os.getenv('WHATSAPP_BACKEND', 'tasks.whatsapp.TwilioWhatsApp')
+NOTIFICATIONS_WHATSAPP_WORKERS = int(os.getenv('NOTIFICATIONS_WHATSAPP_WORKERS', '8'))
+# Digest mode: with NOTIFICATIONS_DIGEST_MINUTES > 0 evento notifications are
+# held per recipient and sent as one combined message once the oldest has
+# waited that long (flushed by the periodic job below); 0 sends immediately.
+NOTIFICATIONS_DIGEST_MINUTES = int(os.getenv('NOTIFICATIONS_DIGEST_MINUTES', '0'))
+NOTIFICATIONS_DIGEST_MAX_ATTEMPTS = int(os.getenv('NOTIFICATIONS_DIGEST_MAX_ATTEMPTS', '5'))
+# A recipient claimed for sending (NotificationDelivery 'pendiente') whose job
+# has not recorded an outcome after this many seconds may be sent by another.
+NOTIFICATIONS_DELIVERY_CLAIM_TIMEOUT = int(os.getenv('NOTIFICATIONS_DELIVERY_CLAIM_TIMEOUT', '600'))
+
+# Celery calls made by requests (evento notifications) are written to an
+# outbox table and published by the `relay` process (Procfile:
+# `manage.py relay_outbox --loop`), which polls every OUTBOX_RELAY_INTERVAL
+# seconds. Nothing is sent while that process is down.
+OUTBOX_RELAY_INTERVAL = float(os.getenv('OUTBOX_RELAY_INTERVAL', '1'))
+OUTBOX_RELAY_BATCH = int(os.getenv('OUTBOX_RELAY_BATCH', '100'))
+
+CELERY_BEAT_SCHEDULE = {
+    'flush-notification-digests': {
+        'task': 'tasks.tasks.flush_notification_digests',
+        'schedule': 60.0,
+    },
+}
@@ -0,0 +1,87 @@
+"""Incremental maintenance of the CampusStats rollup table.
+
+Each Task contributes +1 to `total`, to `abiertas` or `cerradas`, and to the
+column for its prioridad. On save we subtract the contribution of the values
+stored before the write and add the new one with F() expressions. The stored
+values are read under a row lock held until the save commits (see
+signals.load_task_stats_snapshot), so two concurrent saves of one task cannot
+both move the same old contribution. Writes that skip the model signals
+(QuerySet.update(), bulk_create()) are not counted; `rebuild_campus_stats`
+repairs that drift.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import CampusStats, Task
+
+SNAPSHOT_FIELDS = ('campus', 'done', 'prioridad')
+
+COUNTER_FIELDS = ('total', 'abiertas', 'cerradas', 'alta', 'media', 'baja')
+
+_PRIORIDAD_FIELDS = {'Alta': 'alta', 'Media': 'media', 'Baja': 'baja'}
+
+
+def task_snapshot(task):
+    """Return the (campus, done, prioridad) triple that drives the counters."""
+    return (task.campus, bool(task.done), task.prioridad)
+
+
+def _contribution(snapshot):
+    campus, done, prioridad = snapshot
+    fields = {'total': 1, 'cerradas' if done else 'abiertas': 1}
+    prioridad_field = _PRIORIDAD_FIELDS.get(prioridad)
+    if prioridad_field:
+        fields[prioridad_field] = 1
+    return campus, fields
+
+
+def _apply(per_campus):
+    per_campus = {
+        campus: {k: v for k, v in deltas.items() if v}
+        for campus, deltas in per_campus.items()
+    }
+    per_campus = {campus: deltas for campus, deltas in per_campus.items() if deltas}
+    if not per_campus:
+        return
+    campuses = sorted(per_campus)
+    with transaction.atomic():
+        for campus in campuses:
+            CampusStats.objects.get_or_create(campus=campus)
+        # lock every touched row in one query, in campus order, so concurrent
+        # moves A->B and B->A wait on each other instead of deadlocking
+        list(CampusStats.objects.select_for_update().filter(campus__in=campuses).order_by('campus'))
+        for campus in campuses:
+            CampusStats.objects.filter(campus=campus).update(
+                **{field: F(field) + delta for field, delta in per_campus[campus].items()}
+            )
+
+
+def apply_task_change(old=None, new=None):
+    """Move one task's contribution from snapshot `old` to snapshot `new`.
+
+    Pass old=None for a newly created task and new=None for a deleted one.
+    """
+    if old == new:
+        return
+    per_campus = {}
+    for snapshot, sign in ((old, -1), (new, 1)):
+        if snapshot is None:
+            continue
+        campus, fields = _contribution(snapshot)
+        deltas = per_campus.setdefault(campus, {})
+        for field, value in fields.items():
+            deltas[field] = deltas.get(field, 0) + sign * value
+    _apply(per_campus)
+
+
+def compute_campus_stats():
+    """Recompute the counters from Task in a single grouped query."""
+    rows = Task.objects.values('campus').annotate(
+        total=Count('id'),
+        abiertas=Count('id', filter=Q(done=False)),
+        cerradas=Count('id', filter=Q(done=True)),
+        alta=Count('id', filter=Q(prioridad='Alta')),
+        media=Count('id', filter=Q(prioridad='Media')),
+        baja=Count('id', filter=Q(prioridad='Baja')),
+    ).order_by('campus')
+    return {row.pop('campus'): row for row in rows}
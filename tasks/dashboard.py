@@ -0,0 +1,72 @@
+"""Supervisor dashboard payload, computed once and shared through the cache.
+
+The overview is identical for every supervisor, so it is built with a fixed
+number of queries and stored under a single cache key. Signal receivers in
+`tasks.signals` drop the entry whenever a Task, Evento, Compromiso or
+Participante (embedded in the recent eventos) changes;
+the timeout only exists so the "next 7 days" window keeps sliding.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .campus_stats import COUNTER_FIELDS
+from .eager_loading import eager_load
+from .models import CampusStats, Compromiso, Evento, Task
+from .serializer import EventoSerializer
+
+DASHBOARD_CACHE_KEY = 'tasks:dashboard_overview'
+
+
+def build_dashboard_overview():
+    now = timezone.now()
+    next_week = now + timedelta(days=7)
+
+    counts = Task.objects.aggregate(
+        total_tasks=Count('id'),
+        open_tasks=Count('id', filter=Q(done=False)),
+        closed_tasks=Count('id', filter=Q(done=True)),
+    )
+
+    upcoming_compromisos = [
+        {
+            'id': c['id'],
+            'tarea': c['tarea_id'],
+            'descripcion': c['descripcion'],
+            'fecha_compromiso': c['fecha_compromiso'],
+        }
+        for c in Compromiso.objects.filter(
+            fecha_compromiso__gte=now, fecha_compromiso__lte=next_week
+        ).order_by('fecha_compromiso').values('id', 'tarea_id', 'descripcion', 'fecha_compromiso')[:50]
+    ]
+
+    # read from the incrementally maintained rollup: one row per campus
+    por_campus = list(CampusStats.objects.values('campus', *COUNTER_FIELDS))
+
+    recent_eventos_qs = eager_load(Evento.objects.all(), EventoSerializer).order_by('-fecha')[:20]
+    recent_eventos = list(EventoSerializer(recent_eventos_qs, many=True).data)
+
+    return {
+        'total_tasks': counts['total_tasks'],
+        'open_tasks': counts['open_tasks'],
+        'closed_tasks': counts['closed_tasks'],
+        'upcoming_compromisos': upcoming_compromisos,
+        'recent_eventos': recent_eventos,
+        'por_campus': por_campus,
+    }
+
+
+def get_dashboard_overview():
+    payload = cache.get(DASHBOARD_CACHE_KEY)
+    if payload is None:
+        payload = build_dashboard_overview()
+        timeout = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300)
+        cache.set(DASHBOARD_CACHE_KEY, payload, timeout)
+    return payload
+
+
+def invalidate_dashboard_overview():
+    cache.delete(DASHBOARD_CACHE_KEY)
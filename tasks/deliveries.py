@@ -0,0 +1,132 @@
+"""Notification delivery log: idempotency and throughput metrics.
+
+Every email/WhatsApp send made for an Evento is a NotificationDelivery (one
+row per evento, channel and recipient). Senders `claim` their recipients
+before sending: the row is inserted as 'pendiente' and the unique constraint
+lets only one of several concurrent jobs win it; 'fallido' rows, and
+'pendiente' ones whose sender died more than NOTIFICATIONS_DELIVERY_CLAIM_TIMEOUT
+seconds ago, are taken over with a conditional UPDATE. Only claimed
+recipients are sent, so a retried or duplicated job sends just what is still
+missing, and `record` stores the outcome of the claimed rows in one bulk
+statement. `summary` aggregates the recent log per channel.
+"""
+import math
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import NotificationDelivery
+
+
+def _matching(keys):
+    match = Q()
+    for evento_id, canal, destino in keys:
+        match |= Q(evento_id=evento_id, canal=canal, destino=destino)
+    return match
+
+
+def sent_for(evento_ids):
+    """(evento_id, canal, destino) triples already delivered successfully."""
+    return set(
+        NotificationDelivery.objects.filter(evento_id__in=list(evento_ids), estado='enviado')
+        .values_list('evento_id', 'canal', 'destino')
+    )
+
+
+def claim(keys):
+    """Claim (evento_id, canal, destino) deliveries; return the claimed rows by key.
+
+    A key missing from the result was already sent, or another job is
+    sending it right now.
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+    token = uuid.uuid4()
+    now = timezone.now()
+    NotificationDelivery.objects.bulk_create(
+        [
+            NotificationDelivery(
+                evento_id=evento_id, canal=canal, destino=destino,
+                estado='pendiente', intentos=0, reclamo=token,
+            )
+            for evento_id, canal, destino in keys
+        ],
+        ignore_conflicts=True,
+    )
+    stale = now - timedelta(seconds=int(getattr(settings, 'NOTIFICATIONS_DELIVERY_CLAIM_TIMEOUT', 600)))
+    NotificationDelivery.objects.filter(_matching(keys)).filter(
+        Q(estado='fallido') | Q(estado='pendiente', actualizado_en__lt=stale)
+    ).update(estado='pendiente', reclamo=token, actualizado_en=now)
+    return {
+        (row.evento_id, row.canal, row.destino): row
+        for row in NotificationDelivery.objects.filter(_matching(keys), reclamo=token)
+    }
+
+
+def record(claimed, entries):
+    """Store the outcome of claimed deliveries; `entries` yields (evento_id, delivery dict).
+
+    Rows whose claim was taken over in the meantime are left to the new owner.
+    """
+    now = timezone.now()
+    rows = {}
+    for evento_id, delivery in entries:
+        key = (evento_id, delivery['canal'], delivery['destino'])
+        row = claimed.get(key)
+        if row is None:
+            continue
+        row.estado = 'enviado' if delivery['ok'] else 'fallido'
+        row.latencia_ms = delivery.get('latencia_ms')
+        row.actualizado_en = now
+        rows[key] = row
+    if not rows:
+        return []
+    tokens = {row.reclamo for row in rows.values()}
+    for row in rows.values():
+        row.intentos += 1
+        row.reclamo = None
+    NotificationDelivery.objects.filter(reclamo__in=tokens).bulk_update(
+        list(rows.values()), ['estado', 'intentos', 'latencia_ms', 'actualizado_en', 'reclamo'],
+    )
+    return list(rows.values())
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+def summary(minutes=60, now=None):
+    """Per-channel volume, throughput, p95 latency and failure rate for the last `minutes`."""
+    now = now or timezone.now()
+    rows = (
+        NotificationDelivery.objects.filter(
+            actualizado_en__gt=now - timedelta(minutes=minutes), estado__in=['enviado', 'fallido'],
+        )
+        .values_list('canal', 'estado', 'latencia_ms')
+    )
+    per_canal = {}
+    for canal, estado, latencia in rows:
+        data = per_canal.setdefault(canal, {'enviados': 0, 'fallidos': 0, 'latencias': []})
+        data['enviados' if estado == 'enviado' else 'fallidos'] += 1
+        if latencia is not None:
+            data['latencias'].append(latencia)
+
+    canales = {}
+    for canal, data in sorted(per_canal.items()):
+        total = data['enviados'] + data['fallidos']
+        canales[canal] = {
+            'total': total,
+            'enviados': data['enviados'],
+            'fallidos': data['fallidos'],
+            'por_minuto': round(total / minutes, 2),
+            'latencia_p95_ms': _percentile(data['latencias'], 95),
+            'tasa_fallo': round(data['fallidos'] / total, 4),
+        }
+    return {'minutos': minutes, 'canales': canales}
@@ -0,0 +1,153 @@
+"""Digest mode for Evento notifications.
+
+With NOTIFICATIONS_DIGEST_MINUTES > 0, `send_event_notifications` sends
+nothing itself: `queue_event` stores one NotificacionPendiente per recipient
+and channel. The periodic `flush_notification_digests` job then sends every
+recipient whose oldest pending row has waited the window one combined email
+or WhatsApp message covering all of their pending eventos. A failed send
+keeps the rows for the next flush, up to NOTIFICATIONS_DIGEST_MAX_ATTEMPTS.
+The pending rows are locked with SELECT ... FOR UPDATE SKIP LOCKED until the
+flush commits, so overlapping flushes never pick up the same rows.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from . import deliveries as delivery_log
+from .models import NotificacionPendiente
+from .notifications import NotificationDispatcher, _email_recipients, _task_link, _whatsapp_numbers
+
+logger = logging.getLogger(__name__)
+
+# Twilio rejects WhatsApp bodies longer than this
+WHATSAPP_MAX_CHARS = 1600
+
+
+def digest_minutes():
+    return int(getattr(settings, 'NOTIFICATIONS_DIGEST_MINUTES', 0))
+
+
+def digest_enabled():
+    return digest_minutes() > 0
+
+
+def queue_event(evento, report=None):
+    """Hold the notifications of an Evento for each recipient's digest."""
+    rows = [
+        NotificacionPendiente(canal='email', destino=destino, evento=evento, report=report)
+        for destino in dict.fromkeys(_email_recipients(evento))
+    ] + [
+        NotificacionPendiente(canal='whatsapp', destino=destino, evento=evento, report=report)
+        for destino in dict.fromkeys(_whatsapp_numbers(evento))
+    ]
+    # a redelivered Celery message must not queue the same evento twice
+    NotificacionPendiente.objects.bulk_create(rows, ignore_conflicts=True)
+    return {'digest': True, 'pendientes': len(rows)}
+
+
+def _items(rows):
+    return [
+        {
+            'evento': row.evento,
+            'tarea': row.evento.reporte,
+            'report': row.report,
+            'link': _task_link(row.evento.reporte),
+        }
+        for row in rows
+    ]
+
+
+def _email(dispatcher, destino, rows):
+    items = _items(rows)
+    tareas = {item['tarea'].id for item in items}
+    if len(tareas) == 1:
+        subject = f"Resumen de avances: {items[0]['tarea'].title} ({len(items)})"
+    else:
+        subject = f"Resumen de avances en {len(tareas)} tareas ({len(items)})"
+    context = {'items': items, 'site_url': getattr(settings, 'BACKEND_URL', '')}
+    text_body = render_to_string('tasks/email/digest_notification.txt', context)
+    return dispatcher.send_email(
+        subject, text_body, [destino], context=context,
+        template_html='tasks/email/digest_notification.html',
+    )
+
+
+def _whatsapp_body(rows):
+    lines = [f"Se registraron {len(rows)} avances:"]
+    for item in _items(rows):
+        lines.append(f"- {item['tarea'].title}: {item['evento'].descripcion[:120]}\n  {item['link']}")
+    body = '\n'.join(lines)
+    if len(body) > WHATSAPP_MAX_CHARS:
+        body = body[:WHATSAPP_MAX_CHARS - 1] + '…'
+    return body
+
+
+def flush(now=None):
+    """Send the digests whose window has elapsed; return a summary dict."""
+    with transaction.atomic():
+        now = now or timezone.now()
+        cutoff = now - timedelta(minutes=digest_minutes())
+
+        pending = {}
+        # rows another flush holds are left to it
+        rows = (
+            NotificacionPendiente.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('evento__reporte', 'report').order_by('creado_en', 'pk')
+        )
+        for row in rows:
+            pending.setdefault((row.canal, row.destino), []).append(row)
+        due = {key: group for key, group in pending.items() if group[0].creado_en <= cutoff}
+
+        # only the eventos claimed in the delivery log are sent; rows whose
+        # evento already reached this recipient (e.g. a flush that died before
+        # deleting them) are dropped, and those another job is sending wait
+        def delivery_key(row):
+            return (row.evento_id, row.canal, row.destino)
+
+        claimed = delivery_log.claim(delivery_key(row) for group in due.values() for row in group)
+        already_sent = delivery_log.sent_for({
+            row.evento_id for group in due.values() for row in group if delivery_key(row) not in claimed
+        })
+        sent, failed, log = [], [], []
+        for key in list(due):
+            sent.extend(row for row in due[key] if delivery_key(row) in already_sent)
+            due[key] = [row for row in due[key] if delivery_key(row) in claimed]
+            if not due[key]:
+                del due[key]
+
+        def outcome(delivery, group):
+            (sent if delivery['ok'] else failed).extend(group)
+            log.extend((row.evento_id, delivery) for row in group)
+
+        with NotificationDispatcher() as dispatcher:
+            for (canal, destino), group in due.items():
+                if canal == 'email':
+                    _email(dispatcher, destino, group)
+                    outcome(dispatcher.deliveries[-1], group)
+            messages = [(destino, _whatsapp_body(group)) for (canal, destino), group in due.items() if canal == 'whatsapp']
+            for delivery in dispatcher.send_whatsapp_messages(messages):
+                outcome(delivery, due[('whatsapp', delivery['destino'])])
+
+        delivery_log.record(claimed, log)
+        NotificacionPendiente.objects.filter(pk__in=[row.pk for row in sent]).delete()
+        max_attempts = int(getattr(settings, 'NOTIFICATIONS_DIGEST_MAX_ATTEMPTS', 5))
+        failed_ids = [row.pk for row in failed]
+        NotificacionPendiente.objects.filter(pk__in=failed_ids).update(intentos=F('intentos') + 1)
+        abandoned = NotificacionPendiente.objects.filter(pk__in=failed_ids, intentos__gte=max_attempts)
+        dropped = abandoned.count()
+        if dropped:
+            logger.error('Descartando %s notificaciones tras %s intentos fallidos', dropped, max_attempts)
+            abandoned.delete()
+
+        return {
+            'destinatarios': len(due),
+            'notificaciones': len(sent),
+            'fallidas': len(failed),
+            'descartadas': dropped,
+            'deliveries': dispatcher.deliveries,
+        }
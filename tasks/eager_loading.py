@@ -0,0 +1,94 @@
+"""Derive select_related/prefetch_related plans from DRF serializers.
+
+Serializers already declare which relations they render (nested serializers,
+many=True related fields), so instead of hand-maintaining a queryset per view
+we walk the serializer fields once, map each source to a model relation and
+build the eager-loading plan from that. Plans are cached per serializer class.
+"""
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+def _needs_related_object(field):
+    """Whether rendering `field` touches the related row (not just its pk)."""
+    if isinstance(field, serializers.BaseSerializer):
+        return True
+    if isinstance(field, RelatedField):
+        return not field.use_pk_only_optimization()
+    return False
+
+
+def _walk(serializer, model, prefix, select, prefetch, in_prefetch):
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+
+        if field.source == '*':
+            if isinstance(field, serializers.BaseSerializer):
+                _walk(field, model, prefix, select, prefetch, in_prefetch)
+            continue
+
+        attr = field.source.split('.')[0]
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            continue
+        if not model_field.is_relation or model_field.related_model is None:
+            continue
+
+        path = f'{prefix}{attr}'
+        if isinstance(field, serializers.ListSerializer):
+            child = field.child
+        elif isinstance(field, ManyRelatedField):
+            child = field.child_relation
+        else:
+            child = field
+
+        if model_field.many_to_many or model_field.one_to_many:
+            # any many-valued relation needs its own query; a plain pk list
+            # still reads the through table, so prefetch it as well
+            if path not in prefetch:
+                prefetch.append(path)
+            nested_in_prefetch = True
+        else:
+            forward_pk_only = model_field.concrete and not _needs_related_object(child)
+            if forward_pk_only:
+                # pk is read from the local <name>_id column; no join needed
+                continue
+            target = prefetch if in_prefetch else select
+            if path not in target:
+                target.append(path)
+            nested_in_prefetch = in_prefetch
+
+        if isinstance(child, serializers.BaseSerializer):
+            _walk(child, model_field.related_model, f'{path}__', select, prefetch, nested_in_prefetch)
+
+
+@lru_cache(maxsize=None)
+def eager_load_plan(serializer_class):
+    """Return (select_related, prefetch_related) tuples for serializer_class."""
+    serializer = serializer_class()
+    model = serializer.Meta.model
+    select, prefetch = [], []
+    _walk(serializer, model, '', select, prefetch, False)
+    return tuple(select), tuple(prefetch)
+
+
+def eager_load(queryset, serializer_class):
+    """Apply the eager-loading plan of serializer_class to queryset."""
+    select, prefetch = eager_load_plan(serializer_class)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+class EagerLoadingMixin:
+    """GenericAPIView mixin that eager-loads whatever the serializer renders."""
+
+    def get_queryset(self):
+        return eager_load(super().get_queryset(), self.get_serializer_class())
@@ -0,0 +1,69 @@
+"""Single entry point for registering an Evento on a Task.
+
+`ReportCreateView`, `EventoView` and `task_events` all create an Evento, its
+participantes, an automatic follow-up Compromiso and a notification job.
+`create_evento` does that inside one transaction with a fixed number of
+statements; the notification job is written to the outbox (tasks/outbox.py)
+in that same transaction, so the request never waits on the broker.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import outbox
+from .models import Compromiso, Empleado, Evento
+from .participantes import attach_participantes, resolve_participantes
+
+logger = logging.getLogger(__name__)
+
+COMPROMISO_DIAS = 7
+
+
+def empleado_for_user(user):
+    """Return the Empleado linked to `user`, or None."""
+    if user is None or not getattr(user, 'is_authenticated', False):
+        return None
+    return Empleado.objects.filter(user=user).first()
+
+
+def create_evento(*, task, empleado, descripcion, user=None, participantes=None,
+                  strict_participantes=False, report=None, compromiso_descripcion=None):
+    """Create an Evento with its participantes and automatic Compromiso.
+
+    - task / empleado: the Task the evento belongs to and its author.
+    - user: request user; its Empleado is recorded as the compromiso creator.
+    - participantes: raw inline payload (see `tasks.participantes`).
+    - strict_participantes: raise ParticipantesError for unknown participante
+      ids (nothing is created) instead of skipping them.
+    - report: optional Report the evento follows up; passed to notifications.
+    - compromiso_descripcion: overrides the default compromiso text.
+
+    Returns (evento, compromiso). The notification job is relayed to Celery
+    from the outbox after commit.
+    """
+    with transaction.atomic():
+        evento = Evento.objects.create(descripcion=descripcion, reporte=task, empleado=empleado)
+
+        participantes_instances = resolve_participantes(participantes, strict=strict_participantes)
+        attach_participantes(evento, participantes_instances)
+
+        if user is not None and empleado is not None and empleado.user_id == getattr(user, 'pk', None):
+            creado_por = empleado
+        else:
+            creado_por = empleado_for_user(user)
+
+        compromiso = Compromiso.objects.create(
+            tarea=task,
+            evento=evento,
+            descripcion=compromiso_descripcion or f"Compromiso automático tras registrar avance (evento {evento.id})",
+            fecha_compromiso=timezone.now() + timedelta(days=COMPROMISO_DIAS),
+            creado_por=creado_por,
+        )
+        attach_participantes(compromiso, participantes_instances)
+
+        outbox.enqueue('tasks.tasks.send_event_notifications', evento.id, report.id if report is not None else None)
+
+    logger.info(f"Evento {evento.id} y compromiso {compromiso.id} creados para tarea {task.id}")
+    return evento, compromiso
@@ -0,0 +1,117 @@
+"""Persistent cache of reverse-geocode results.
+
+Coordinates are rounded to GEOCODE_CACHE_PRECISION decimal places (4 places
+is a cell of roughly 11 m) and the rounded pair is the cache key, so repeated
+reports from the same building reuse one Nominatim answer. Hit/miss counters
+are GeocodeContador rows incremented with F(), so every web and worker
+process contributes to them whatever cache backend is configured.
+"""
+import logging
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import GeocodeCache, GeocodeContador, Ubicacion
+
+logger = logging.getLogger(__name__)
+
+HITS_KEY = 'geocode_cache:hits'
+MISSES_KEY = 'geocode_cache:misses'
+NOMBRE_MAX_LENGTH = Ubicacion._meta.get_field('nombre').max_length
+
+
+def _precision():
+    return int(getattr(settings, 'GEOCODE_CACHE_PRECISION', 4))
+
+
+def quantize(lat, lon, precision=None):
+    """Round lat/lon to the cache grid; return (celda, lat, lon)."""
+    precision = _precision() if precision is None else precision
+    step = Decimal(1).scaleb(-precision)
+    qlat = Decimal(str(lat)).quantize(step, rounding=ROUND_HALF_UP)
+    qlon = Decimal(str(lon)).quantize(step, rounding=ROUND_HALF_UP)
+    return f'{precision}:{qlat}:{qlon}', qlat, qlon
+
+
+def incr_counter(key):
+    """Add one to the shared GeocodeContador `key`."""
+    if not GeocodeContador.objects.filter(clave=key).update(valor=F('valor') + 1):
+        GeocodeContador.objects.get_or_create(clave=key)
+        GeocodeContador.objects.filter(clave=key).update(valor=F('valor') + 1)
+
+
+def read_counters(*keys):
+    """Return {key: value} for the given counters (0 when never incremented)."""
+    valores = dict(GeocodeContador.objects.filter(clave__in=keys).values_list('clave', 'valor'))
+    return {key: valores.get(key, 0) for key in keys}
+
+
+def lookup(lat, lon):
+    """Return the cached nombre for the cell containing lat/lon, or None."""
+    if lat is None or lon is None:
+        return None
+    celda, _, _ = quantize(lat, lon)
+    ttl = timedelta(seconds=int(getattr(settings, 'GEOCODE_CACHE_TTL', 30 * 24 * 3600)))
+    now = timezone.now()
+    entry = GeocodeCache.objects.filter(celda=celda, creado_en__gte=now - ttl).only('id', 'nombre').first()
+    if entry is None:
+        incr_counter(MISSES_KEY)
+        return None
+    GeocodeCache.objects.filter(pk=entry.pk).update(ultimo_uso=now, hits=F('hits') + 1)
+    incr_counter(HITS_KEY)
+    return entry.nombre
+
+
+def fit_nombre(nombre):
+    """Trim a geocoded name to what Ubicacion.nombre (and the cache) can hold."""
+    nombre = (nombre or '').strip()
+    if len(nombre) > NOMBRE_MAX_LENGTH:
+        nombre = nombre[:NOMBRE_MAX_LENGTH - 1].rstrip() + '…'
+    return nombre
+
+
+def store(lat, lon, nombre):
+    """Save nombre for the cell containing lat/lon and evict LRU overflow.
+
+    Return the name as stored (see `fit_nombre`); callers copy that into the
+    Ubicacion so the row and the cache always agree.
+    """
+    nombre = fit_nombre(nombre)
+    if lat is None or lon is None or not nombre:
+        return nombre
+    celda, qlat, qlon = quantize(lat, lon)
+    GeocodeCache.objects.update_or_create(
+        celda=celda,
+        defaults={
+            'lat': qlat,
+            'lon': qlon,
+            'nombre': nombre,
+            'creado_en': timezone.now(),
+            'ultimo_uso': timezone.now(),
+        },
+    )
+    _evict()
+    return nombre
+
+
+def _evict():
+    max_entries = int(getattr(settings, 'GEOCODE_CACHE_MAX_ENTRIES', 10000))
+    overflow = GeocodeCache.objects.order_by('-ultimo_uso').values_list('pk', flat=True)[max_entries:]
+    stale = list(overflow)
+    if stale:
+        GeocodeCache.objects.filter(pk__in=stale).delete()
+
+
+def stats():
+    counters = read_counters(HITS_KEY, MISSES_KEY)
+    hits, misses = counters[HITS_KEY], counters[MISSES_KEY]
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+        'entries': GeocodeCache.objects.count(),
+    }
@@ -0,0 +1,110 @@
+"""Deduplicated scheduling of reverse-geocode jobs.
+
+Every path that wants a Ubicacion geocoded (the post_save safety net,
+ubicacion_lookup, backfills) goes through enqueue_reverse_geocode(). A
+claim stored on the row (Ubicacion.geocode_bloqueado_hasta, taken with a
+conditional UPDATE) admits one job at a time across every web and worker
+process: it is taken when the job is scheduled, held while it runs (so the
+task's own saves do not schedule it again) and released when it reaches a
+final state; a crashed worker's claim expires after GEOCODE_JOB_LOCK_TIMEOUT.
+Requests that find the claim taken are counted as suppressed; the counters
+are shared GeocodeContador rows (see geocode_cache.incr_counter).
+"""
+from datetime import timedelta
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ENQUEUED_KEY = 'geocode:jobs:enqueued'
+SUPPRESSED_KEY = 'geocode:jobs:suppressed'
+SKIPPED_KEY = 'geocode:jobs:skipped'
+
+
+def _lock_timeout():
+    # must outlive queueing delay plus retries; a crashed worker frees it then
+    return int(getattr(settings, 'GEOCODE_JOB_LOCK_TIMEOUT', 600))
+
+
+def _incr(key):
+    from .geocode_cache import incr_counter
+
+    incr_counter(key)
+
+
+def _rows(ubicacion_id):
+    from .models import Ubicacion
+
+    return Ubicacion.objects.filter(pk=ubicacion_id)
+
+
+def acquire(ubicacion_id):
+    """Claim the job for ubicacion_id; False if a job already holds it."""
+    now = timezone.now()
+    claimed = _rows(ubicacion_id).filter(
+        Q(geocode_bloqueado_hasta__isnull=True) | Q(geocode_bloqueado_hasta__lte=now)
+    ).update(geocode_bloqueado_hasta=now + timedelta(seconds=_lock_timeout()))
+    return claimed == 1
+
+
+def hold(ubicacion_id):
+    """Take or renew the claim unconditionally (the running job owns it)."""
+    _rows(ubicacion_id).update(geocode_bloqueado_hasta=timezone.now() + timedelta(seconds=_lock_timeout()))
+
+
+def release(ubicacion_id):
+    _rows(ubicacion_id).update(geocode_bloqueado_hasta=None)
+
+
+def is_locked(ubicacion_id):
+    return _rows(ubicacion_id).filter(geocode_bloqueado_hasta__gt=timezone.now()).exists()
+
+
+def record_skipped():
+    """Count a job that found its Ubicacion already resolved."""
+    _incr(SKIPPED_KEY)
+
+
+def _dispatch(ubicacion_id):
+    from .tasks import reverse_geocode_and_update
+
+    if not acquire(ubicacion_id):
+        _incr(SUPPRESSED_KEY)
+        logger.debug('reverse_geocode ya programado para Ubicacion %s', ubicacion_id)
+        return False
+    _incr(ENQUEUED_KEY)
+    try:
+        if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False):
+            reverse_geocode_and_update(ubicacion_id)
+        else:
+            reverse_geocode_and_update.delay(ubicacion_id)
+    except Exception:
+        release(ubicacion_id)
+        logger.exception('Error encolando reverse_geocode para Ubicacion %s', ubicacion_id)
+        return False
+    return True
+
+
+def enqueue_reverse_geocode(ubicacion_id):
+    """Schedule reverse_geocode_and_update once the current transaction commits.
+
+    The lock is taken inside the on_commit callback, so a rolled-back
+    transaction neither schedules a job nor leaves a stale lock behind.
+    """
+    transaction.on_commit(lambda: _dispatch(ubicacion_id))
+
+
+def stats():
+    from .geocode_cache import read_counters
+
+    counters = read_counters(ENQUEUED_KEY, SUPPRESSED_KEY, SKIPPED_KEY)
+    return {
+        'enqueued': counters[ENQUEUED_KEY],
+        'suppressed': counters[SUPPRESSED_KEY],
+        'skipped': counters[SKIPPED_KEY],
+    }
@@ -0,0 +1,210 @@
+"""Reverse-geocoder backends.
+
+The backend is chosen with the GEOCODER_BACKEND setting (dotted path):
+
+- NominatimGeocoder (default): HTTP client over a pooled `requests.Session`
+  with a token-bucket rate limiter whose state lives in the database, so all
+  web and worker processes together respect Nominatim's 1 request/second
+  policy.
+- OfflineGeocoder: answers from a local gazetteer JSON file (GEOCODER_GAZETTEER)
+  with named polygons and points, so development and CI need no network.
+"""
+import json
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class GeocoderUnavailable(Exception):
+    """Transient failure (network error, throttling); the caller may retry."""
+
+
+class BaseGeocoder:
+    def reverse(self, lat, lon):
+        """Return a place name for lat/lon, or None when nothing is known."""
+        raise NotImplementedError
+
+
+class TokenBucket:
+    """Token bucket whose state is a TokenBucketState row.
+
+    The row is locked with SELECT ... FOR UPDATE while it is refilled and a
+    token taken, so every process draws from the same bucket. Waiting for the
+    next token happens outside the transaction.
+    """
+
+    def __init__(self, key, rate, capacity):
+        self.key = key
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+
+    def _take(self):
+        """Take a token if one is available; return the seconds to wait otherwise."""
+        from .models import TokenBucketState
+
+        with transaction.atomic():
+            state = TokenBucketState.objects.select_for_update().filter(clave=self.key).first()
+            if state is None:
+                # first use: several processes may race to create the row
+                TokenBucketState.objects.bulk_create(
+                    [TokenBucketState(clave=self.key, tokens=self.capacity, marca=time.time())],
+                    ignore_conflicts=True,
+                )
+                state = TokenBucketState.objects.select_for_update().get(clave=self.key)
+            now = time.time()
+            tokens = min(self.capacity, state.tokens + max(now - state.marca, 0) * self.rate)
+            if tokens >= 1:
+                tokens, wait = tokens - 1, 0
+            else:
+                wait = (1 - tokens) / self.rate
+            TokenBucketState.objects.filter(pk=state.pk).update(tokens=tokens, marca=now)
+        return wait
+
+    def acquire(self, timeout=30):
+        """Block until a token is available; return False after `timeout`."""
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self._take()
+            if not wait:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class NominatimGeocoder(BaseGeocoder):
+    ADDRESS_KEYS = ('road', 'house_number', 'neighbourhood', 'suburb', 'city', 'state', 'country')
+
+    def __init__(self):
+        self.url = getattr(settings, 'GEOCODER_NOMINATIM_URL', 'https://nominatim.openstreetmap.org/reverse')
+        self.user_agent = getattr(settings, 'GEOCODER_USER_AGENT', 'reportesmodelo/1.0 (+https://example.com)')
+        self.timeout = getattr(settings, 'GEOCODER_TIMEOUT', 10)
+        self.bucket = TokenBucket(
+            'tasks:geocoder:nominatim:bucket',
+            rate=getattr(settings, 'GEOCODER_RATE_LIMIT', 1.0),
+            capacity=getattr(settings, 'GEOCODER_RATE_BURST', 1),
+        )
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        # one keep-alive connection pool per thread, reused across calls
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            import requests
+
+            session = requests.Session()
+            session.headers['User-Agent'] = self.user_agent
+            self._local.session = session
+        return session
+
+    def reverse(self, lat, lon):
+        import requests
+
+        if not self.bucket.acquire(timeout=self.timeout):
+            raise GeocoderUnavailable('Límite de peticiones a Nominatim alcanzado')
+        params = {'format': 'jsonv2', 'lat': str(lat), 'lon': str(lon), 'zoom': 18, 'addressdetails': 1}
+        try:
+            resp = self.session.get(self.url, params=params, timeout=self.timeout)
+            resp.raise_for_status()
+            data = resp.json()
+        except requests.RequestException as exc:
+            raise GeocoderUnavailable(str(exc)) from exc
+
+        nombre = data.get('display_name') or ''
+        if not nombre:
+            addr = data.get('address', {})
+            parts = []
+            for k in self.ADDRESS_KEYS:
+                v = addr.get(k)
+                if v and v not in parts:
+                    parts.append(v)
+            nombre = ', '.join(parts)
+        return nombre or None
+
+
+def _point_in_polygon(lat, lon, polygon):
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        lat_i, lon_i = polygon[i]
+        lat_j, lon_j = polygon[j]
+        if (lon_i > lon) != (lon_j > lon):
+            cross = (lat_j - lat_i) * (lon - lon_i) / (lon_j - lon_i) + lat_i
+            if lat < cross:
+                inside = not inside
+        j = i
+    return inside
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in metres."""
+    r = 6371000.0
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * r * math.asin(math.sqrt(a))
+
+
+class OfflineGeocoder(BaseGeocoder):
+    """Resolve names from a local gazetteer file.
+
+    The file is a JSON list of entries, either polygons
+    ``{"nombre": ..., "poligono": [[lat, lon], ...]}`` or points
+    ``{"nombre": ..., "lat": ..., "lon": ..., "radio_m": 100}``. Polygons win;
+    otherwise the nearest point whose radius covers the coordinates is used.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or getattr(settings, 'GEOCODER_GAZETTEER', None)
+        self.polygons = []
+        self.points = []
+        if not self.path:
+            logger.warning('GEOCODER_GAZETTEER no configurado; el geocodificador offline no resolverá nombres')
+            return
+        with open(self.path, encoding='utf-8') as fh:
+            for entry in json.load(fh):
+                if entry.get('poligono'):
+                    self.polygons.append((entry['nombre'], [tuple(map(float, p)) for p in entry['poligono']]))
+                elif entry.get('lat') is not None and entry.get('lon') is not None:
+                    self.points.append((entry['nombre'], float(entry['lat']), float(entry['lon']), float(entry.get('radio_m', 100))))
+
+    def reverse(self, lat, lon):
+        lat, lon = float(lat), float(lon)
+        for nombre, polygon in self.polygons:
+            if _point_in_polygon(lat, lon, polygon):
+                return nombre
+        best = None
+        for nombre, plat, plon, radio in self.points:
+            d = haversine_m(lat, lon, plat, plon)
+            if d <= radio and (best is None or d < best[0]):
+                best = (d, nombre)
+        return best[1] if best else None
+
+
+_geocoder = None
+
+
+def get_geocoder():
+    """Return the process-wide geocoder configured by GEOCODER_BACKEND."""
+    global _geocoder
+    if _geocoder is None:
+        _geocoder = import_string(getattr(settings, 'GEOCODER_BACKEND', 'tasks.geocoders.NominatimGeocoder'))()
+    return _geocoder
+
+
+@receiver(setting_changed)
+def _reset_geocoder(setting, **kwargs):
+    global _geocoder
+    if setting.startswith('GEOCODER_'):
+        _geocoder = None
@@ -0,0 +1,67 @@
+"""Minimal geohash encoding used for prefix-indexed proximity queries."""
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+MAX_PRECISION = 12
+
+
+def encode(lat, lon, precision=MAX_PRECISION):
+    lat, lon = float(lat), float(lon)
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_degrees(precision):
+    """Return (lat_height, lon_width) of a cell in degrees."""
+    total = 5 * precision
+    lon_bits = math.ceil(total / 2)
+    lat_bits = total // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def precision_for_radius(radius_m, lat=0.0):
+    """Longest precision whose cells are still at least radius_m on each side.
+
+    Searching that cell plus its 8 neighbours then covers the whole radius.
+    """
+    for precision in range(MAX_PRECISION, 0, -1):
+        dlat, dlon = cell_degrees(precision)
+        height = dlat * 111320.0
+        width = dlon * 111320.0 * math.cos(math.radians(float(lat)))
+        if height >= radius_m and width >= radius_m:
+            return precision
+    return 1
+
+
+def neighbors(lat, lon, precision):
+    """Return the cell containing lat/lon and its 8 neighbours (deduplicated)."""
+    dlat, dlon = cell_degrees(precision)
+    cells = []
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            nlat = min(max(float(lat) + dy * dlat, -90.0), 90.0)
+            nlon = (float(lon) + dx * dlon + 180.0) % 360.0 - 180.0
+            cell = encode(nlat, nlon, precision)
+            if cell not in cells:
+                cells.append(cell)
+    return cells
@@ -0,0 +1,164 @@
+"""Background (and streamed) GPT generation with a result cache.
+
+`submit` records a GPTJob and, once the row commits, schedules the
+`generate_gpt_report` Celery job, so no request waits on the model. Each job
+is keyed by a hash of its prompt and model options; if a completed job with
+the same hash exists its answer is reused on the spot and the model is not
+called. When the job belongs to a Report the answer is stored in
+Report.gpt_report. `stream` answers inside the request instead, forwarding
+pieces as the backend produces them, and records the result the same way.
+"""
+import logging
+
+from django.db import transaction
+
+from .llm import LLMError, default_options, get_llm, prompt_hash
+from .models import GPTJob, Report
+
+logger = logging.getLogger(__name__)
+
+
+def build_report_prompt(report):
+    return (
+        f"Generate a report with the following details:\n"
+        f"Title: {report.title}\n"
+        f"Description: {report.description}\n"
+        f"Fecha de Resolución: {report.fecha_resolucion.isoformat() if report.fecha_resolucion else 'No especificada'}\n"
+        f"URL de la Imagen Inicial: {report.foto_inicial_url if report.foto_inicial_url else 'No se proporcionó imagen'}\n"
+    )
+
+
+def cached_result(key):
+    """Answer of the latest completed job for prompt hash `key`, or None."""
+    return (
+        GPTJob.objects.filter(prompt_hash=key, estado='completo')
+        .order_by('-actualizado_en')
+        .values_list('resultado', flat=True)
+        .first()
+    )
+
+
+def _complete(job, resultado, desde_cache=False):
+    job.resultado = resultado
+    job.estado = 'completo'
+    job.desde_cache = desde_cache
+    job.error = ''
+    job.save(update_fields=['resultado', 'estado', 'desde_cache', 'error', 'actualizado_en'])
+    if job.report_id:
+        Report.objects.filter(pk=job.report_id).update(gpt_report=resultado)
+
+
+def submit(prompt, *, report=None, usuario=None, **options):
+    """Create a GPTJob for prompt; served from cache or scheduled after commit."""
+    options = default_options(**options)
+    key = prompt_hash(prompt, options)
+    job = GPTJob.objects.create(
+        report=report, usuario=usuario, prompt=prompt, opciones=options, prompt_hash=key,
+    )
+    cached = cached_result(key)
+    if cached is not None:
+        _complete(job, cached, desde_cache=True)
+        return job
+
+    def _enqueue():
+        from .tasks import generate_gpt_report
+
+        try:
+            generate_gpt_report.delay(str(job.pk))
+        except Exception:
+            logger.exception('Error encolando GPTJob %s', job.pk)
+
+    transaction.on_commit(_enqueue)
+    return job
+
+
+def submit_for_report(report, usuario=None):
+    return submit(build_report_prompt(report), report=report, usuario=usuario)
+
+
+def run_job(job_id):
+    """Worker side: produce the answer for a job; return a status dict."""
+    job = GPTJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return {'error': 'GPTJob no encontrado'}
+    if job.estado == 'completo':
+        return {'status': 'completo', 'skipped': True}
+
+    # a job with the same inputs may have finished while this one queued
+    cached = cached_result(job.prompt_hash)
+    if cached is not None:
+        _complete(job, cached, desde_cache=True)
+        return {'status': 'completo', 'cache': 'hit'}
+
+    job.estado = 'procesando'
+    job.save(update_fields=['estado', 'actualizado_en'])
+    try:
+        resultado = get_llm().complete(job.prompt, **job.opciones)
+    except LLMError as exc:
+        job.estado = 'error'
+        job.error = str(exc)
+        job.save(update_fields=['estado', 'error', 'actualizado_en'])
+        logger.error('GPTJob %s falló: %s', job.pk, exc)
+        return {'status': 'error'}
+    _complete(job, resultado)
+    return {'status': 'completo'}
+
+
+def stream(prompt, *, usuario=None, **options):
+    """Generate an answer in the request, yielding ('token', text) pieces.
+
+    Ends with ('done', job) once the answer is stored as a completed GPTJob
+    (so later identical prompts hit the cache), or ('error', message). If the
+    consumer stops early (the client disconnected and the response was
+    closed) the job is marked 'cancelado'; any other interruption marks it
+    'error', so no job is left 'procesando'.
+    """
+    options = default_options(**options)
+    key = prompt_hash(prompt, options)
+    cached = cached_result(key)
+    job = GPTJob.objects.create(
+        usuario=usuario, prompt=prompt, opciones=options, prompt_hash=key,
+        estado='completo' if cached is not None else 'procesando',
+        resultado=cached or '', desde_cache=cached is not None,
+    )
+    if cached is not None:
+        yield 'token', cached
+        yield 'done', job
+        return
+
+    pieces = []
+    interrupted = ('error', 'Generación interrumpida')
+    try:
+        try:
+            for piece in get_llm().stream(prompt, **options):
+                pieces.append(piece)
+                yield 'token', piece
+        except LLMError as exc:
+            job.estado = 'error'
+            job.error = str(exc)
+            job.save(update_fields=['estado', 'error', 'actualizado_en'])
+            logger.error('GPTJob %s falló: %s', job.pk, exc)
+            yield 'error', str(exc)
+            return
+        except GeneratorExit:
+            interrupted = ('cancelado', 'Cliente desconectado')
+            raise
+        _complete(job, ''.join(pieces).strip())
+    finally:
+        if job.estado == 'procesando':
+            job.estado, job.error = interrupted
+            job.save(update_fields=['estado', 'error', 'actualizado_en'])
+            logger.info('GPTJob %s terminó como %s: %s', job.pk, *interrupted)
+    yield 'done', job
+
+
+def job_payload(job):
+    return {
+        'id': str(job.pk),
+        'estado': job.estado,
+        'report': job.report_id,
+        'resultado': job.resultado if job.estado == 'completo' else None,
+        'error': job.error or None,
+        'desde_cache': job.desde_cache,
+        'status_url': f'/api/v1/gpt-jobs/{job.pk}/',
+    }
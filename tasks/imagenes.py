@@ -0,0 +1,133 @@
+"""Background generation of resized Task photo variants.
+
+After a Task photo is uploaded or replaced, `enqueue_variants` schedules the
+`generate_image_variants` Celery job, which writes one file per size in
+TASK_IMAGE_VARIANTS and per format (WebP and JPEG) with Pillow and records
+each as a FotoVariante with its dimensions. TaskSerializer renders them, so
+list views can download a few-KB thumbnail instead of the original.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from .models import FotoVariante, Task
+
+logger = logging.getLogger(__name__)
+
+FOTO_FIELDS = ('foto_inicial', 'foto_final')
+
+# (extension, Pillow format)
+FORMATOS = (('webp', 'WEBP'), ('jpeg', 'JPEG'))
+
+DEFAULT_VARIANTS = {'thumb': 320, 'medium': 1024}
+
+
+def _variants():
+    return getattr(settings, 'TASK_IMAGE_VARIANTS', DEFAULT_VARIANTS)
+
+
+def enqueue_variants(task_id, campo):
+    """Schedule variant generation for task_id's `campo` once the row commits."""
+    def _enqueue():
+        from .tasks import generate_image_variants
+
+        try:
+            generate_image_variants.delay(task_id, campo)
+        except Exception:
+            logger.exception('Error encolando variantes de %s para tarea %s', campo, task_id)
+
+    transaction.on_commit(_enqueue)
+
+
+def _render(image, max_side, pillow_format, quality):
+    from PIL import Image
+
+    copy = image.copy()
+    # thumbnail() keeps the aspect ratio and never upscales
+    copy.thumbnail((max_side, max_side), Image.LANCZOS)
+    if pillow_format == 'JPEG' and copy.mode not in ('RGB', 'L'):
+        copy = copy.convert('RGB')
+    buf = BytesIO()
+    if pillow_format == 'JPEG':
+        copy.save(buf, 'JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        copy.save(buf, pillow_format, quality=quality, method=4)
+    return copy.size, buf.getvalue()
+
+
+def _open(field_file):
+    from PIL import Image, ImageOps
+
+    with field_file.open('rb') as fh:
+        image = Image.open(fh)
+        # apply the camera orientation before resizing; load before closing
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode == 'P':
+        image = image.convert('RGBA')
+    return image
+
+
+def build_variants(task_id, campo):
+    """Generate (or drop) the variants of one Task photo; return a status dict."""
+    if campo not in FOTO_FIELDS:
+        return {'error': f'Campo inválido: {campo}'}
+    task = Task.objects.filter(pk=task_id).only('id', campo).first()
+    if task is None:
+        return {'error': 'Tarea no encontrada'}
+
+    foto = getattr(task, campo)
+    existing = list(FotoVariante.objects.filter(task_id=task_id, campo=campo))
+    if not foto:
+        for variante in existing:
+            variante.delete()
+        return {'status': 'cleared', 'deleted': len(existing)}
+
+    expected = len(_variants()) * len(FORMATOS)
+    if len(existing) == expected and all(v.origen == foto.name for v in existing):
+        return {'status': 'up_to_date'}
+
+    try:
+        image = _open(foto)
+    except Exception:
+        logger.exception('No se pudo abrir %s de la tarea %s', campo, task_id)
+        return {'status': 'invalid'}
+
+    quality = int(getattr(settings, 'TASK_IMAGE_QUALITY', 80))
+    storage = FotoVariante._meta.get_field('archivo').storage
+    stem = os.path.splitext(os.path.basename(foto.name))[0]
+    rows = []
+    for variante, max_side in _variants().items():
+        for ext, pillow_format in FORMATOS:
+            (width, height), data = _render(image, max_side, pillow_format, quality)
+            name = storage.save(f'fotos/variantes/{task_id}/{campo}-{stem}-{variante}.{ext}', ContentFile(data))
+            rows.append(FotoVariante(
+                task_id=task_id, campo=campo, variante=variante, formato=ext, archivo=name,
+                width=width, height=height, peso_bytes=len(data), origen=foto.name,
+            ))
+
+    with transaction.atomic():
+        for variante in existing:
+            variante.delete()
+        FotoVariante.objects.bulk_create(rows)
+    return {'status': 'generated', 'variantes': len(rows)}
+
+
+def delete_variant_file(variante):
+    """Remove the stored file of a deleted FotoVariante (after commit)."""
+    name = variante.archivo.name
+    storage = variante.archivo.storage
+    if not name:
+        return
+
+    def _delete():
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.exception('No se pudo borrar el archivo %s', name)
+
+    transaction.on_commit(_delete)
@@ -0,0 +1,130 @@
+"""Language-model backends used for GPT reports and answers.
+
+The backend is chosen with the LLM_BACKEND setting (dotted path):
+
+- OpenAIChatLLM (default): OpenAI chat completions through the `openai`
+  package configured in settings (OPENAI_API_KEY).
+- StubLLM: deterministic offline answers derived from the prompt, for
+  development and tests.
+"""
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """The backend could not produce an answer."""
+
+
+class BaseLLM:
+    name = 'base'
+
+    def complete(self, prompt, *, model, max_tokens, temperature):
+        """Return the full answer text for prompt."""
+        raise NotImplementedError
+
+    def stream(self, prompt, *, model, max_tokens, temperature):
+        """Yield the answer in pieces as they are produced.
+
+        Backends without native streaming yield the whole answer once.
+        """
+        yield self.complete(prompt, model=model, max_tokens=max_tokens, temperature=temperature)
+
+
+class OpenAIChatLLM(BaseLLM):
+    name = 'openai'
+
+    def complete(self, prompt, *, model, max_tokens, temperature):
+        import openai
+
+        try:
+            response = openai.ChatCompletion.create(
+                model=model,
+                messages=[{'role': 'user', 'content': prompt}],
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+        except Exception as exc:
+            raise LLMError(str(exc)) from exc
+        try:
+            return response['choices'][0]['message']['content'].strip()
+        except (KeyError, IndexError, TypeError) as exc:
+            raise LLMError('Formato de respuesta inválido del GPT') from exc
+
+    def stream(self, prompt, *, model, max_tokens, temperature):
+        import openai
+
+        try:
+            chunks = openai.ChatCompletion.create(
+                model=model,
+                messages=[{'role': 'user', 'content': prompt}],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+            )
+            for chunk in chunks:
+                choices = chunk.get('choices') or [{}]
+                piece = (choices[0].get('delta') or {}).get('content')
+                if piece:
+                    yield piece
+        except Exception as exc:
+            raise LLMError(str(exc)) from exc
+
+
+class StubLLM(BaseLLM):
+    """Offline backend: echoes a digest of the prompt, never touches the network."""
+    name = 'stub'
+
+    def complete(self, prompt, *, model, max_tokens, temperature):
+        first_line = (prompt or '').strip().splitlines()[0] if (prompt or '').strip() else ''
+        digest = hashlib.sha256((prompt or '').encode('utf-8')).hexdigest()[:12]
+        return f'[{model}] Informe generado para: {first_line} ({digest})'
+
+    def stream(self, prompt, *, model, max_tokens, temperature):
+        # word by word, like a token stream
+        text = self.complete(prompt, model=model, max_tokens=max_tokens, temperature=temperature)
+        words = text.split(' ')
+        for i, word in enumerate(words):
+            yield word if i == len(words) - 1 else f'{word} '
+
+
+def default_options(**overrides):
+    """Model options from settings, with per-call overrides."""
+    options = {
+        'model': getattr(settings, 'GPT_MODEL', 'gpt-3.5-turbo'),
+        'max_tokens': int(getattr(settings, 'GPT_MAX_TOKENS', 150)),
+        'temperature': float(getattr(settings, 'GPT_TEMPERATURE', 0.7)),
+    }
+    options.update({k: v for k, v in overrides.items() if v is not None})
+    return options
+
+
+def prompt_hash(prompt, options):
+    """Stable key for a prompt and the options that shape its answer."""
+    payload = json.dumps({'prompt': prompt, **options}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+_llm = None
+
+
+def get_llm():
+    """Return the process-wide backend configured by LLM_BACKEND."""
+    global _llm
+    if _llm is None:
+        _llm = import_string(getattr(settings, 'LLM_BACKEND', 'tasks.llm.OpenAIChatLLM'))()
+    return _llm
+
+
+@receiver(setting_changed)
+def _reset_llm(setting, **kwargs):
+    global _llm
+    if setting.startswith('LLM_'):
+        _llm = None
@@ -0,0 +1,163 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import geocode_cache, geocode_queue
+from tasks.geocoders import GeocoderUnavailable, get_geocoder
+from tasks.models import BackfillCheckpoint, Ubicacion
+from tasks.pubsub import publish_ubicacion
+
+CHECKPOINT_KEY = 'backfill_geocode'
+
+
+class Command(BaseCommand):
+    help = 'Reverse-geocode pending/failed Ubicacion rows in bulk with a bounded worker pool'
+
+    def add_arguments(self, parser):
+        # 'processing' rows normally belong to a running Celery job; pass it
+        # explicitly to sweep ones left behind by a dead worker
+        parser.add_argument('--status', default='pending,failed',
+                            help='Comma-separated statuses to process (default: pending,failed)')
+        parser.add_argument('--chunk-size', type=int, default=200, help='Rows fetched and written per batch')
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Concurrent geocoder calls; the shared rate limit still applies')
+        parser.add_argument('--limit', type=int, default=0, help='Stop after this many rows (0 = no limit)')
+        parser.add_argument('--after-id', type=int, default=None, help='Only process rows with a greater id')
+        parser.add_argument('--resume', action='store_true',
+                            help='Continue after the checkpoint of the last run (the last id before the '
+                                 'first row left skipped or waiting for a retry)')
+
+    def handle(self, *args, **options):
+        statuses = [s.strip() for s in options['status'].split(',') if s.strip()]
+        chunk_size = options['chunk_size']
+        workers = options['workers']
+        if chunk_size < 1 or workers < 1:
+            raise CommandError('--chunk-size and --workers must be positive')
+
+        after_id = options['after_id']
+        if after_id is None and options['resume']:
+            # stored in the database so it survives the process, whatever cache is configured
+            after_id = (
+                BackfillCheckpoint.objects.filter(clave=CHECKPOINT_KEY)
+                .values_list('ultimo_id', flat=True).first()
+            )
+        after_id = after_id or 0
+
+        qs = (
+            Ubicacion.objects.filter(status__in=statuses, id__gt=after_id)
+            .exclude(lat__isnull=True).exclude(lon__isnull=True)
+            .order_by('id')
+        )
+        total = qs.count()
+        if options['limit']:
+            total = min(total, options['limit'])
+            qs = qs[:options['limit']]
+        self.stdout.write(f'{total} ubicaciones to geocode (id > {after_id}, status in {statuses})')
+
+        counts = {'updated': 0, 'ready': 0, 'failed': 0, 'retry': 0, 'skipped': 0}
+        done = 0
+        # the checkpoint only moves past rows that reached a final status, so
+        # --resume still picks up the ones skipped or left for a retry
+        checkpoint, blocked = after_id, False
+        started = time.monotonic()
+        geocoder = get_geocoder()
+        rows = qs.only('id', 'nombre', 'nombre_geocodificado', 'lat', 'lon', 'status').iterator(chunk_size=chunk_size)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                unfinished = self._process_chunk(chunk, pool, geocoder, counts)
+                done += len(chunk)
+                if not blocked:
+                    for u in chunk:
+                        if u.id in unfinished:
+                            blocked = True
+                            break
+                        checkpoint = u.id
+                    BackfillCheckpoint.objects.update_or_create(
+                        clave=CHECKPOINT_KEY, defaults={'ultimo_id': checkpoint}
+                    )
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'{done}/{total} processed ({done / elapsed if elapsed else 0:.1f} rows/s), '
+                    f'last id {chunk[-1].id}'
+                )
+
+        summary = ', '.join(f'{k}: {v}' for k, v in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Backfill finished in {time.monotonic() - started:.1f}s ({summary}); checkpoint id {checkpoint}'
+        ))
+
+    def _process_chunk(self, chunk, pool, geocoder, counts):
+        """Geocode one chunk; return the ids left without a final status."""
+        # leave rows alone while a Celery job holds them; take the lock for
+        # the rest so post_save/lookup do not schedule a job meanwhile
+        rows = []
+        unfinished = set()
+        for u in chunk:
+            if geocode_queue.acquire(u.id):
+                rows.append(u)
+            else:
+                counts['skipped'] += 1
+                unfinished.add(u.id)
+        try:
+            # one geocoder call per cache cell; cells already cached cost nothing
+            by_cell = {}
+            for u in rows:
+                by_cell.setdefault(geocode_cache.quantize(u.lat, u.lon)[0], []).append(u)
+            nombres = {}
+            pending = []
+            for celda, members in by_cell.items():
+                cached = geocode_cache.lookup(members[0].lat, members[0].lon)
+                if cached:
+                    nombres[celda] = cached
+                else:
+                    pending.append(celda)
+
+            def reverse(celda):
+                u = by_cell[celda][0]
+                try:
+                    return celda, geocoder.reverse(u.lat, u.lon), None
+                except Exception as exc:
+                    return celda, None, exc
+
+            errors = {}
+            for celda, nombre, exc in pool.map(reverse, pending):
+                if exc is not None:
+                    errors[celda] = exc
+                    continue
+                u = by_cell[celda][0]
+                nombres[celda] = geocode_cache.store(u.lat, u.lon, nombre)
+
+            changed = []
+            for celda, members in by_cell.items():
+                exc = errors.get(celda)
+                for u in members:
+                    if isinstance(exc, GeocoderUnavailable):
+                        # transient; keep the status so a later run retries it
+                        counts['retry'] += 1
+                        unfinished.add(u.id)
+                        continue
+                    if exc is not None:
+                        u.status = 'failed'
+                        counts['failed'] += 1
+                    elif nombres.get(celda):
+                        u.nombre = nombres[celda]
+                        u.nombre_geocodificado = True
+                        u.status = 'ready'
+                        counts['updated'] += 1
+                    else:
+                        u.status = 'ready'
+                        counts['ready'] += 1
+                    changed.append(u)
+            Ubicacion.objects.bulk_update(changed, ['nombre', 'nombre_geocodificado', 'status'])
+            # bulk_update skips post_save, so wake long-polling clients here
+            for u in changed:
+                publish_ubicacion(u)
+        finally:
+            for u in rows:
+                geocode_queue.release(u.id)
+        return unfinished
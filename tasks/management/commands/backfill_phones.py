@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+
+from tasks.models import Empleado, Participante
+from tasks.notifications import set_celular_e164
+
+
+class Command(BaseCommand):
+    help = 'Store the E.164 form of Empleado/Participante celular numbers in celular_e164'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows read and written per batch')
+        parser.add_argument('--all', action='store_true',
+                            help='Recompute every row, not only those whose celular_e164 is missing or '
+                                 'was computed from another celular (e.g. after changing PHONE_DEFAULT_REGION)')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        for model in (Empleado, Participante):
+            qs = model.objects.exclude(celular__isnull=True).exclude(celular='')
+            if not options['all']:
+                qs = qs.exclude(celular_e164_origen=F('celular'))
+            checked = updated = invalid = 0
+            changed = []
+            for row in qs.only('id', 'celular', 'celular_e164', 'celular_e164_origen').order_by('id').iterator(chunk_size=chunk_size):
+                checked += 1
+                if set_celular_e164(row):
+                    changed.append(row)
+                if not row.celular_e164:
+                    invalid += 1
+                if len(changed) >= chunk_size:
+                    updated += model.objects.bulk_update(changed, ['celular_e164', 'celular_e164_origen'])
+                    changed = []
+            if changed:
+                updated += model.objects.bulk_update(changed, ['celular_e164', 'celular_e164_origen'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{model.__name__}: {checked} checked, {updated} updated, {invalid} invalid numbers'
+            ))
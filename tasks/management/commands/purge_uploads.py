@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from tasks.uploads import purge_stale
+
+
+class Command(BaseCommand):
+    help = 'Cancel chunked photo uploads idle for too long and delete their temporary files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=24, help='Idle time after which an open upload is dropped (default 24)')
+
+    def handle(self, *args, **options):
+        purged = purge_stale(options['hours'])
+        self.stdout.write(self.style.SUCCESS(f'{purged} stale uploads cancelled'))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from tasks.campus_stats import COUNTER_FIELDS, compute_campus_stats
+from tasks.models import CampusStats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the CampusStats rollup table from Task and report drift against the stored counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report drift; exit non-zero if any is found')
+
+    def handle(self, *args, **options):
+        check_only = options.get('check')
+
+        expected = compute_campus_stats()
+        stored = {
+            row['campus']: row
+            for row in CampusStats.objects.values('campus', *COUNTER_FIELDS)
+        }
+
+        drift = []
+        for campus in sorted(set(expected) | set(stored)):
+            want = expected.get(campus, {f: 0 for f in COUNTER_FIELDS})
+            have = stored.get(campus, {f: 0 for f in COUNTER_FIELDS})
+            diffs = {f: (have[f], want[f]) for f in COUNTER_FIELDS if have[f] != want[f]}
+            if diffs:
+                drift.append(campus)
+                detail = ', '.join(f'{f}: {a} -> {b}' for f, (a, b) in diffs.items())
+                self.stdout.write(f'Drift in campus "{campus}": {detail}')
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS(f'CampusStats up to date ({len(expected)} campus)'))
+            return
+
+        if check_only:
+            raise CommandError(f'CampusStats drift found in {len(drift)} campus')
+
+        with transaction.atomic():
+            CampusStats.objects.all().delete()
+            CampusStats.objects.bulk_create(
+                [CampusStats(campus=campus, **counters) for campus, counters in expected.items()]
+            )
+        self.stdout.write(self.style.SUCCESS(f'CampusStats rebuilt ({len(expected)} campus, {len(drift)} corrected)'))
@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.outbox import drain
+
+
+class Command(BaseCommand):
+    help = 'Publish pending outbox rows (Celery task calls recorded by requests) to the broker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Rows locked and published per transaction (default OUTBOX_RELAY_BATCH)')
+        parser.add_argument('--loop', action='store_true', help='Keep running, polling every --interval seconds')
+        parser.add_argument('--interval', type=float, default=None,
+                            help='Seconds between polls with --loop (default OUTBOX_RELAY_INTERVAL)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size'] or int(getattr(settings, 'OUTBOX_RELAY_BATCH', 100))
+        interval = options['interval'] or float(getattr(settings, 'OUTBOX_RELAY_INTERVAL', 1))
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+        while True:
+            sent = drain(batch_size)
+            if sent or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'{sent} outbox messages published'))
+            if not options['loop']:
+                return
+            time.sleep(interval)
@@ -0,0 +1,60 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+from tasks import storage
+from tasks.imagenes import FOTO_FIELDS
+from tasks.models import FotoBlob, Task
+
+
+def _count_refs(names=None):
+    """Count the Task photo fields pointing at each stored name."""
+    counts = Counter()
+    for campo in FOTO_FIELDS:
+        qs = Task.objects.exclude(**{f'{campo}__isnull': True}).exclude(**{campo: ''})
+        if names is not None:
+            qs = qs.filter(**{f'{campo}__in': names})
+        counts.update(dict(qs.values_list(campo).annotate(n=Count('id')).order_by()))
+    return counts
+
+
+class Command(BaseCommand):
+    help = 'Recount FotoBlob references from Task photo fields and report or repair drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report drift; exit non-zero if any is found')
+
+    def handle(self, *args, **options):
+        expected = _count_refs()
+        stored = dict(FotoBlob.objects.values_list('nombre', 'refs'))
+
+        drift = []
+        for nombre in sorted(set(expected) | set(stored)):
+            have, want = stored.get(nombre, 0), expected.get(nombre, 0)
+            # a row nothing references is drift too: its file is never unlinked
+            if have != want or not want:
+                drift.append(nombre)
+                self.stdout.write(f'Drift in "{nombre}": {have} -> {want}')
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS(f'FotoBlob up to date ({len(stored)} blobs)'))
+            return
+
+        if options.get('check'):
+            raise CommandError(f'FotoBlob drift found in {len(drift)} blobs')
+
+        unlinked = 0
+        for nombre in drift:
+            with transaction.atomic():
+                # recount under the row lock: tasks may have changed since the scan
+                blob = storage._lock_blob(nombre)
+                refs = _count_refs([nombre]).get(nombre, 0)
+                FotoBlob.objects.filter(pk=blob.pk).update(refs=refs)
+                if not refs:
+                    storage.foto_storage().delete(nombre)
+                    unlinked += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'FotoBlob repaired ({len(drift)} corrected, {unlinked} unreferenced files removed)'
+        ))
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0018_make_ubicacion_required'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='task_fecha_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['done', 'fecha_creacion', 'id'], name='task_done_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['campus', 'fecha_creacion', 'id'], name='task_campus_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['prioridad', 'fecha_creacion', 'id'], name='task_prioridad_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['reportado_por', 'fecha_creacion', 'id'], name='task_reportado_fecha_idx'),
+        ),
+    ]
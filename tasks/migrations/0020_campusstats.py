@@ -0,0 +1,46 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:44
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_campus_stats(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    CampusStats = apps.get_model('tasks', 'CampusStats')
+    rows = Task.objects.values('campus').annotate(
+        total=Count('id'),
+        abiertas=Count('id', filter=Q(done=False)),
+        cerradas=Count('id', filter=Q(done=True)),
+        alta=Count('id', filter=Q(prioridad='Alta')),
+        media=Count('id', filter=Q(prioridad='Media')),
+        baja=Count('id', filter=Q(prioridad='Baja')),
+    ).order_by()
+    CampusStats.objects.bulk_create([CampusStats(**row) for row in rows])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0019_task_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampusStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('campus', models.CharField(max_length=100, unique=True)),
+                ('total', models.IntegerField(default=0)),
+                ('abiertas', models.IntegerField(default=0)),
+                ('cerradas', models.IntegerField(default=0)),
+                ('alta', models.IntegerField(default=0)),
+                ('media', models.IntegerField(default=0)),
+                ('baja', models.IntegerField(default=0)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['campus'],
+            },
+        ),
+        migrations.RunPython(populate_campus_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:49
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0020_campusstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('celda', models.CharField(max_length=40, unique=True)),
+                ('lat', models.DecimalField(decimal_places=6, max_digits=9)),
+                ('lon', models.DecimalField(decimal_places=6, max_digits=9)),
+                ('nombre', models.CharField(max_length=255)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('ultimo_uso', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('hits', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
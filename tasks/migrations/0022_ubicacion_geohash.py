@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:52
+
+from django.db import migrations, models
+
+
+def backfill_geohash(apps, schema_editor):
+    from tasks.geohash import encode
+
+    Ubicacion = apps.get_model('tasks', 'Ubicacion')
+    batch = []
+    for u in Ubicacion.objects.filter(lat__isnull=False, lon__isnull=False).only('id', 'lat', 'lon').iterator(chunk_size=2000):
+        u.geohash = encode(u.lat, u.lon)
+        batch.append(u)
+        if len(batch) >= 2000:
+            Ubicacion.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    if batch:
+        Ubicacion.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0021_geocodecache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ubicacion',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=12),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0022_ubicacion_geohash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ubicacion',
+            index=models.Index(fields=['lat', 'lon'], name='ubicacion_lat_lon_idx'),
+        ),
+    ]
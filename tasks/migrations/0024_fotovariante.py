@@ -0,0 +1,37 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0023_ubicacion_lat_lon_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FotoVariante',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('campo', models.CharField(max_length=20)),
+                ('variante', models.CharField(max_length=20)),
+                ('formato', models.CharField(max_length=10)),
+                ('archivo', models.FileField(max_length=255, upload_to='')),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('peso_bytes', models.PositiveIntegerField(default=0)),
+                ('origen', models.CharField(max_length=255)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='foto_variantes', to='tasks.task')),
+            ],
+            options={
+                'ordering': ['campo', 'variante', 'formato'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='fotovariante',
+            constraint=models.UniqueConstraint(fields=('task', 'campo', 'variante', 'formato'), name='foto_variante_unica'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:03
+
+from collections import Counter
+
+import tasks.storage
+from django.db import migrations, models
+
+
+def count_existing_photos(apps, schema_editor):
+    # existing uploads keep their names; count them so release() manages them too
+    Task = apps.get_model('tasks', 'Task')
+    FotoBlob = apps.get_model('tasks', 'FotoBlob')
+    refs = Counter()
+    for inicial, final in Task.objects.values_list('foto_inicial', 'foto_final').iterator(chunk_size=2000):
+        for name in (inicial, final):
+            if name:
+                refs[name] += 1
+    FotoBlob.objects.bulk_create(
+        [FotoBlob(nombre=name, refs=count) for name, count in refs.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0024_fotovariante'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FotoBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=255, unique=True)),
+                ('refs', models.PositiveIntegerField(default=0)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='foto_final',
+            field=models.ImageField(blank=True, null=True, storage=tasks.storage.foto_storage, upload_to='fotos/'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='foto_inicial',
+            field=models.ImageField(blank=True, null=True, storage=tasks.storage.foto_storage, upload_to='fotos/'),
+        ),
+        migrations.RunPython(count_existing_photos, migrations.RunPython.noop),
+    ]
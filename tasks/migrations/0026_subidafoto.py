@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:04
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0025_fotoblob_content_addressed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubidaFoto',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('campo', models.CharField(max_length=20)),
+                ('nombre_archivo', models.CharField(max_length=255)),
+                ('tamano', models.PositiveBigIntegerField()),
+                ('sha256', models.CharField(blank=True, default='', max_length=64)),
+                ('recibido', models.PositiveBigIntegerField(default=0)),
+                ('estado', models.CharField(choices=[('abierta', 'Abierta'), ('completa', 'Completa'), ('cancelada', 'Cancelada')], default='abierta', max_length=10)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('actualizado_en', models.DateTimeField(auto_now=True, db_index=True)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subidas', to='tasks.task')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
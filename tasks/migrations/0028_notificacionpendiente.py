@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0027_gptjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificacionPendiente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('canal', models.CharField(choices=[('email', 'Email'), ('whatsapp', 'WhatsApp')], max_length=10)),
+                ('destino', models.CharField(max_length=254)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notificaciones_pendientes', to='tasks.evento')),
+                ('report', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='tasks.report')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['canal', 'destino', 'creado_en'], name='notifpendiente_cola_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='notificacionpendiente',
+            constraint=models.UniqueConstraint(fields=('canal', 'destino', 'evento'), name='notifpendiente_unica'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0028_notificacionpendiente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMensaje',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_name', models.CharField(max_length=200)),
+                ('args', models.JSONField(default=list)),
+                ('kwargs', models.JSONField(default=dict)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('disponible_en', models.DateTimeField(default=django.utils.timezone.now)),
+                ('intentos', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['disponible_en', 'id'], name='outbox_disponible_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0029_outboxmensaje'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('canal', models.CharField(choices=[('email', 'Email'), ('whatsapp', 'WhatsApp')], max_length=10)),
+                ('destino', models.CharField(max_length=254)),
+                ('estado', models.CharField(choices=[('enviado', 'Enviado'), ('fallido', 'Fallido')], max_length=10)),
+                ('intentos', models.PositiveIntegerField(default=1)),
+                ('latencia_ms', models.FloatField(blank=True, null=True)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='tasks.evento')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['actualizado_en', 'canal'], name='delivery_ventana_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='notificationdelivery',
+            constraint=models.UniqueConstraint(fields=('evento', 'canal', 'destino'), name='delivery_unica'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0030_notificationdelivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='empleado',
+            name='celular_e164',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='participante',
+            name='celular_e164',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+    ]
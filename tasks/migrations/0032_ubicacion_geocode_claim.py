@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0031_celular_e164'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ubicacion',
+            name='geocode_bloqueado_hasta',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0032_ubicacion_geocode_claim'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenBucketState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=100, unique=True)),
+                ('tokens', models.FloatField()),
+                ('marca', models.FloatField(help_text='time.time() of the last refill')),
+            ],
+        ),
+    ]
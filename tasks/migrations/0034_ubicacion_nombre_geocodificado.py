@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0033_tokenbucketstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ubicacion',
+            name='nombre_geocodificado',
+            field=models.BooleanField(default=False),
+        ),
+    ]
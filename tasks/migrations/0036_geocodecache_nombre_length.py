@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:48
+
+from django.db import migrations, models
+from django.db.models.functions import Length
+
+
+def drop_long_entries(apps, schema_editor):
+    # cached names longer than Ubicacion.nombre; they are fetched again on demand
+    GeocodeCache = apps.get_model('tasks', 'GeocodeCache')
+    GeocodeCache.objects.annotate(largo=Length('nombre')).filter(largo__gt=150).delete()
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0035_notificationdelivery_claim'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_long_entries, reverse_code=noop),
+        migrations.AlterField(
+            model_name='geocodecache',
+            name='nombre',
+            field=models.CharField(max_length=150),
+        ),
+    ]
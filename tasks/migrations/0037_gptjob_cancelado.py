@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0036_geocodecache_nombre_length'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='gptjob',
+            name='estado',
+            field=models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('completo', 'Completo'), ('error', 'Error'), ('cancelado', 'Cancelado')], default='pendiente', max_length=12),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0037_gptjob_cancelado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='empleado',
+            name='celular_e164_origen',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='participante',
+            name='celular_e164_origen',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+    ]
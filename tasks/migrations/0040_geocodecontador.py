@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0039_backfillcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeContador',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=100, unique=True)),
+                ('valor', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -1,7 +1,11 @@
-from django.db import models
+import uuid
+
+from django.db import models, transaction
 from django.utils import timezone
 from django.contrib.auth.models import User
 
+from .storage import foto_storage
+
 def get_default_task():
     # Attempt to get a default task, or create one if it doesn't exist
     task, created = Task.objects.get_or_create(
@@ -23,8 +27,9 @@ class Task(models.Model):
     description = models.TextField(blank=True)
     fecha_creacion = models.DateTimeField(default=timezone.now)
     fecha_resolucion = models.DateTimeField(null=True, blank=True)
-    foto_inicial = models.ImageField(upload_to="fotos/", null=True, blank=True)
-    foto_final = models.ImageField(upload_to="fotos/", null=True, blank=True)
+    # stored by content hash; identical uploads share one file (tasks/storage.py)
+    foto_inicial = models.ImageField(upload_to="fotos/", storage=foto_storage, null=True, blank=True)
+    foto_final = models.ImageField(upload_to="fotos/", storage=foto_storage, null=True, blank=True)
     reportado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name="reportes_creados")
     resuelto_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="reportes_resueltos")
     campus = models.CharField(max_length=100, default="Montejo")
@@ -43,6 +48,25 @@ class Task(models.Model):
         'Ubicacion', null=False, blank=False, on_delete=models.PROTECT, related_name='task'
     )
 
+    class Meta:
+        # Composite indexes backing the keyset-paginated list: every supported
+        # filter is paired with the (fecha_creacion, id) cursor ordering so a
+        # page is an index range scan regardless of table size.
+        indexes = [
+            models.Index(fields=['fecha_creacion', 'id'], name='task_fecha_id_idx'),
+            models.Index(fields=['done', 'fecha_creacion', 'id'], name='task_done_fecha_idx'),
+            models.Index(fields=['campus', 'fecha_creacion', 'id'], name='task_campus_fecha_idx'),
+            models.Index(fields=['prioridad', 'fecha_creacion', 'id'], name='task_prioridad_fecha_idx'),
+            models.Index(fields=['reportado_por', 'fecha_creacion', 'id'], name='task_reportado_fecha_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # the pre_save receivers lock the stored row (SELECT ... FOR UPDATE) to
+        # read the values CampusStats counts it under; keep that lock until the
+        # post_save receivers have applied the deltas
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return self.title
 
@@ -69,6 +93,10 @@ class Empleado(models.Model):
     puesto = models.CharField(max_length=50, null=True, blank=True, default="")
     email = models.EmailField(max_length=50, null=True, blank=True, default="")
     celular = models.CharField(max_length=10, null=True, blank=True, default="")
+    # celular normalized to E.164 on save (blank when invalid); see tasks/notifications.py
+    celular_e164 = models.CharField(max_length=20, blank=True, default="")
+    # the celular value celular_e164 was computed from; a mismatch means it is stale
+    celular_e164_origen = models.CharField(max_length=20, blank=True, default="")
 
     def __str__(self):
         return self.nombre_empleado  
@@ -88,6 +116,8 @@ class Participante(models.Model):
     organizacion = models.CharField(max_length=120, blank=True, default='')
     email = models.EmailField(max_length=100, blank=True, default='')
     celular = models.CharField(max_length=20, blank=True, default='')
+    celular_e164 = models.CharField(max_length=20, blank=True, default='')
+    celular_e164_origen = models.CharField(max_length=20, blank=True, default='')
     creado_en = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -129,42 +159,325 @@ class Ubicacion(models.Model):
     creado_en = models.DateTimeField(auto_now_add=True)
     # status: processing while a background job reverse-geocodes the coords
     status = models.CharField(max_length=20, default='ready')
+    # geohash of (lat, lon), filled on save; prefix lookups on this indexed
+    # column find nearby locations without scanning the table
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True)
+    # True when nombre came from the reverse geocoder; only those names are
+    # reused for nearby lookups, never the ones typed by a user
+    nombre_geocodificado = models.BooleanField(default=False)
+    # reverse-geocode job claim (see tasks/geocode_queue.py): while in the
+    # future, a job is scheduled or running and no other one is enqueued
+    geocode_bloqueado_hasta = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        # bounding-box filters for the task map scan this range index
+        indexes = [
+            models.Index(fields=['lat', 'lon'], name='ubicacion_lat_lon_idx'),
+        ]
 
     # Optional thumbnail or static map image (future enhancement)
     # thumbnail = models.ImageField(upload_to='ubicaciones/', null=True, blank=True)
 
+    def save(self, *args, **kwargs):
+        # the job claim is written only by geocode_queue's UPDATEs; a full save
+        # of an instance loaded earlier must not clear (or revive) it
+        if not args and not self._state.adding and kwargs.get('update_fields') is None \
+                and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != 'geocode_bloqueado_hasta'
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.nombre} ({self.lat},{self.lon}) [{self.status}]"
 
 
+class CampusStats(models.Model):
+    """Per-campus task counters kept in sync incrementally by Task signals.
+
+    Dashboards read one row per campus instead of counting over tasks. The
+    `rebuild_campus_stats` management command recomputes the table and
+    reports drift (e.g. after bulk `QuerySet.update()` calls that bypass
+    signals).
+    """
+    campus = models.CharField(max_length=100, unique=True)
+    total = models.IntegerField(default=0)
+    abiertas = models.IntegerField(default=0)
+    cerradas = models.IntegerField(default=0)
+    alta = models.IntegerField(default=0)
+    media = models.IntegerField(default=0)
+    baja = models.IntegerField(default=0)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['campus']
+
+    def __str__(self):
+        return f"{self.campus}: {self.abiertas} abiertas / {self.cerradas} cerradas"
+
+
+class GeocodeCache(models.Model):
+    """Reverse-geocode results keyed by coordinates rounded to a grid cell.
+
+    Reports cluster on a handful of campus buildings, so nearby coordinates
+    share one row. Rows expire after GEOCODE_CACHE_TTL and the least recently
+    used ones are evicted beyond GEOCODE_CACHE_MAX_ENTRIES.
+    """
+    celda = models.CharField(max_length=40, unique=True)
+    lat = models.DecimalField(max_digits=9, decimal_places=6)
+    lon = models.DecimalField(max_digits=9, decimal_places=6)
+    # same length as Ubicacion.nombre, which cached names are copied into
+    nombre = models.CharField(max_length=150)
+    creado_en = models.DateTimeField(auto_now_add=True)
+    ultimo_uso = models.DateTimeField(default=timezone.now, db_index=True)
+    hits = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.celda}: {self.nombre}"
+
+
+class TokenBucketState(models.Model):
+    """Shared state of a geocoders.TokenBucket (tokens left and last refill).
+
+    Kept in the database so every web and worker process draws from the same
+    bucket whatever cache backend is configured.
+    """
+    clave = models.CharField(max_length=100, unique=True)
+    tokens = models.FloatField()
+    marca = models.FloatField(help_text='time.time() of the last refill')
+
+    def __str__(self):
+        return f"{self.clave}: {self.tokens:.2f}"
+
+
+class GeocodeContador(models.Model):
+    """A geocoding counter (cache hits, jobs enqueued, ...) shared by all processes."""
+    clave = models.CharField(max_length=100, unique=True)
+    valor = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.clave}: {self.valor}"
+
+
+class BackfillCheckpoint(models.Model):
+    """Last id a bulk backfill command finished, so --resume survives restarts."""
+    clave = models.CharField(max_length=100, unique=True)
+    ultimo_id = models.BigIntegerField(default=0)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.clave}: {self.ultimo_id}"
+
+
+class FotoBlob(models.Model):
+    """Reference count of Task photo fields pointing at one stored file."""
+    nombre = models.CharField(max_length=255, unique=True)
+    refs = models.PositiveIntegerField(default=0)
+    creado_en = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.nombre} ({self.refs})"
+
+
+class FotoVariante(models.Model):
+    """Resized copy of a Task photo, generated in the background.
+
+    See tasks/imagenes.py. `origen` is the name of the photo the copy was made
+    from, so a replaced photo is detected and its variants regenerated.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='foto_variantes')
+    campo = models.CharField(max_length=20)  # foto_inicial | foto_final
+    variante = models.CharField(max_length=20)  # thumb | medium
+    formato = models.CharField(max_length=10)  # webp | jpeg
+    archivo = models.FileField(max_length=255)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    peso_bytes = models.PositiveIntegerField(default=0)
+    origen = models.CharField(max_length=255)
+    creado_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['campo', 'variante', 'formato']
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'campo', 'variante', 'formato'], name='foto_variante_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} {self.campo} {self.variante}.{self.formato}"
+
+
+class SubidaFoto(models.Model):
+    """Resumable chunked upload of a Task photo (see tasks/uploads.py).
+
+    Chunks are appended to a temporary file; `recibido` is the number of
+    bytes stored so far and the offset the next chunk must start at.
+    """
+    ESTADOS = [
+        ('abierta', 'Abierta'),
+        ('completa', 'Completa'),
+        ('cancelada', 'Cancelada'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='subidas')
+    campo = models.CharField(max_length=20)  # foto_inicial | foto_final
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    nombre_archivo = models.CharField(max_length=255)
+    tamano = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64, blank=True, default='')
+    recibido = models.PositiveBigIntegerField(default=0)
+    estado = models.CharField(max_length=10, choices=ESTADOS, default='abierta')
+    creado_en = models.DateTimeField(auto_now_add=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.id} {self.campo} {self.recibido}/{self.tamano} [{self.estado}]"
+
+
+class GPTJob(models.Model):
+    """Background GPT generation (see tasks/gpt_jobs.py).
+
+    Completed jobs double as the result cache: a new job whose prompt_hash
+    matches a completed one reuses its resultado without calling the model.
+    """
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('completo', 'Completo'),
+        ('error', 'Error'),
+        # streamed in the request and the client disconnected
+        ('cancelado', 'Cancelado'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, null=True, blank=True, related_name='gpt_jobs')
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    prompt = models.TextField()
+    opciones = models.JSONField(default=dict)
+    prompt_hash = models.CharField(max_length=64)
+    estado = models.CharField(max_length=12, choices=ESTADOS, default='pendiente')
+    resultado = models.TextField(blank=True, default='')
+    error = models.TextField(blank=True, default='')
+    desde_cache = models.BooleanField(default=False)
+    creado_en = models.DateTimeField(auto_now_add=True)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['prompt_hash', 'estado'], name='gptjob_hash_estado_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.id} [{self.estado}]"
+
+
+class NotificacionPendiente(models.Model):
+    """An Evento notification held for a recipient's digest (see tasks/digests.py).
+
+    Rows for the same (canal, destino) are combined into one message once the
+    oldest has waited the digest window, and deleted when it is sent.
+    """
+    CANALES = [
+        ('email', 'Email'),
+        ('whatsapp', 'WhatsApp'),
+    ]
+
+    canal = models.CharField(max_length=10, choices=CANALES)
+    destino = models.CharField(max_length=254)
+    evento = models.ForeignKey(Evento, on_delete=models.CASCADE, related_name='notificaciones_pendientes')
+    report = models.ForeignKey(Report, on_delete=models.SET_NULL, null=True, blank=True)
+    creado_en = models.DateTimeField(auto_now_add=True)
+    intentos = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['canal', 'destino', 'evento'], name='notifpendiente_unica'),
+        ]
+        indexes = [
+            models.Index(fields=['canal', 'destino', 'creado_en'], name='notifpendiente_cola_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.canal}:{self.destino} evento={self.evento_id}"
+
+
+class NotificationDelivery(models.Model):
+    """Outcome of notifying one recipient about one Evento (see tasks/deliveries.py).
+
+    The row is claimed as 'pendiente' before sending; a delivery already
+    claimed or 'enviado' is not sent again, so Celery retries and duplicate
+    enqueues do not resend it. A digest message records one row per evento it
+    covers.
+    """
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('enviado', 'Enviado'),
+        ('fallido', 'Fallido'),
+    ]
+
+    canal = models.CharField(max_length=10, choices=NotificacionPendiente.CANALES)
+    destino = models.CharField(max_length=254)
+    evento = models.ForeignKey(Evento, on_delete=models.CASCADE, related_name='deliveries')
+    estado = models.CharField(max_length=10, choices=ESTADOS)
+    intentos = models.PositiveIntegerField(default=1)
+    latencia_ms = models.FloatField(null=True, blank=True)
+    # claim of the job sending it while 'pendiente'
+    reclamo = models.UUIDField(null=True, blank=True, editable=False)
+    creado_en = models.DateTimeField(auto_now_add=True)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['evento', 'canal', 'destino'], name='delivery_unica'),
+        ]
+        indexes = [
+            models.Index(fields=['actualizado_en', 'canal'], name='delivery_ventana_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.canal}:{self.destino} evento={self.evento_id} [{self.estado}]"
+
+
+class OutboxMensaje(models.Model):
+    """A Celery task call waiting to be handed to the broker (see tasks/outbox.py).
+
+    Written in the same transaction as the rows it refers to, so the call
+    exists exactly when they do; the relay deletes it once the broker has it.
+    """
+    task_name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    creado_en = models.DateTimeField(auto_now_add=True)
+    disponible_en = models.DateTimeField(default=timezone.now)
+    intentos = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['disponible_en', 'id'], name='outbox_disponible_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_name}{tuple(self.args)}"
+
+
 # Post-save safety net: if a Ubicacion exists in a non-ready state, ensure the
-# reverse_geocode_and_update task is scheduled. Use transaction.on_commit to
-# avoid enqueuing before the DB commit and respect CELERY_TASK_ALWAYS_EAGER.
+# reverse_geocode_and_update task is scheduled. geocode_queue defers the
+# enqueue to transaction.on_commit and drops it if a job for the same
+# Ubicacion is already scheduled or running.
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.db import transaction
-from django.conf import settings
 
 
 @receiver(post_save, sender=Ubicacion)
-def ensure_reverse_geocode_enqueued(sender, instance, created, **kwargs):
+def ensure_reverse_geocode_enqueued(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
     try:
         if instance.status != 'ready':
-            # lazily import the task
-            from .tasks import reverse_geocode_and_update
-
-            def _enqueue():
-                try:
-                    if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False):
-                        reverse_geocode_and_update(instance.id)
-                    else:
-                        reverse_geocode_and_update.delay(instance.id)
-                except Exception:
-                    # log but don't raise in signal handler
-                    import logging
-                    logging.getLogger(__name__).exception('Error encolando reverse_geocode desde post_save')
-
-            transaction.on_commit(_enqueue)
+            from .geocode_queue import enqueue_reverse_geocode
+            enqueue_reverse_geocode(instance.id)
     except Exception:
         import logging
         logging.getLogger(__name__).exception('Error en ensure_reverse_geocode_enqueued')
@@ -1,9 +1,15 @@
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from django.conf import settings
-from django.core.mail import send_mail, EmailMultiAlternatives
+from django.core.mail import send_mail, EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
 from datetime import datetime
 
+from . import deliveries as delivery_log
+from .whatsapp import TwilioWhatsApp, WhatsAppError, get_whatsapp
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -12,10 +18,17 @@ except Exception:
     phonenumbers = None
 
 
+# distinct (number, region) pairs kept by the in-process normalization cache
+PHONE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=PHONE_CACHE_SIZE)
 def _normalize_phone(number, default_region=None):
     """Normalize and validate phone number using phonenumbers.
 
     Returns E.164 string or None if invalid or phonenumbers not available.
+    Results are memoized per process; saved Empleado/Participante rows keep
+    theirs in `celular_e164` (see `set_celular_e164`).
     """
     if not number:
         return None
@@ -32,15 +45,45 @@ def _normalize_phone(number, default_region=None):
         return None
 
 
-def _send_email(subject, text_body, recipient_list, context=None, template_html=None):
+def set_celular_e164(instance):
+    """Store the E.164 form of `instance.celular` and the value it came from.
+
+    Return True if either changed.
+    """
+    celular = instance.celular or ''
+    e164 = _normalize_phone(celular or None, default_region=getattr(settings, 'PHONE_DEFAULT_REGION', None)) or ''
+    changed = (instance.celular_e164, instance.celular_e164_origen) != (e164, celular)
+    instance.celular_e164 = e164
+    instance.celular_e164_origen = celular
+    return changed
+
+
+def _phone_e164(person):
+    """E.164 number of an Empleado/Participante: the stored one, else normalized now.
+
+    The stored number is used only while `celular_e164_origen` still equals
+    `celular`; writes that skip the pre_save signal or leave the column out
+    of update_fields (QuerySet.update(), save(update_fields=['celular']))
+    make it stale, and the number is parsed again instead.
+    """
+    if person is None:
+        return None
+    celular = getattr(person, 'celular', None) or ''
+    if celular and getattr(person, 'celular_e164_origen', None) == celular:
+        # blank means the number was already found invalid
+        return getattr(person, 'celular_e164', '') or None
+    return _normalize_phone(celular, default_region=getattr(settings, 'PHONE_DEFAULT_REGION', None)) if celular else None
+
+
+def _send_email(subject, text_body, recipient_list, context=None, template_html=None, connection=None):
     try:
         if template_html:
             html_content = render_to_string(template_html, context or {})
         else:
             html_content = None
 
-        # Send multi-part email
-        msg = EmailMultiAlternatives(subject=subject, body=text_body, from_email=settings.DEFAULT_FROM_EMAIL, to=recipient_list)
+        # Send multi-part email; `connection` lets a batch share one SMTP session
+        msg = EmailMultiAlternatives(subject=subject, body=text_body, from_email=settings.DEFAULT_FROM_EMAIL, to=recipient_list, connection=connection)
         if html_content:
             msg.attach_alternative(html_content, 'text/html')
         msg.send(fail_silently=False)
@@ -52,40 +95,171 @@ def _send_email(subject, text_body, recipient_list, context=None, template_html=
 
 
 def _send_whatsapp_via_twilio(to_number, body):
+    """Send one WhatsApp message through the WHATSAPP_BACKEND sender."""
+    sender = get_whatsapp()
+    if isinstance(sender, TwilioWhatsApp) and not sender.configured:
+        logger.warning('Twilio no configurado; no se enviará WhatsApp')
+        return False
     try:
-        from twilio.rest import Client
-
-        account_sid = getattr(settings, 'TWILIO_ACCOUNT_SID', None)
-        auth_token = getattr(settings, 'TWILIO_AUTH_TOKEN', None)
-        whatsapp_from = getattr(settings, 'TWILIO_WHATSAPP_FROM', None)
-
-        if not (account_sid and auth_token and whatsapp_from):
-            logger.warning('Twilio no configurado; no se enviará WhatsApp')
-            return False
-
-        client = Client(account_sid, auth_token)
-        message = client.messages.create(
-            body=body,
-            from_=f'whatsapp:{whatsapp_from}',
-            to=f'whatsapp:{to_number}'
-        )
-        logger.info(f"WhatsApp enviado SID={message.sid} to={to_number}")
+        sid = sender.send(to_number, body)
+        logger.info(f"WhatsApp enviado SID={sid} to={to_number}")
         return True
+    except WhatsAppError as e:
+        logger.error(f"Error al enviar WhatsApp a {to_number}: {e}")
+        return False
     except Exception as e:
         logger.exception(f"Error al enviar WhatsApp: {e}")
         return False
 
 
-def send_notifications_for_event(evento, report=None):
+class NotificationDispatcher:
+    """Sends a batch of notifications over shared connections.
+
+    Used as a context manager: a single SMTP connection (get_connection) is
+    opened for every email in the batch, and WhatsApp messages are sent
+    concurrently by up to NOTIFICATIONS_WHATSAPP_WORKERS threads sharing the
+    process-wide sender. Each send is recorded in `deliveries` with its
+    latency in milliseconds.
+    """
+
+    def __init__(self, max_workers=None, connection=None):
+        self.max_workers = max_workers or int(getattr(settings, 'NOTIFICATIONS_WHATSAPP_WORKERS', 8))
+        self.connection = connection
+        self.deliveries = []
+
+    def __enter__(self):
+        if self.connection is None:
+            self.connection = get_connection()
+        try:
+            self.connection.open()
+        except Exception:
+            # sending will retry the connection and report the failure per message
+            logger.exception('No se pudo abrir la conexión de correo')
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self.connection.close()
+        except Exception:
+            logger.exception('Error cerrando la conexión de correo')
+
+    def _timed(self, canal, destino, send):
+        started = time.monotonic()
+        ok = send()
+        delivery = {
+            'canal': canal,
+            'destino': destino,
+            'ok': bool(ok),
+            'latencia_ms': round((time.monotonic() - started) * 1000, 1),
+        }
+        logger.info('Notificación %(canal)s a %(destino)s ok=%(ok)s en %(latencia_ms)s ms', delivery)
+        return delivery
+
+    def send_email(self, subject, text_body, recipient_list, context=None, template_html=None):
+        delivery = self._timed('email', ', '.join(recipient_list), lambda: _send_email(
+            subject, text_body, recipient_list, context=context, template_html=template_html,
+            connection=self.connection,
+        ))
+        # one message, but one delivery per recipient for the log
+        self.deliveries.extend({**delivery, 'destino': destino} for destino in recipient_list)
+        return delivery['ok']
+
+    def send_whatsapp(self, numbers, body):
+        """Send body to every distinct number in parallel; return True if any succeeded."""
+        deliveries = self.send_whatsapp_messages([(num, body) for num in dict.fromkeys(numbers)])
+        return any(d['ok'] for d in deliveries)
+
+    def send_whatsapp_messages(self, messages):
+        """Send (number, body) pairs in parallel; return their deliveries."""
+        if not messages:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(messages))) as pool:
+            deliveries = list(pool.map(
+                lambda msg: self._timed('whatsapp', msg[0], lambda: _send_whatsapp_via_twilio(*msg)),
+                messages,
+            ))
+        self.deliveries.extend(deliveries)
+        return deliveries
+
+
+def _email_recipients(evento):
+    """Email addresses notified for an Evento: its empleado, else the ADMINS."""
+    empleado = getattr(evento, 'empleado', None)
+    recipients = []
+    if empleado and getattr(empleado, 'email', None):
+        recipients.append(empleado.email)
+
+    if not recipients:
+        admins = getattr(settings, 'ADMINS', [])
+        recipients = [a[1] for a in admins]
+    return recipients
+
+
+def _whatsapp_numbers(evento):
+    """Validated E.164 numbers of the empleado and participantes of an Evento.
+
+    Load the evento with `load_evento` so participantes come prefetched.
+    """
+    people = [getattr(evento, 'empleado', None)]
+    # include participantes' phones
+    try:
+        people.extend(evento.participantes.all())
+    except Exception:
+        pass
+    return [num for num in (_phone_e164(p) for p in people) if num]
+
+
+def load_evento(evento_id):
+    """Evento with everything notifications read: empleado, task and participantes."""
+    from .models import Evento
+
+    return (
+        Evento.objects.select_related('empleado', 'reporte')
+        .prefetch_related('participantes')
+        .get(pk=evento_id)
+    )
+
+
+def _task_link(tarea):
+    site_url = getattr(settings, 'BACKEND_URL', '')
+    return f"{site_url}/tasks/{tarea.id}" if tarea else site_url
+
+
+def send_notifications_for_event(evento, report=None, dispatcher=None):
     """Send email and WhatsApp notifications for an Evento.
 
     - evento: Evento instance
     - report: optional Report instance related to the event
+    - dispatcher: optional open NotificationDispatcher to share with other
+      events; by default one is opened for this event.
+
+    Each recipient is claimed in the NotificationDelivery log before sending
+    and skipped when already sent or being sent by another job, so running it
+    again only retries what failed; every send is recorded in that log.
     """
-    results = {'email': False, 'whatsapp': False}
+    if dispatcher is None:
+        with NotificationDispatcher() as dispatcher:
+            return send_notifications_for_event(evento, report=report, dispatcher=dispatcher)
+
+    results = {'email': False, 'whatsapp': False, 'skipped': 0}
+    first_delivery = len(dispatcher.deliveries)
+    # unsaved stand-ins (e.g. in tests) have no delivery log
+    evento_id = getattr(evento, 'pk', None)
+    all_recipients = _email_recipients(evento)
+    all_numbers = list(dict.fromkeys(_whatsapp_numbers(evento)))
+    claimed = None
+    if evento_id:
+        claimed = delivery_log.claim(
+            [(evento_id, 'email', d) for d in all_recipients]
+            + [(evento_id, 'whatsapp', n) for n in all_numbers]
+        )
+
+    def pending(canal, destinos):
+        todo = destinos if claimed is None else [d for d in destinos if (evento_id, canal, d) in claimed]
+        results['skipped'] += len(destinos) - len(todo)
+        return todo
 
     tarea = getattr(evento, 'reporte', None)
-    empleado = getattr(evento, 'empleado', None)
 
     # Build context for templates
     context = {
@@ -102,55 +276,27 @@ def send_notifications_for_event(evento, report=None):
     if report:
         text_body = f"Reporte: {report.title}\n\n{report.description}\n\nAvance:\n{evento.descripcion}"
 
-    # Email recipients
-    recipients = []
-    if empleado and getattr(empleado, 'email', None):
-        recipients.append(empleado.email)
-
-    if not recipients:
-        admins = getattr(settings, 'ADMINS', [])
-        recipients = [a[1] for a in admins]
-
     # Render and send email with template if recipients exist
+    recipients = pending('email', all_recipients)
+    results['email'] = bool(all_recipients) and not recipients
     if recipients:
         template_html = 'tasks/email/event_notification.html'
-        results['email'] = _send_email(subject, text_body, recipients, context=context, template_html=template_html)
-
-    # WhatsApp via Twilio: try empleado.celular or any participante phone numbers
-    whatsapp_targets = []
-    if empleado and getattr(empleado, 'celular', None):
-        whatsapp_targets.append(empleado.celular)
-
-    # include participantes' phones
-    try:
-        for p in evento.participantes.all():
-            if p.celular:
-                whatsapp_targets.append(p.celular)
-    except Exception:
-        pass
+        results['email'] = dispatcher.send_email(subject, text_body, recipients, context=context, template_html=template_html)
 
-    # Normalize numbers
-    normalized = []
-    for num in whatsapp_targets:
-        norm = _normalize_phone(num, default_region=getattr(settings, 'PHONE_DEFAULT_REGION', None))
-        if norm:
-            normalized.append(norm)
+    normalized = pending('whatsapp', all_numbers)
+    results['whatsapp'] = bool(all_numbers) and not normalized
 
     # Compose WhatsApp message with a link to the task/report
-    if tarea:
-        link = f"{context['site_url']}/tasks/{tarea.id}"
-    else:
-        link = context['site_url']
+    link = _task_link(tarea)
 
     whatsapp_body = f"Se registró un avance en '{tarea.title if tarea else 'Tarea'}'.\n{evento.descripcion[:200]}\nVer más: {link}"
 
     if normalized:
-        sent_any = False
-        for num in set(normalized):
-            ok = _send_whatsapp_via_twilio(num, whatsapp_body)
-            sent_any = sent_any or ok
-        results['whatsapp'] = sent_any
-    else:
+        results['whatsapp'] = dispatcher.send_whatsapp(normalized, whatsapp_body)
+    elif not all_numbers:
         logger.info('No hay números validados para enviar WhatsApp')
 
+    results['deliveries'] = dispatcher.deliveries[first_delivery:]
+    if claimed:
+        delivery_log.record(claimed, ((evento_id, d) for d in results['deliveries']))
     return results
@@ -0,0 +1,84 @@
+"""Transactional outbox for Celery task calls made from request handlers.
+
+`enqueue` records the call as an OutboxMensaje row inside the caller's
+transaction instead of talking to the broker, so the request never waits on
+Redis and the call is committed or rolled back together with the rows it is
+about. `relay` drains the table to the broker in batches; it runs in the
+dedicated `manage.py relay_outbox --loop` process (Procfile `relay`), which
+must run next to the Celery worker or no notification is sent.
+
+Delivery is at least once: a row is deleted only after the broker accepted
+it, and a failed publish is retried later with exponential backoff.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboxMensaje
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF = 300
+
+
+def enqueue(task, *args, **kwargs):
+    """Record a call of Celery `task` (a task object or its dotted path)."""
+    name = task if isinstance(task, str) else task.name
+    return OutboxMensaje.objects.create(task_name=name, args=list(args), kwargs=kwargs)
+
+
+def _publish(mensaje):
+    task = import_string(mensaje.task_name)
+    # fail fast: the row stays in the outbox and is retried with backoff
+    task.apply_async(args=mensaje.args, kwargs=mensaje.kwargs, retry=False)
+
+
+def relay(batch_size=None, now=None):
+    """Hand one batch of due rows to the broker; return a summary dict.
+
+    Rows are locked with SKIP LOCKED, so several relays can run at once
+    without publishing the same row twice. The batch stops at the first
+    broker error: the remaining rows would most likely fail the same way.
+    """
+    batch_size = batch_size or int(getattr(settings, 'OUTBOX_RELAY_BATCH', 100))
+    now = now or timezone.now()
+    sent = []
+    failed = None
+    with transaction.atomic():
+        batch = list(
+            OutboxMensaje.objects.select_for_update(skip_locked=True)
+            .filter(disponible_en__lte=now)
+            .order_by('id')[:batch_size]
+        )
+        for mensaje in batch:
+            try:
+                _publish(mensaje)
+            except Exception as exc:
+                failed = mensaje
+                mensaje.intentos += 1
+                mensaje.error = str(exc)[:1000]
+                mensaje.disponible_en = now + timedelta(seconds=min(2 ** mensaje.intentos, MAX_BACKOFF))
+                mensaje.save(update_fields=['intentos', 'error', 'disponible_en'])
+                logger.warning('Outbox: no se pudo publicar %s (intento %s): %s', mensaje, mensaje.intentos, exc)
+                break
+            sent.append(mensaje.pk)
+        OutboxMensaje.objects.filter(pk__in=sent).delete()
+    return {
+        'enviados': len(sent),
+        'fallido': failed.pk if failed else None,
+        'pendientes': OutboxMensaje.objects.count(),
+    }
+
+
+def drain(batch_size=None):
+    """Relay batches until nothing due is left or the broker fails; return the count sent."""
+    total = 0
+    while True:
+        result = relay(batch_size)
+        total += result['enviados']
+        if result['fallido'] or not result['enviados']:
+            return total
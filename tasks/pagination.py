@@ -0,0 +1,14 @@
+from rest_framework.pagination import CursorPagination
+
+
+class TaskCursorPagination(CursorPagination):
+    """Keyset pagination for the tasks list.
+
+    Pages are addressed by an opaque cursor over (fecha_creacion, id), so the
+    database seeks directly to the next page through the composite indexes
+    declared on Task instead of counting/offsetting over the whole table.
+    """
+    ordering = ('-fecha_creacion', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
@@ -0,0 +1,124 @@
+"""Resolution of inline `participantes` payloads sent with new eventos.
+
+Clients may send a list (or a JSON-encoded list) mixing existing participante
+ids, ``{"id": ...}`` dicts and dicts describing new participantes. Everything
+is resolved with one ``in_bulk`` query for the ids and one ``bulk_create``
+for the new rows, and attached through bulk inserts on the M2M through table.
+"""
+import json
+import logging
+
+from django.db.models import prefetch_related_objects
+
+from .models import Participante
+from .notifications import set_celular_e164
+
+logger = logging.getLogger(__name__)
+
+
+class ParticipantesError(ValueError):
+    """The payload names participante ids that do not exist (strict mode)."""
+
+    def __init__(self, ids):
+        super().__init__(f"Participantes no encontrados: {', '.join(str(i) for i in ids)}")
+        self.ids = ids
+
+
+def parse_participantes_payload(raw):
+    """Return the payload as a list; unparseable input yields an empty list."""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return []
+    if isinstance(raw, list):
+        return raw
+    return []
+
+
+def split_participantes(data):
+    """Return (data_without_participantes, raw_participantes).
+
+    The serializer would otherwise validate each id with its own query.
+    """
+    if hasattr(data, 'getlist'):
+        raw = data.getlist('participantes')
+        if len(raw) == 1:
+            raw = raw[0]
+        data = data.copy()
+    else:
+        raw = data.get('participantes')
+        data = dict(data)
+    data.pop('participantes', None)
+    return data, raw
+
+
+def resolve_participantes(raw, strict=False):
+    """Resolve an inline payload into Participante instances, in input order.
+
+    Duplicates are collapsed. Unknown or malformed ids raise
+    ParticipantesError when `strict`, and are skipped otherwise.
+    """
+    entries = []
+    ids = []
+    new = []
+    for item in parse_participantes_payload(raw):
+        if isinstance(item, dict) and not item.get('id'):
+            part = Participante(
+                nombre=item.get('nombre', 'Sin nombre'),
+                rol=item.get('rol', 'Otro'),
+                organizacion=item.get('organizacion', ''),
+                email=item.get('email', ''),
+                celular=item.get('celular', ''),
+            )
+            # bulk_create skips the pre_save signal that normally sets it
+            set_celular_e164(part)
+            new.append(part)
+            entries.append(part)
+            continue
+        pid = item.get('id') if isinstance(item, dict) else item
+        try:
+            pid = int(pid)
+        except (TypeError, ValueError):
+            if strict:
+                raise ParticipantesError([pid])
+            continue
+        ids.append(pid)
+        entries.append(pid)
+
+    existing = Participante.objects.in_bulk(ids) if ids else {}
+    if strict:
+        missing = [pid for pid in dict.fromkeys(ids) if pid not in existing]
+        if missing:
+            raise ParticipantesError(missing)
+    if new:
+        Participante.objects.bulk_create(new)
+
+    resolved = []
+    seen = set()
+    for entry in entries:
+        part = existing.get(entry) if isinstance(entry, int) else entry
+        if part is None or part.pk in seen:
+            continue
+        seen.add(part.pk)
+        resolved.append(part)
+    return resolved
+
+
+def attach_participantes(instance, participantes, field_name='participantes'):
+    """Insert the M2M rows linking a newly created `instance` to `participantes`.
+
+    The rows go in with one bulk insert; the relation is then prefetched with
+    one query, so the serializer's `participantes` and `participantes_detail`
+    fields share it instead of reading the relation once each.
+    """
+    field = instance._meta.get_field(field_name)
+    if participantes:
+        through = field.remote_field.through
+        source = f'{field.m2m_field_name()}_id'
+        target = f'{field.m2m_reverse_field_name()}_id'
+        through.objects.bulk_create(
+            [through(**{source: instance.pk, target: p.pk}) for p in participantes],
+            ignore_conflicts=True,
+        )
+    prefetch_related_objects([instance], field_name)
@@ -0,0 +1,154 @@
+"""Minimal publish/subscribe layer for pushing status changes to waiting requests.
+
+The backend is chosen with the PUBSUB_BACKEND setting (dotted path):
+
+- RedisPubSub: Redis channels (PUBSUB_REDIS_URL), so a Celery worker can
+  wake a request blocked in any gunicorn process.
+- InProcessPubSub: in-memory queues; only reaches subscribers in the same
+  process. Used in development and tests.
+
+`cross_process` tells callers whether a publish from a Celery worker can
+reach them; long waits are only worth it when it does.
+
+Subscribe *before* reading the current state, then wait; a message published
+in between is not lost.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class InProcessSubscription:
+    def __init__(self, hub, channel):
+        self.hub = hub
+        self.channel = channel
+        self.queue = queue.Queue()
+
+    def get(self, timeout):
+        """Return the next message, or None after `timeout` seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.hub._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class InProcessPubSub:
+    cross_process = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, channel):
+        sub = InProcessSubscription(self, channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(sub)
+        return sub
+
+    def _unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.channel, [])
+            if sub in subs:
+                subs.remove(sub)
+            if not subs:
+                self._subscribers.pop(sub.channel, None)
+
+    def publish(self, channel, message):
+        with self._lock:
+            subs = list(self._subscribers.get(channel, []))
+        for sub in subs:
+            sub.queue.put(message)
+        return len(subs)
+
+
+class RedisSubscription:
+    def __init__(self, client, channel):
+        self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(channel)
+
+    def get(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            msg = self.pubsub.get_message(timeout=remaining)
+            if msg and msg.get('type') == 'message':
+                return json.loads(msg['data'])
+
+    def close(self):
+        try:
+            self.pubsub.close()
+        except Exception:
+            logger.debug('Error cerrando suscripción Redis', exc_info=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RedisPubSub:
+    cross_process = True
+
+    def __init__(self, url=None):
+        import redis
+
+        self.client = redis.Redis.from_url(url or settings.PUBSUB_REDIS_URL)
+
+    def subscribe(self, channel):
+        return RedisSubscription(self.client, channel)
+
+    def publish(self, channel, message):
+        return self.client.publish(channel, json.dumps(message))
+
+
+_pubsub = None
+
+
+def get_pubsub():
+    """Return the process-wide pub/sub backend configured by PUBSUB_BACKEND."""
+    global _pubsub
+    if _pubsub is None:
+        _pubsub = import_string(getattr(settings, 'PUBSUB_BACKEND', 'tasks.pubsub.InProcessPubSub'))()
+    return _pubsub
+
+
+@receiver(setting_changed)
+def _reset_pubsub(setting, **kwargs):
+    global _pubsub
+    if setting.startswith('PUBSUB_'):
+        _pubsub = None
+
+
+def ubicacion_channel(ubicacion_id):
+    return f'tasks:ubicacion:{ubicacion_id}'
+
+
+def publish_ubicacion(ubicacion):
+    """Push the serialized Ubicacion to requests waiting on its channel."""
+    from .serializer import UbicacionSerializer
+
+    try:
+        get_pubsub().publish(ubicacion_channel(ubicacion.pk), UbicacionSerializer(ubicacion).data)
+    except Exception:
+        logger.exception('Error publicando estado de Ubicacion %s', ubicacion.pk)
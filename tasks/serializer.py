@@ -1,5 +1,5 @@
 from rest_framework.generics import RetrieveAPIView
-from .models import Task, Empleado, Evento, Report, Compromiso, Participante, Ubicacion
+from .models import Task, Empleado, Evento, Report, Compromiso, Participante, Ubicacion, FotoVariante
 from rest_framework import serializers
 from django.contrib.auth.models import User
 
@@ -25,9 +25,19 @@ class UbicacionSerializer(serializers.ModelSerializer):
         fields = ['id', 'nombre', 'lat', 'lon', 'creado_en', 'status']
 
 
+class FotoVarianteSerializer(serializers.ModelSerializer):
+    url = serializers.FileField(source='archivo', read_only=True)
+
+    class Meta:
+        model = FotoVariante
+        fields = ['campo', 'variante', 'formato', 'url', 'width', 'height', 'peso_bytes']
+
+
 class TaskSerializer(serializers.ModelSerializer):
     ubicacion = serializers.PrimaryKeyRelatedField(queryset=Ubicacion.objects.all(), required=True, allow_null=False)
     ubicacion_detail = UbicacionSerializer(source='ubicacion', read_only=True)
+    # resized copies of foto_inicial/foto_final, filled in by a background job
+    foto_variantes = FotoVarianteSerializer(many=True, read_only=True)
     class Meta:
         model = Task
         fields = '__all__'
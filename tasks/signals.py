@@ -1,22 +1,197 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import Ubicacion
+from django.db import transaction
+from .models import Compromiso, Empleado, Evento, FotoVariante, Participante, Task, Ubicacion
+from .campus_stats import SNAPSHOT_FIELDS, apply_task_change, task_snapshot
+from .imagenes import FOTO_FIELDS, delete_variant_file, enqueue_variants
+from . import storage as foto_refs
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@receiver(pre_save, sender=Ubicacion)
+def set_ubicacion_geohash(sender, instance, raw=False, **kwargs):
+    """Keep Ubicacion.geohash in step with its coordinates."""
+    if instance.lat is not None and instance.lon is not None:
+        from .geohash import encode
+        instance.geohash = encode(instance.lat, instance.lon)
+    else:
+        instance.geohash = ''
+
+
+@receiver(pre_save, sender=Empleado)
+@receiver(pre_save, sender=Participante)
+def set_celular_e164(sender, instance, raw=False, **kwargs):
+    """Store the E.164 form of celular so notifications need not parse it."""
+    if raw:
+        return
+    from .notifications import set_celular_e164 as normalize
+    normalize(instance)
+
+
 @receiver(post_save, sender=Ubicacion)
-def enqueue_reverse_geocode_on_create(sender, instance, created, **kwargs):
-    """If an Ubicacion is created and status is processing, ensure the Celery task is enqueued.
+def publish_ubicacion_status(sender, instance, raw=False, **kwargs):
+    """Wake requests long-polling this Ubicacion once it leaves pending."""
+    if raw or instance.status in ('pending', 'processing'):
+        return
+    from .pubsub import publish_ubicacion
+    transaction.on_commit(lambda: publish_ubicacion(instance))
 
-    This is a safety net for other flows that may create Ubicacion records directly.
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Evento)
+@receiver(post_delete, sender=Evento)
+@receiver(post_save, sender=Compromiso)
+@receiver(post_delete, sender=Compromiso)
+@receiver(m2m_changed, sender=Evento.participantes.through)
+@receiver(post_save, sender=Participante)
+@receiver(post_delete, sender=Participante)
+def invalidate_dashboard_cache(sender, **kwargs):
+    """Drop the cached dashboard overview when any row it summarizes changes.
+
+    The entry is dropped again on commit so a request that re-cached it from
+    pre-commit data while the transaction was open does not keep it stale.
     """
-    if not created:
+    try:
+        from .dashboard import invalidate_dashboard_overview
+        invalidate_dashboard_overview()
+        transaction.on_commit(invalidate_dashboard_overview)
+    except Exception:
+        logger.exception('Failed to invalidate dashboard overview cache')
+
+
+@receiver(pre_save, sender=Task)
+def load_task_stats_snapshot(sender, instance, raw=False, **kwargs):
+    """Read the values CampusStats currently counts this row under.
+
+    The stored row is read rather than trusting the in-memory instance, which
+    may be stale (refresh_from_db, deferred fields, rows changed elsewhere).
+    It is locked until the save or delete commits (Task.save and the delete
+    collector both run inside a transaction), so a concurrent save of the same
+    task waits and then reads the values this one wrote. The same query
+    returns the stored photo names, used to detect uploads.
+    """
+    stored = None
+    if not raw and instance.pk is not None:
+        stored = (
+            Task.objects.select_for_update().filter(pk=instance.pk)
+            .values_list(*SNAPSHOT_FIELDS, *FOTO_FIELDS).first()
+        )
+    if stored:
+        n = len(SNAPSHOT_FIELDS)
+        instance._campus_stats_snapshot = (stored[0], bool(stored[1]), stored[2])
+        instance._stored_fotos = dict(zip(FOTO_FIELDS, stored[n:]))
+    else:
+        instance._campus_stats_snapshot = None
+        instance._stored_fotos = {}
+
+
+@receiver(post_save, sender=Task)
+def update_campus_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
         return
+    old = getattr(instance, '_campus_stats_snapshot', None)
+    apply_task_change(old=old, new=task_snapshot(instance))
+
+
+@receiver(post_save, sender=Task)
+def schedule_image_variants(sender, instance, raw=False, **kwargs):
+    """Generate thumbnails for photos that were uploaded, replaced or cleared."""
+    if raw:
+        return
+    stored = getattr(instance, '_stored_fotos', {})
+    for campo in FOTO_FIELDS:
+        if (getattr(instance, campo).name or '') != (stored.get(campo) or ''):
+            enqueue_variants(instance.pk, campo)
+
+
+@receiver(post_save, sender=Task)
+def update_foto_refs_on_save(sender, instance, raw=False, **kwargs):
+    """Move content-addressed photo references from the stored names to the new ones."""
+    if raw:
+        return
+    stored = getattr(instance, '_stored_fotos', {})
+    for campo in FOTO_FIELDS:
+        old, new = stored.get(campo) or '', getattr(instance, campo).name or ''
+        if old != new:
+            foto_refs.acquire(new)
+            foto_refs.release(old)
+
+
+@receiver(post_delete, sender=FotoVariante)
+def delete_foto_variante_file(sender, instance, **kwargs):
+    delete_variant_file(instance)
+
+
+@receiver(pre_delete, sender=Task)
+def load_task_stats_snapshot_on_delete(sender, instance, **kwargs):
+    load_task_stats_snapshot(sender, instance)
+
+
+@receiver(post_delete, sender=Task)
+def update_campus_stats_on_delete(sender, instance, **kwargs):
+    old = getattr(instance, '_campus_stats_snapshot', None)
+    apply_task_change(old=old, new=None)
+
+
+@receiver(post_delete, sender=Task)
+def release_foto_refs_on_delete(sender, instance, **kwargs):
+    for name in getattr(instance, '_stored_fotos', {}).values():
+        foto_refs.release(name)
+
+
+@receiver(post_save, sender=Evento)
+@receiver(post_delete, sender=Evento)
+def invalidate_timeline_for_evento(sender, instance, **kwargs):
+    _invalidate_timeline(instance.reporte_id)
+
+
+@receiver(post_save, sender=Compromiso)
+@receiver(post_delete, sender=Compromiso)
+def invalidate_timeline_for_compromiso(sender, instance, **kwargs):
+    _invalidate_timeline(instance.tarea_id)
+
+
+@receiver(m2m_changed, sender=Evento.participantes.through)
+@receiver(m2m_changed, sender=Compromiso.participantes.through)
+def invalidate_timeline_for_participantes(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if not reverse:
+        _invalidate_timeline(getattr(instance, 'reporte_id', None) or getattr(instance, 'tarea_id', None))
+        return
+    # participante.eventos.add(...) and friends: instance is the Participante
+    if action in ('post_add', 'post_remove'):
+        task_ids = _timeline_task_ids(model, pk__in=pk_set)
+    elif action == 'pre_clear':
+        task_ids = _timeline_task_ids(model, participantes=instance)
+    else:
+        return
+    for task_id in task_ids:
+        _invalidate_timeline(task_id)
+
+
+@receiver(post_save, sender=Participante)
+@receiver(pre_delete, sender=Participante)
+def invalidate_timeline_for_participante(sender, instance, raw=False, created=False, **kwargs):
+    """Drop the timelines that embed this participante's details."""
+    # pre_delete: the m2m rows are gone by post_delete
+    if raw or created:
+        return
+    task_ids = _timeline_task_ids(Evento, participantes=instance) | _timeline_task_ids(Compromiso, participantes=instance)
+    for task_id in task_ids:
+        _invalidate_timeline(task_id)
+
+
+def _timeline_task_ids(model, **filters):
+    field = 'reporte_id' if model is Evento else 'tarea_id'
+    return set(model.objects.filter(**filters).values_list(field, flat=True))
+
+
+def _invalidate_timeline(task_id):
     try:
-        if instance.status == 'processing':
-            from .tasks import reverse_geocode_and_update
-            reverse_geocode_and_update.delay(instance.id)
+        from .timeline import invalidate_timeline
+        invalidate_timeline(task_id)
+        transaction.on_commit(lambda: invalidate_timeline(task_id))
     except Exception:
-        logger.exception('Failed to enqueue reverse_geocode_and_update from post_save')
+        logger.exception('Failed to invalidate timeline cache for task %s', task_id)
@@ -0,0 +1,37 @@
+"""Proximity queries over Ubicacion using the indexed geohash column."""
+from django.conf import settings
+from django.db.models import Q
+
+from .geocoders import haversine_m
+from .geohash import neighbors, precision_for_radius
+from .models import Ubicacion
+
+
+def nearest_ready_ubicacion(lat, lon, radius_m=None):
+    """Return the closest ready, geocoder-named Ubicacion within radius_m metres.
+
+    Locations whose nombre was typed by a user are never returned, so one
+    user's label does not leak onto another's coordinates.
+
+    Candidates come from prefix range scans on the geohash index (the cell
+    around the point and its 8 neighbours), so the cost depends on how many
+    locations are nearby, not on the size of the table.
+    """
+    if radius_m is None:
+        radius_m = getattr(settings, 'UBICACION_REUSE_RADIUS_M', 30)
+    if not radius_m or radius_m <= 0:
+        return None
+    precision = precision_for_radius(radius_m, lat)
+    prefix_filter = Q()
+    for cell in neighbors(lat, lon, precision):
+        prefix_filter |= Q(geohash__startswith=cell)
+
+    best = None
+    candidates = Ubicacion.objects.filter(prefix_filter, status='ready', nombre_geocodificado=True).only(
+        'id', 'nombre', 'lat', 'lon', 'status',
+    )
+    for u in candidates:
+        d = haversine_m(float(lat), float(lon), float(u.lat), float(u.lon))
+        if d <= radius_m and (best is None or d < best[0]):
+            best = (d, u)
+    return best[1] if best else None
@@ -0,0 +1,135 @@
+"""Content-addressed storage for Task photos.
+
+Uploads are streamed to a temporary file while their SHA-256 is computed and
+then stored as ``<upload_to>/<h[:2]>/<sha256><ext>``. A second upload of the
+same bytes maps to the same name and its copy is dropped, so each distinct
+photo exists once on disk no matter how many tasks or fields use it.
+
+FotoBlob rows count the Task fields that reference each stored name. The
+Task signals call `acquire`/`release` as photos change; a blob is unlinked
+only when its count reaches zero, and `delete()` refuses to remove a name
+that is still referenced. Every step that reads or changes a count or the
+file behind it (the existence check in `_save`, `acquire`, `release`,
+`delete`) holds the FotoBlob row with SELECT ... FOR UPDATE, so an upload of
+the same bytes cannot reuse a file that a concurrent release is unlinking.
+`_save` runs inside Task.save()'s transaction, so the row stays locked until
+the new reference is counted. `repair_foto_refs` recounts from Task.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # the final name is derived from the content in _save
+        return name
+
+    def _save(self, name, content):
+        directory, basename = os.path.split(name)
+        ext = os.path.splitext(basename)[1].lower()
+        os.makedirs(self.path(directory or '.'), exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.path(directory or '.'), prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    out.write(chunk)
+            hexdigest = digest.hexdigest()
+            hashed = '/'.join(p for p in (directory, hexdigest[:2], f'{hexdigest}{ext}') if p)
+            target = self.path(hashed)
+            with transaction.atomic():
+                _lock_blob(hashed)
+                if os.path.exists(target):
+                    os.unlink(tmp_path)
+                else:
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    os.replace(tmp_path, target)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(target, self.file_permissions_mode)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return hashed
+
+    def delete(self, name):
+        from .models import FotoBlob
+
+        if not name:
+            return super().delete(name)
+        with transaction.atomic():
+            blob = FotoBlob.objects.select_for_update().filter(nombre=name).first()
+            if blob is not None and blob.refs > 0:
+                logger.debug('No se borra %s: sigue referenciado', name)
+                return
+            super().delete(name)
+            if blob is not None:
+                blob.delete()
+
+
+_foto_storage = ContentAddressedStorage()
+
+
+def foto_storage():
+    """Storage callable used by Task.foto_inicial/foto_final."""
+    return _foto_storage
+
+
+def _lock_blob(name):
+    """Return the FotoBlob row for `name`, created if needed and locked until commit."""
+    from .models import FotoBlob
+
+    while True:
+        FotoBlob.objects.get_or_create(nombre=name)
+        blob = FotoBlob.objects.select_for_update().filter(nombre=name).first()
+        if blob is not None:
+            return blob
+        # a concurrent delete() removed the row between the two queries
+
+
+def acquire(name):
+    """Count one more Task field referencing the stored photo `name`."""
+    from .models import FotoBlob
+
+    if not name:
+        return
+    with transaction.atomic():
+        blob = _lock_blob(name)
+        FotoBlob.objects.filter(pk=blob.pk).update(refs=F('refs') + 1)
+
+
+def release(name):
+    """Drop one reference to `name`; unlink the file after commit at zero."""
+    from .models import FotoBlob
+
+    if not name:
+        return
+    with transaction.atomic():
+        blob = FotoBlob.objects.select_for_update().filter(nombre=name).first()
+        if blob is None or blob.refs <= 0:
+            return
+        FotoBlob.objects.filter(pk=blob.pk).update(refs=F('refs') - 1)
+    if blob.refs > 1:
+        return
+
+    def _unlink():
+        try:
+            # delete() locks the row and re-checks the count, in case the
+            # photo was uploaded again since
+            _foto_storage.delete(name)
+        except Exception:
+            logger.exception('No se pudo borrar la foto %s', name)
+
+    transaction.on_commit(_unlink)
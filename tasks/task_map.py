@@ -0,0 +1,82 @@
+"""Bounding-box queries and grid clustering of task locations for map views.
+
+Clusters are computed in the database: every located task in the bounding
+box is bucketed into a grid cell by flooring its coordinates, then grouped
+with COUNT/AVG, so the response size depends on the viewport and zoom, not
+on how many tasks exist. The grid is anchored at (-90, -180) rather than at
+the bbox corner so clusters stay put while the user pans.
+"""
+from django.conf import settings
+from django.db.models import Avg, Count, F, FloatField, Q
+from django.db.models.functions import Cast, Floor
+
+MAX_ZOOM = 22
+
+
+def parse_bbox(raw):
+    """Parse 'min_lon,min_lat,max_lon,max_lat'; return (bbox, error)."""
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in str(raw or '').split(','))
+    except ValueError:
+        return None, 'bbox debe ser min_lon,min_lat,max_lon,max_lat'
+    if not (-180 <= min_lon <= max_lon <= 180 and -90 <= min_lat <= max_lat <= 90):
+        return None, 'bbox fuera de rango o invertido'
+    return (min_lon, min_lat, max_lon, max_lat), None
+
+
+def cell_degrees(zoom):
+    """Cluster cell size in degrees: TASK_MAP_CELLS_PER_TILE cells per map tile."""
+    per_tile = int(getattr(settings, 'TASK_MAP_CELLS_PER_TILE', 4))
+    return 360.0 / (2 ** zoom) / per_tile
+
+
+def _in_bbox(queryset, bbox):
+    min_lon, min_lat, max_lon, max_lat = bbox
+    return queryset.filter(
+        ubicacion__lat__gte=min_lat, ubicacion__lat__lte=max_lat,
+        ubicacion__lon__gte=min_lon, ubicacion__lon__lte=max_lon,
+    )
+
+
+def cluster_tasks(queryset, bbox, zoom):
+    """Return one aggregate per occupied grid cell inside bbox."""
+    size = cell_degrees(zoom)
+    lat = Cast('ubicacion__lat', FloatField())
+    lon = Cast('ubicacion__lon', FloatField())
+    rows = (
+        _in_bbox(queryset, bbox)
+        .annotate(gy=Floor((lat + 90.0) / size), gx=Floor((lon + 180.0) / size))
+        .values('gy', 'gx')
+        .annotate(
+            count=Count('id'),
+            lat=Avg(lat),
+            lon=Avg(lon),
+            abiertas=Count('id', filter=Q(done=False)),
+            cerradas=Count('id', filter=Q(done=True)),
+        )
+        .order_by('gy', 'gx')
+    )
+    return [
+        {
+            'lat': round(r['lat'], 6),
+            'lon': round(r['lon'], 6),
+            'count': r['count'],
+            'abiertas': r['abiertas'],
+            'cerradas': r['cerradas'],
+        }
+        for r in rows
+    ]
+
+
+def task_points(queryset, bbox, limit):
+    """Return up to `limit` individual located tasks inside bbox; (points, truncated)."""
+    rows = list(
+        _in_bbox(queryset, bbox)
+        .order_by('-fecha_creacion', '-id')
+        .values('id', 'title', 'done', 'prioridad', 'campus',
+                lat=F('ubicacion__lat'), lon=F('ubicacion__lon'), ubicacion_nombre=F('ubicacion__nombre'))[:limit + 1]
+    )
+    for r in rows:
+        r['lat'] = float(r['lat'])
+        r['lon'] = float(r['lon'])
+    return rows[:limit], len(rows) > limit
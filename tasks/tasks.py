@@ -1,12 +1,13 @@
 from celery import shared_task
+from celery.exceptions import Retry
 
 from .models import Evento
-from .notifications import send_notifications_for_event
+from .notifications import load_evento, send_notifications_for_event
 
 @shared_task
 def send_event_notifications(evento_id, report_id=None):
     try:
-        evento = Evento.objects.get(pk=evento_id)
+        evento = load_evento(evento_id)
     except Evento.DoesNotExist:
         return {'error': 'Evento no encontrado'}
 
@@ -19,57 +20,96 @@ def send_event_notifications(evento_id, report_id=None):
         except Report.DoesNotExist:
             report = None
 
+    from .digests import digest_enabled, queue_event
+    if digest_enabled():
+        return queue_event(evento, report=report)
     return send_notifications_for_event(evento, report=report)
 
 
+@shared_task
+def flush_notification_digests():
+    """Periodic task: send the notification digests whose window has elapsed."""
+    from .digests import flush
+    return flush()
+
+
+@shared_task
+def generate_gpt_report(job_id):
+    """Background task: run a queued GPTJob (see tasks/gpt_jobs.py)."""
+    from .gpt_jobs import run_job
+    return run_job(job_id)
+
+
+@shared_task
+def generate_image_variants(task_id, campo):
+    """Background task: write thumbnail/medium WebP and JPEG copies of a Task photo."""
+    from .imagenes import build_variants
+    return build_variants(task_id, campo)
+
+
 @shared_task
 def reverse_geocode_and_update(ubicacion_id):
     """Background task: reverse-geocode a Ubicacion and update its nombre/status."""
     from .models import Ubicacion
-    import requests
+    from .geocoders import GeocoderUnavailable, get_geocoder
+    from . import geocode_cache, geocode_queue
     try:
         u = Ubicacion.objects.get(pk=ubicacion_id)
     except Ubicacion.DoesNotExist:
+        geocode_queue.release(ubicacion_id)
         return {'error': 'Ubicacion no encontrada'}
 
-    # Use Celery retries to handle transient failures
+    if u.status == 'ready':
+        # a duplicate delivery or an earlier job already resolved it
+        geocode_queue.record_skipped()
+        geocode_queue.release(ubicacion_id)
+        return {'status': 'ready', 'skipped': True}
+
+    # Hold the job claim while running so our own saves below do not
+    # schedule this job again; kept across retries, released when final.
+    geocode_queue.hold(ubicacion_id)
+    retrying = False
     try:
-        params = {'format': 'jsonv2', 'lat': str(u.lat), 'lon': str(u.lon), 'zoom': 18, 'addressdetails': 1}
-        headers = {'User-Agent': 'reportesmodelo/1.0 (+https://example.com)'}
-        resp = requests.get('https://nominatim.openstreetmap.org/reverse', params=params, headers=headers, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-        nombre = data.get('display_name') or ''
-        if not nombre:
-            addr = data.get('address', {})
-            parts = []
-            for k in ('road', 'house_number', 'neighbourhood', 'suburb', 'city', 'state', 'country'):
-                v = addr.get(k)
-                if v and v not in parts:
-                    parts.append(v)
-            if parts:
-                nombre = ', '.join(parts)
-
-        if nombre:
-            u.nombre = nombre
+        cached = geocode_cache.lookup(u.lat, u.lon)
+        if cached:
+            u.nombre = cached
+            u.nombre_geocodificado = True
             u.status = 'ready'
             u.save()
-            return {'status': 'updated', 'nombre': nombre}
-
-        # If reverse geocoding returned nothing useful, mark ready (keep generated name)
-        u.status = 'ready'
-        u.save()
-        return {'status': 'ready'}
-    except requests.RequestException as exc:
-        # Transient network error -- re-raise to allow Celery to retry
+            return {'status': 'updated', 'nombre': cached, 'cache': 'hit'}
+
+        # Use Celery retries to handle transient failures
         try:
-            raise reverse_geocode_and_update.retry(exc=exc, countdown=30)
+            nombre = get_geocoder().reverse(u.lat, u.lon)
+
+            nombre = geocode_cache.store(u.lat, u.lon, nombre)
+            if nombre:
+                u.nombre = nombre
+                u.nombre_geocodificado = True
+                u.status = 'ready'
+                u.save()
+                return {'status': 'updated', 'nombre': nombre}
+
+            # If reverse geocoding returned nothing useful, mark ready (keep generated name)
+            u.status = 'ready'
+            u.save()
+            return {'status': 'ready'}
+        except GeocoderUnavailable as exc:
+            # Transient network error -- re-raise to allow Celery to retry
+            try:
+                raise reverse_geocode_and_update.retry(exc=exc, countdown=30)
+            except Retry:
+                retrying = True
+                raise
+            except Exception:
+                # If retry machinery fails, mark as failed
+                u.status = 'failed'
+                u.save()
+                return {'status': 'failed'}
         except Exception:
-            # If retry machinery fails, mark as failed
             u.status = 'failed'
             u.save()
             return {'status': 'failed'}
-    except Exception:
-        u.status = 'failed'
-        u.save()
-        return {'status': 'failed'}
+    finally:
+        if not retrying:
+            geocode_queue.release(ubicacion_id)
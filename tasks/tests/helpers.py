@@ -0,0 +1,28 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountAssertionsMixin:
+    """TestCase mixin for catching N+1 regressions in list endpoints."""
+
+    def assertConstantQueries(self, fetch, add_rows, grow_by=5):
+        """Assert `fetch()` issues the same number of queries as rows grow.
+
+        `add_rows(n)` must create n more rows visible to `fetch`. The query
+        count is captured once, rows are added, and captured again.
+        """
+        with CaptureQueriesContext(connection) as before:
+            fetch()
+        add_rows(grow_by)
+        with CaptureQueriesContext(connection) as after:
+            fetch()
+        self.assertEqual(
+            len(before),
+            len(after),
+            'Query count grew from %d to %d after adding %d rows:\n%s' % (
+                len(before),
+                len(after),
+                grow_by,
+                '\n'.join(q['sql'] for q in after.captured_queries),
+            ),
+        )
@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from tasks.campus_stats import COUNTER_FIELDS, compute_campus_stats
+from tasks.models import CampusStats, Task, Ubicacion
+
+
+class CampusStatsTests(TestCase):
+    def _make_task(self, **kwargs):
+        ub = Ubicacion.objects.create(nombre='U', lat=20.0, lon=-89.0, status='ready')
+        return Task.objects.create(title='Tarea', ubicacion=ub, **kwargs)
+
+    def _stored(self):
+        return {
+            row['campus']: row
+            for row in CampusStats.objects.values('campus', *COUNTER_FIELDS)
+        }
+
+    def assertInSync(self):
+        stored = {c: {f: row[f] for f in COUNTER_FIELDS} for c, row in self._stored().items()}
+        expected = compute_campus_stats()
+        for campus, counters in stored.items():
+            if campus not in expected:
+                self.assertTrue(all(v == 0 for v in counters.values()), counters)
+            else:
+                self.assertEqual(counters, expected[campus])
+
+    def test_signals_keep_counters_in_sync(self):
+        t1 = self._make_task(campus='Norte', prioridad='Alta')
+        t2 = self._make_task(campus='Norte')
+        self._make_task(campus='Montejo', prioridad='Baja', done=True)
+        self.assertInSync()
+        self.assertEqual(self._stored()['Norte']['abiertas'], 2)
+
+        t1.done = True
+        t1.save()
+        t2.campus = 'Montejo'
+        t2.prioridad = 'Baja'
+        t2.save()
+        self.assertInSync()
+        self.assertEqual(self._stored()['Montejo']['baja'], 2)
+
+        deferred = Task.objects.only('id').get(pk=t1.pk)
+        deferred.done = False
+        deferred.save()
+        self.assertInSync()
+
+        t1.refresh_from_db()
+        t1.delete()
+        self.assertInSync()
+        self.assertEqual(self._stored()['Norte']['total'], 0)
+
+    def test_command_detects_and_repairs_drift(self):
+        self._make_task(campus='Norte')
+        Task.objects.update(done=True)  # bypasses signals
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_campus_stats', '--check', stdout=StringIO())
+
+        out = StringIO()
+        call_command('rebuild_campus_stats', stdout=out)
+        self.assertIn('rebuilt', out.getvalue())
+        self.assertEqual(self._stored()['Norte']['cerradas'], 1)
+        call_command('rebuild_campus_stats', '--check', stdout=StringIO())
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks.models import Compromiso, Empleado, Evento, Participante, Task, Ubicacion
+
+
+class DashboardOverviewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user('supervisor', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.empleado = Empleado.objects.create(
+            user=self.user, nombre_empleado='Supervisor', ubicacion='HQ', campus='Montejo'
+        )
+        self.tasks = [self._make_task(i, done=(i == 0)) for i in range(3)]
+        Compromiso.objects.create(
+            tarea=self.tasks[1], descripcion='Revisar', fecha_compromiso=timezone.now() + timedelta(days=2)
+        )
+        Evento.objects.create(descripcion='Avance', reporte=self.tasks[1], empleado=self.empleado)
+
+    def tearDown(self):
+        cache.clear()
+
+    def _make_task(self, i, done=False):
+        ub = Ubicacion.objects.create(nombre=f'U{i}', lat=20.0, lon=-89.0, status='ready')
+        return Task.objects.create(title=f'Tarea {i}', ubicacion=ub, done=done)
+
+    def test_payload(self):
+        data = self.client.get('/api/v1/dashboard/overview/').json()
+        self.assertEqual((data['total_tasks'], data['open_tasks'], data['closed_tasks']), (3, 2, 1))
+        self.assertEqual([c['tarea'] for c in data['upcoming_compromisos']], [self.tasks[1].id])
+        self.assertEqual([e['descripcion'] for e in data['recent_eventos']], ['Avance'])
+
+    def test_repeat_hits_are_served_from_cache(self):
+        self.client.get('/api/v1/dashboard/overview/')
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get('/api/v1/dashboard/overview/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(ctx), 0)
+
+    def test_writes_invalidate_cache(self):
+        self.assertEqual(self.client.get('/api/v1/dashboard/overview/').json()['open_tasks'], 2)
+        self.tasks[2].done = True
+        self.tasks[2].save()
+        self.assertEqual(self.client.get('/api/v1/dashboard/overview/').json()['open_tasks'], 1)
+
+        Evento.objects.create(descripcion='Otro avance', reporte=self.tasks[2], empleado=self.empleado)
+        data = self.client.get('/api/v1/dashboard/overview/').json()
+        self.assertEqual(len(data['recent_eventos']), 2)
+
+        Compromiso.objects.all().delete()
+        self.assertEqual(self.client.get('/api/v1/dashboard/overview/').json()['upcoming_compromisos'], [])
+
+    def test_participante_changes_invalidate_cache(self):
+        evento = Evento.objects.get(descripcion='Avance')
+        participante = Participante.objects.create(nombre='Antes')
+        # reverse side of the m2m
+        participante.eventos.add(evento)
+        detail = self.client.get('/api/v1/dashboard/overview/').json()['recent_eventos'][0]['participantes_detail']
+        self.assertEqual([p['nombre'] for p in detail], ['Antes'])
+
+        participante.nombre = 'Después'
+        participante.save()
+        detail = self.client.get('/api/v1/dashboard/overview/').json()['recent_eventos'][0]['participantes_detail']
+        self.assertEqual([p['nombre'] for p in detail], ['Después'])
+
+        participante.delete()
+        detail = self.client.get('/api/v1/dashboard/overview/').json()['recent_eventos'][0]['participantes_detail']
+        self.assertEqual(detail, [])
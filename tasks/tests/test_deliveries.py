@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks import deliveries, digests
+from tasks.models import Empleado, Evento, NotificacionPendiente, NotificationDelivery, Participante, Task, Ubicacion
+from tasks.tasks import send_event_notifications
+from tasks.whatsapp import get_whatsapp
+
+
+@override_settings(
+    WHATSAPP_BACKEND='tasks.whatsapp.FakeWhatsApp',
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    PHONE_DEFAULT_REGION='US', BACKEND_URL='https://example.com', DEFAULT_FROM_EMAIL='no-reply@example.com',
+)
+class NotificationDeliveryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('log', password='pass')
+        empleado = Empleado.objects.create(
+            user=self.user, nombre_empleado='Ana', ubicacion='HQ', campus='Montejo',
+            email='ana@example.com', celular='2025550125',
+        )
+        ub = Ubicacion.objects.create(nombre='U', lat=20.0, lon=-89.0, status='ready')
+        self.evento = Evento.objects.create(
+            descripcion='Avance', reporte=Task.objects.create(title='T', ubicacion=ub), empleado=empleado,
+        )
+        self.evento.participantes.add(Participante.objects.create(nombre='P', celular='202-555-0133'))
+        get_whatsapp().outbox.clear()
+        get_whatsapp().failing = set()
+
+    def _log(self):
+        return {
+            (d.canal, d.destino): (d.estado, d.intentos)
+            for d in NotificationDelivery.objects.filter(evento=self.evento)
+        }
+
+    def test_retried_job_only_resends_failed_recipients(self):
+        get_whatsapp().failing = {'+12025550133'}
+        first = send_event_notifications.run(self.evento.id)
+        self.assertEqual(first['skipped'], 0)
+        self.assertEqual(self._log(), {
+            ('email', 'ana@example.com'): ('enviado', 1),
+            ('whatsapp', '+12025550125'): ('enviado', 1),
+            ('whatsapp', '+12025550133'): ('fallido', 1),
+        })
+
+        get_whatsapp().failing = set()
+        again = send_event_notifications.run(self.evento.id)
+        self.assertEqual(again['skipped'], 2)
+        self.assertTrue(again['email'] and again['whatsapp'])
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual([m['to'] for m in get_whatsapp().outbox], ['+12025550125', '+12025550133'])
+        self.assertEqual(self._log()[('whatsapp', '+12025550133')], ('enviado', 2))
+
+        # nothing left to send
+        self.assertEqual(send_event_notifications.run(self.evento.id)['deliveries'], [])
+
+    def test_recipients_are_claimed_before_sending(self):
+        key = (self.evento.id, 'whatsapp', '+12025550133')
+        self.assertEqual(list(deliveries.claim([key])), [key])
+        # a concurrent job finds the recipient claimed and skips it
+        self.assertEqual(deliveries.claim([key]), {})
+        result = send_event_notifications.run(self.evento.id)
+        self.assertEqual(result['skipped'], 1)
+        self.assertEqual([m['to'] for m in get_whatsapp().outbox], ['+12025550125'])
+        self.assertEqual(self._log()[('whatsapp', '+12025550133')], ('pendiente', 0))
+
+        # a claim whose job died is taken over after the timeout
+        NotificationDelivery.objects.filter(destino='+12025550133').update(
+            actualizado_en=timezone.now() - timedelta(minutes=11),
+        )
+        send_event_notifications.run(self.evento.id)
+        self.assertEqual(self._log()[('whatsapp', '+12025550133')], ('enviado', 1))
+
+    @override_settings(NOTIFICATIONS_DIGEST_MINUTES=5)
+    def test_digest_skips_eventos_already_delivered(self):
+        send_event_notifications.run(self.evento.id)
+        NotificationDelivery.objects.create(evento=self.evento, canal='email', destino='ana@example.com', estado='enviado')
+
+        result = digests.flush(now=timezone.now() + timedelta(minutes=6))
+        self.assertEqual((result['destinatarios'], result['notificaciones']), (2, 3))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(len(get_whatsapp().outbox), 2)
+        self.assertFalse(NotificacionPendiente.objects.exists())
+        self.assertEqual({estado for estado, _ in self._log().values()}, {'enviado'})
+
+    def test_metrics_endpoint(self):
+        get_whatsapp().failing = {'+12025550133'}
+        send_event_notifications.run(self.evento.id)
+        NotificationDelivery.objects.filter(canal='whatsapp', estado='enviado').update(latencia_ms=40.0)
+        NotificationDelivery.objects.filter(canal='whatsapp', estado='fallido').update(latencia_ms=900.0)
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        self.assertEqual(client.get('/api/v1/notifications/metrics/?minutes=0').status_code, 400)
+        data = client.get('/api/v1/notifications/metrics/?minutes=10').json()
+        self.assertEqual(data['minutos'], 10)
+        whatsapp = data['canales']['whatsapp']
+        self.assertEqual((whatsapp['total'], whatsapp['fallidos'], whatsapp['tasa_fallo']), (2, 1, 0.5))
+        self.assertEqual((whatsapp['por_minuto'], whatsapp['latencia_p95_ms']), (0.2, 900.0))
+        self.assertEqual(data['canales']['email']['tasa_fallo'], 0)
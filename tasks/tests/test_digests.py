@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tasks import digests
+from tasks.models import Empleado, Evento, NotificacionPendiente, Participante, Task, Ubicacion
+from tasks.tasks import send_event_notifications
+from tasks.whatsapp import get_whatsapp
+
+
+@override_settings(
+    NOTIFICATIONS_DIGEST_MINUTES=10,
+    WHATSAPP_BACKEND='tasks.whatsapp.FakeWhatsApp',
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    PHONE_DEFAULT_REGION='US', BACKEND_URL='https://example.com', DEFAULT_FROM_EMAIL='no-reply@example.com',
+)
+class NotificationDigestTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('digest', password='pass')
+        self.empleado = Empleado.objects.create(
+            user=user, nombre_empleado='Ana', ubicacion='HQ', campus='Montejo',
+            email='ana@example.com', celular='2025550125',
+        )
+        self.participante = Participante.objects.create(nombre='Proveedor', celular='202-555-0133')
+        self.tasks = [
+            Task.objects.create(title=f'Tarea {i}', ubicacion=Ubicacion.objects.create(nombre=f'U{i}', lat=20.0 + i, lon=-89.0, status='ready'))
+            for i in range(2)
+        ]
+        get_whatsapp().outbox.clear()
+        get_whatsapp().failing = set()
+
+    def _log(self, n):
+        for i in range(n):
+            evento = Evento.objects.create(descripcion=f'Avance {i}', reporte=self.tasks[i % 2], empleado=self.empleado)
+            evento.participantes.add(self.participante)
+            send_event_notifications.run(evento.id)
+
+    def test_events_are_combined_per_recipient_after_the_window(self):
+        self._log(3)
+        # a redelivered task does not queue the evento twice
+        send_event_notifications.run(Evento.objects.first().id)
+        self.assertEqual(NotificacionPendiente.objects.count(), 9)
+        self.assertEqual((len(mail.outbox), len(get_whatsapp().outbox)), (0, 0))
+
+        self.assertEqual(digests.flush()['destinatarios'], 0)
+
+        result = digests.flush(now=timezone.now() + timedelta(minutes=11))
+        self.assertEqual((result['destinatarios'], result['notificaciones']), (3, 9))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['ana@example.com'])
+        self.assertIn('2 tareas (3)', mail.outbox[0].subject)
+        for i in range(3):
+            self.assertIn(f'Avance {i}', mail.outbox[0].body)
+        whatsapp = get_whatsapp().outbox
+        self.assertEqual(sorted(m['to'] for m in whatsapp), ['+12025550125', '+12025550133'])
+        self.assertTrue(all(m['body'].startswith('Se registraron 3 avances') for m in whatsapp))
+        self.assertFalse(NotificacionPendiente.objects.exists())
+
+    def test_plain_text_body_is_not_html_escaped(self):
+        evento = Evento.objects.create(descripcion='Válvula <3"> & tubería', reporte=self.tasks[0], empleado=self.empleado)
+        send_event_notifications.run(evento.id)
+        digests.flush(now=timezone.now() + timedelta(minutes=11))
+        self.assertIn('Válvula <3"> & tubería', mail.outbox[0].body)
+        self.assertIn('&amp;', mail.outbox[0].alternatives[0][0])
+
+    @override_settings(NOTIFICATIONS_DIGEST_MAX_ATTEMPTS=2)
+    def test_failed_recipients_are_retried_then_dropped(self):
+        self._log(2)
+        get_whatsapp().failing = {'+12025550133'}
+        later = timezone.now() + timedelta(minutes=11)
+
+        self.assertEqual(digests.flush(now=later)['fallidas'], 2)
+        self.assertEqual(
+            list(NotificacionPendiente.objects.values_list('destino', 'intentos').distinct()),
+            [('+12025550133', 1)],
+        )
+        self.assertEqual(digests.flush(now=later)['descartadas'], 2)
+        self.assertFalse(NotificacionPendiente.objects.exists())
+
+    @override_settings(NOTIFICATIONS_DIGEST_MINUTES=0)
+    def test_digest_disabled_sends_immediately(self):
+        self._log(1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(NotificacionPendiente.objects.exists())
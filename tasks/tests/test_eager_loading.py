@@ -0,0 +1,58 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from tasks.eager_loading import eager_load_plan
+from tasks.models import Empleado, Evento, Participante, Task, Ubicacion
+from tasks.serializer import CompromisoSerializer, EventoSerializer, TaskSerializer
+from tasks.tests.helpers import QueryCountAssertionsMixin
+
+
+class EagerLoadPlanTests(TestCase):
+    def test_plans_follow_serializer_declarations(self):
+        self.assertEqual(eager_load_plan(TaskSerializer), (('ubicacion',), ('foto_variantes',)))
+        self.assertEqual(eager_load_plan(EventoSerializer), ((), ('participantes',)))
+        self.assertEqual(eager_load_plan(CompromisoSerializer), ((), ('participantes',)))
+
+
+class ListQueryCountTests(QueryCountAssertionsMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('counter', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.empleado = Empleado.objects.create(
+            user=self.user, nombre_empleado='Counter', ubicacion='HQ', campus='Montejo'
+        )
+        self.task = self._make_task(0)
+        self.n = 1
+
+    def _make_task(self, i):
+        ub = Ubicacion.objects.create(nombre=f'U{i}', lat=20.0, lon=-89.0, status='ready')
+        return Task.objects.create(title=f'Tarea {i}', ubicacion=ub, reportado_por=self.user)
+
+    def _add_tasks(self, n):
+        for _ in range(n):
+            self._make_task(self.n)
+            self.n += 1
+
+    def _add_eventos(self, n):
+        for i in range(n):
+            ev = Evento.objects.create(descripcion=f'E{i}', reporte=self.task, empleado=self.empleado)
+            ev.participantes.add(Participante.objects.create(nombre=f'P{i}'))
+
+    def _get(self, url):
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return resp
+
+    def test_task_list_is_constant(self):
+        self.assertConstantQueries(lambda: self._get('/api/v1/tasks/'), self._add_tasks)
+
+    def test_evento_list_is_constant(self):
+        self._add_eventos(1)
+        self.assertConstantQueries(lambda: self._get('/api/v1/eventos/'), self._add_eventos)
+
+    def test_task_events_is_constant(self):
+        self._add_eventos(1)
+        url = f'/api/v1/tasks/{self.task.id}/events/'
+        self.assertConstantQueries(lambda: self._get(url), self._add_eventos)
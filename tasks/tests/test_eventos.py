@@ -0,0 +1,83 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tasks.eventos import create_evento
+from tasks.models import Compromiso, Empleado, Evento, OutboxMensaje, Participante, Task, Ubicacion
+
+
+class CreateEventoTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('bench', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.empleado = Empleado.objects.create(
+            user=self.user, nombre_empleado='Bench', ubicacion='HQ', campus='Montejo'
+        )
+        ub = Ubicacion.objects.create(nombre='U', lat=20.0, lon=-89.0, status='ready')
+        self.task = Task.objects.create(title='Tarea', ubicacion=ub)
+        self.existing = [Participante.objects.create(nombre=f'P{i}') for i in range(20)]
+
+    def _payload(self):
+        return {
+            'descripcion': 'Visita de obra',
+            'reporte': self.task.id,
+            'empleado': self.empleado.id,
+            'participantes': [p.id for p in self.existing] + [
+                {'nombre': f'Nuevo {i}'} for i in range(10)
+            ],
+        }
+
+    def _post(self, url):
+        with mock.patch('tasks.tasks.send_event_notifications.apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                with CaptureQueriesContext(connection) as ctx:
+                    resp = self.client.post(url, self._payload(), format='json')
+        self.assertEqual(resp.status_code, 201, resp.content)
+        evento = Evento.objects.get(pk=resp.json()['evento']['id'])
+        # the request only writes the outbox row; the broker is not touched
+        apply_async.assert_not_called()
+        mensaje = OutboxMensaje.objects.get()
+        self.assertEqual((mensaje.task_name, mensaje.args), ('tasks.tasks.send_event_notifications', [evento.id, None]))
+        return resp, evento, ctx
+
+    def assertCreated(self, resp, evento):
+        self.assertEqual(evento.participantes.count(), 30)
+        compromiso = Compromiso.objects.get(evento=evento)
+        self.assertEqual(compromiso.creado_por, self.empleado)
+        self.assertEqual(compromiso.participantes.count(), 30)
+        self.assertEqual(len(resp.json()['evento']['participantes_detail']), 30)
+        self.assertEqual(resp.json()['compromiso']['id'], compromiso.id)
+
+    def test_task_events_statement_count(self):
+        resp, evento, ctx = self._post(f'/api/v1/tasks/{self.task.id}/events/')
+        self.assertCreated(resp, evento)
+        # task lookup, reporte/empleado validation, savepoint + evento insert,
+        # participantes in_bulk + bulk_create, 2 through inserts + 2 prefetches,
+        # compromiso insert, outbox insert, release savepoint -- independent of
+        # participant count
+        self.assertEqual(len(ctx), 14, '\n'.join(q['sql'] for q in ctx.captured_queries))
+
+    def test_evento_view_statement_count(self):
+        resp, evento, ctx = self._post('/api/v1/eventos/')
+        self.assertCreated(resp, evento)
+        self.assertEqual(len(ctx), 13, '\n'.join(q['sql'] for q in ctx.captured_queries))
+        self.assertEqual(Evento.objects.count(), 1)
+
+    def test_failure_rolls_back_everything(self):
+        with mock.patch('tasks.eventos.Compromiso.objects.create', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                create_evento(
+                    task=self.task,
+                    empleado=self.empleado,
+                    descripcion='Falla',
+                    user=self.user,
+                    participantes=[{'nombre': 'Huérfano'}],
+                )
+        self.assertFalse(Evento.objects.exists())
+        self.assertFalse(Participante.objects.filter(nombre='Huérfano').exists())
+        self.assertFalse(OutboxMensaje.objects.exists())
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from tasks.models import FotoBlob, Task, Ubicacion
+
+# smallest valid GIF, so ImageField validation accepts it
+GIF = (b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00'
+       b',\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;')
+
+
+@mock.patch('tasks.tasks.generate_image_variants.delay')
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media)
+        self.override.enable()
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user('fotos', password='pass'))
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media, ignore_errors=True)
+
+    def _task(self, i, **fotos):
+        ub = Ubicacion.objects.create(nombre=f'U{i}', lat=20.0, lon=-89.0, status='ready')
+        return Task.objects.create(title=f'T{i}', ubicacion=ub, **fotos)
+
+    def _upload(self, name='foto.gif'):
+        return SimpleUploadedFile(name, GIF, content_type='image/gif')
+
+    def test_identical_uploads_share_one_file(self, _delay):
+        a = self._task(1, foto_inicial=self._upload('a.gif'), foto_final=self._upload('b.GIF'))
+        b = self._task(2, foto_inicial=self._upload('c.gif'))
+
+        digest = hashlib.sha256(GIF).hexdigest()
+        expected = f'fotos/{digest[:2]}/{digest}.gif'
+        self.assertEqual({a.foto_inicial.name, a.foto_final.name, b.foto_inicial.name}, {expected})
+        stored = [f for _, _, files in os.walk(self.media) for f in files]
+        self.assertEqual(stored, [f'{digest}.gif'])
+        self.assertEqual(FotoBlob.objects.get(nombre=expected).refs, 3)
+
+    def test_file_is_unlinked_only_after_last_reference(self, _delay):
+        a = self._task(1, foto_inicial=self._upload(), foto_final=self._upload())
+        b = self._task(2, foto_final=self._upload())
+        path = a.foto_inicial.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.delete(f'/api/v1/tasks/{a.id}/delete-image/foto_final/')
+        self.assertEqual(resp.status_code, 204)
+        a.refresh_from_db()
+        self.assertFalse(a.foto_final)
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(FotoBlob.objects.get().refs, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            a.delete()
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            b.foto_final = None
+            b.save()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(FotoBlob.objects.exists())
+
+    def test_storage_delete_keeps_referenced_files(self, _delay):
+        a = self._task(1, foto_inicial=self._upload())
+        a.foto_inicial.storage.delete(a.foto_inicial.name)
+        self.assertTrue(os.path.exists(a.foto_inicial.path))
+
+    def test_repair_command_recounts_references(self, _delay):
+        a = self._task(1, foto_inicial=self._upload(), foto_final=self._upload())
+        name, path = a.foto_inicial.name, a.foto_inicial.path
+        FotoBlob.objects.filter(nombre=name).update(refs=5)
+
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('repair_foto_refs', '--check', stdout=out)
+        self.assertIn(f'Drift in "{name}": 5 -> 2', out.getvalue())
+        call_command('repair_foto_refs', stdout=StringIO())
+        self.assertEqual(FotoBlob.objects.get(nombre=name).refs, 2)
+
+        # rows no task points at are removed along with their file
+        Task.objects.filter(pk=a.pk).update(foto_inicial='', foto_final='')
+        call_command('repair_foto_refs', stdout=StringIO())
+        self.assertFalse(FotoBlob.objects.exists())
+        self.assertFalse(os.path.exists(path))
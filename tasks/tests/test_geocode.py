@@ -0,0 +1,289 @@
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks import geocode_cache, geocode_queue
+from tasks.geocoders import OfflineGeocoder, TokenBucket, get_geocoder
+from tasks.geohash import encode, neighbors, precision_for_radius
+from tasks.models import GeocodeCache, TokenBucketState, Ubicacion
+from tasks.tasks import reverse_geocode_and_update
+
+
+class GeocodeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_nearby_coordinates_share_a_cell(self):
+        geocode_cache.store(20.96712, -89.62371, 'Edificio A')
+        self.assertEqual(geocode_cache.lookup(20.96709, -89.62368), 'Edificio A')
+        self.assertIsNone(geocode_cache.lookup(20.9690, -89.6237))
+        # counters are shared rows, not per-process cache entries
+        cache.clear()
+        stats = geocode_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 1, 1))
+
+    @override_settings(GEOCODE_CACHE_TTL=60)
+    def test_expired_entries_miss(self):
+        geocode_cache.store(20.0, -89.0, 'Viejo')
+        GeocodeCache.objects.update(creado_en=timezone.now() - timedelta(minutes=5))
+        self.assertIsNone(geocode_cache.lookup(20.0, -89.0))
+
+    @override_settings(GEOCODE_CACHE_MAX_ENTRIES=2)
+    def test_least_recently_used_entries_are_evicted(self):
+        geocode_cache.store(20.0, -89.0, 'A')
+        geocode_cache.store(20.1, -89.0, 'B')
+        GeocodeCache.objects.filter(nombre='A').update(ultimo_uso=timezone.now() + timedelta(minutes=1))
+        geocode_cache.store(20.2, -89.0, 'C')
+        self.assertEqual(set(GeocodeCache.objects.values_list('nombre', flat=True)), {'A', 'C'})
+
+
+@override_settings(UBICACION_REUSE_RADIUS_M=0)
+@mock.patch('tasks.tasks.reverse_geocode_and_update.delay')
+class GeocodeCacheFlowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user('geo', password='pass'))
+
+    @mock.patch('requests.Session.get')
+    def test_task_fills_cache_and_lookup_reuses_it(self, mock_get, _delay):
+        mock_get.return_value = mock.Mock(json=mock.Mock(return_value={'display_name': 'Rectoría, Mérida'}))
+        ub = Ubicacion.objects.create(nombre='Tmp', lat=20.5, lon=-89.5, status='pending')
+        reverse_geocode_and_update(ub.id)
+        self.assertEqual(mock_get.call_count, 1)
+
+        resp = self.client.post('/api/v1/ubicaciones/lookup/', {'lat': 20.50001, 'lon': -89.50001, 'nombre': 'Aquí'}, format='json')
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.json()['nombre'], 'Rectoría, Mérida')
+        self.assertEqual(resp.json()['status'], 'ready')
+
+        other = Ubicacion.objects.create(nombre='Tmp2', lat=20.5, lon=-89.5, status='pending')
+        result = reverse_geocode_and_update(other.id)
+        self.assertEqual(result.get('cache'), 'hit')
+        self.assertEqual(mock_get.call_count, 1)
+
+        stats = self.client.get('/api/v1/ubicaciones/geocode-cache/').json()
+        self.assertEqual(stats['hits'], 2)
+
+    @mock.patch('requests.Session.get')
+    def test_long_names_are_trimmed_once_for_row_and_cache(self, mock_get, _delay):
+        largo = 'Calle ' + 'muy larga, ' * 30
+        mock_get.return_value = mock.Mock(json=mock.Mock(return_value={'display_name': largo}))
+        ub = Ubicacion.objects.create(nombre='Tmp', lat=20.5, lon=-89.5, status='pending')
+        self.assertEqual(reverse_geocode_and_update(ub.id)['status'], 'updated')
+        ub.refresh_from_db()
+        self.assertLessEqual(len(ub.nombre), 150)
+        self.assertTrue(ub.nombre.endswith('…'))
+        self.assertEqual(GeocodeCache.objects.get().nombre, ub.nombre)
+
+
+@mock.patch('tasks.tasks.reverse_geocode_and_update.delay')
+class NearbyUbicacionReuseTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user('near', password='pass'))
+        self.ready = Ubicacion.objects.create(
+            nombre='Biblioteca Central', nombre_geocodificado=True, lat=20.96712, lon=-89.62371, status='ready',
+        )
+
+    def test_geohash_is_kept_in_step_with_coordinates(self, _delay):
+        self.assertEqual(self.ready.geohash, encode(20.96712, -89.62371))
+        self.ready.lat = None
+        self.ready.save()
+        self.assertEqual(self.ready.geohash, '')
+
+    def test_neighbour_cells_cover_the_radius(self, _delay):
+        precision = precision_for_radius(30, 20.97)
+        cells = neighbors(20.97, -89.62, precision)
+        self.assertEqual(len(cells), 9)
+        self.assertIn(encode(20.97, -89.62, precision), cells)
+
+    def test_lookup_within_radius_reuses_ready_name(self, delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post('/api/v1/ubicaciones/lookup/', {'lat': 20.96715, 'lon': -89.62374, 'nombre': 'Aquí'}, format='json')
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual((resp.json()['nombre'], resp.json()['status']), ('Biblioteca Central', 'ready'))
+        delay.assert_not_called()
+
+    def test_user_typed_names_are_not_reused(self, delay):
+        Ubicacion.objects.filter(pk=self.ready.pk).update(nombre_geocodificado=False)
+        resp = self.client.post('/api/v1/ubicaciones/lookup/', {'lat': 20.96715, 'lon': -89.62374, 'nombre': 'Aquí'}, format='json')
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp.json()['nombre'], 'Aquí')
+
+    def test_explicit_nombre_is_kept(self, delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                '/api/v1/ubicaciones/lookup/',
+                {'lat': 20.96715, 'lon': -89.62374, 'nombre': 'Mi oficina', 'nombre_explicito': True}, format='json',
+            )
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual((resp.json()['nombre'], resp.json()['status']), ('Mi oficina', 'ready'))
+        self.assertFalse(Ubicacion.objects.get(pk=resp.json()['id']).nombre_geocodificado)
+        delay.assert_not_called()
+
+    def test_lookup_outside_radius_is_geocoded(self, delay):
+        Ubicacion.objects.create(nombre='Pendiente', lat=20.96713, lon=-89.62372, status='pending')
+        resp = self.client.post('/api/v1/ubicaciones/lookup/', {'lat': 20.9690, 'lon': -89.6237, 'nombre': 'Lejos'}, format='json')
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp.json()['status'], 'pending')
+
+
+@mock.patch('tasks.tasks.reverse_geocode_and_update.delay')
+class GeocodeJobDedupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_repeated_saves_schedule_one_job(self, delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            ub = Ubicacion.objects.create(nombre='Tmp', lat=20.5, lon=-89.5, status='pending')
+            ub.nombre = 'Tmp 2'
+            ub.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            ub.save()
+        self.assertEqual(delay.call_count, 1)
+        self.assertTrue(geocode_queue.is_locked(ub.id))
+        self.assertEqual(geocode_queue.stats(), {'enqueued': 1, 'suppressed': 2, 'skipped': 0})
+
+    def test_claim_lives_in_the_database(self, delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            ub = Ubicacion.objects.create(nombre='Tmp', lat=20.5, lon=-89.5, status='pending')
+        # another process has its own cache; the claim must still be seen
+        cache.clear()
+        stale = Ubicacion.objects.get(pk=ub.pk)
+        Ubicacion.objects.filter(pk=ub.pk).update(geocode_bloqueado_hasta=None)
+        self.assertTrue(geocode_queue.acquire(ub.id))
+        # a full save of an instance loaded before the claim keeps it
+        with self.captureOnCommitCallbacks(execute=True):
+            stale.save()
+        self.assertTrue(geocode_queue.is_locked(ub.id))
+        self.assertEqual(delay.call_count, 1)
+
+    def test_lookup_schedules_once_without_suppressions(self, delay):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user('dedup', password='pass'))
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = client.post('/api/v1/ubicaciones/lookup/', {'lat': 20.1, 'lon': -89.1, 'nombre': 'Aquí'}, format='json')
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(delay.call_count, 1)
+        self.assertEqual(geocode_queue.stats()['suppressed'], 0)
+
+    @mock.patch('tasks.geocoders.NominatimGeocoder.reverse', side_effect=ValueError('respuesta inválida'))
+    def test_job_saves_do_not_reschedule_and_release_lock(self, _reverse, delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            ub = Ubicacion.objects.create(nombre='Tmp', lat=20.5, lon=-89.5, status='pending')
+        self.assertEqual(reverse_geocode_and_update(ub.id), {'status': 'failed'})
+        self.assertEqual(delay.call_count, 1)
+        self.assertFalse(geocode_queue.is_locked(ub.id))
+
+    def test_job_for_ready_ubicacion_is_skipped(self, delay):
+        ub = Ubicacion.objects.create(nombre='Lista', lat=20.5, lon=-89.5, status='ready')
+        self.assertTrue(reverse_geocode_and_update(ub.id)['skipped'])
+        self.assertEqual(geocode_queue.stats()['skipped'], 1)
+        delay.assert_not_called()
+
+
+class GazetteerMixin:
+    def setUp(self):
+        cache.clear()
+        fd, self.gazetteer = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+            json.dump([
+                {'nombre': 'Campus Norte', 'poligono': [[21.0, -89.7], [21.0, -89.6], [21.1, -89.6], [21.1, -89.7]]},
+                {'nombre': 'Biblioteca', 'lat': 20.9671, 'lon': -89.6237, 'radio_m': 50},
+            ], fh)
+
+    def tearDown(self):
+        os.remove(self.gazetteer)
+
+
+class GeocoderBackendTests(GazetteerMixin, TestCase):
+    def test_offline_geocoder_uses_polygons_then_points(self):
+        geocoder = OfflineGeocoder(self.gazetteer)
+        self.assertEqual(geocoder.reverse(21.05, -89.65), 'Campus Norte')
+        self.assertEqual(geocoder.reverse(20.9672, -89.6238), 'Biblioteca')
+        self.assertIsNone(geocoder.reverse(20.0, -89.0))
+
+    def test_backend_is_selected_from_settings(self):
+        with override_settings(GEOCODER_BACKEND='tasks.geocoders.OfflineGeocoder', GEOCODER_GAZETTEER=self.gazetteer):
+            self.assertIsInstance(get_geocoder(), OfflineGeocoder)
+            with mock.patch('requests.Session.get') as mock_get:
+                ub = Ubicacion.objects.create(nombre='Tmp', lat=21.05, lon=-89.65, status='pending')
+                reverse_geocode_and_update(ub.id)
+            mock_get.assert_not_called()
+        ub.refresh_from_db()
+        self.assertEqual((ub.nombre, ub.status), ('Campus Norte', 'ready'))
+
+    def test_token_bucket_spaces_out_requests(self):
+        bucket = TokenBucket('tests:bucket', rate=20, capacity=1)
+        start = time.monotonic()
+        for _ in range(3):
+            self.assertTrue(bucket.acquire(timeout=1))
+        # the first token is free; the next two wait ~1/20 s each
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+        slow = TokenBucket('tests:slow', rate=0.1, capacity=1)
+        self.assertTrue(slow.acquire(timeout=0.1))
+        self.assertFalse(slow.acquire(timeout=0.1))
+
+    def test_token_bucket_state_is_shared_through_the_database(self):
+        TokenBucket('tests:shared', rate=0.1, capacity=1).acquire(timeout=0.1)
+        # the process-local cache does not hold the state
+        cache.clear()
+        self.assertFalse(TokenBucket('tests:shared', rate=0.1, capacity=1).acquire(timeout=0.1))
+        self.assertLess(TokenBucketState.objects.get(clave='tests:shared').tokens, 1)
+
+
+@mock.patch('tasks.tasks.reverse_geocode_and_update.delay')
+class BackfillGeocodeCommandTests(GazetteerMixin, TestCase):
+    def test_backfill_resolves_rows_in_bulk_and_resumes(self, _delay):
+        with override_settings(GEOCODER_BACKEND='tasks.geocoders.OfflineGeocoder', GEOCODER_GAZETTEER=self.gazetteer):
+            norte = [Ubicacion.objects.create(nombre=f'N{i}', lat=21.05, lon=-89.65, status='pending') for i in range(3)]
+            lejos = Ubicacion.objects.create(nombre='Lejos', lat=20.0, lon=-89.0, status='failed')
+            held = Ubicacion.objects.create(nombre='Ocupada', lat=21.05, lon=-89.65, status='pending')
+            geocode_queue.acquire(held.id)
+            Ubicacion.objects.create(nombre='Lista', lat=21.05, lon=-89.65, status='ready')
+            # rows a running job is geocoding are not swept by default
+            Ubicacion.objects.create(nombre='En curso', lat=21.05, lon=-89.65, status='processing')
+
+            out = StringIO()
+            with mock.patch.object(OfflineGeocoder, 'reverse', autospec=True, side_effect=OfflineGeocoder.reverse) as reverse:
+                call_command('backfill_geocode', '--chunk-size', '2', '--workers', '2', stdout=out)
+            # the three rows in the same cell share one geocoder call
+            self.assertEqual(reverse.call_count, 2)
+            self.assertIn('5/5 processed', out.getvalue())
+            self.assertIn('skipped: 1', out.getvalue())
+
+        self.assertEqual(
+            set(Ubicacion.objects.filter(pk__in=[u.pk for u in norte]).values_list('nombre', 'status')),
+            {('Campus Norte', 'ready')},
+        )
+        lejos.refresh_from_db()
+        held.refresh_from_db()
+        self.assertEqual((lejos.nombre, lejos.status), ('Lejos', 'ready'))
+        self.assertEqual(held.status, 'pending')
+
+        # the checkpoint stops before the row that was skipped
+        self.assertIn(f'checkpoint id {lejos.id}', out.getvalue())
+        geocode_queue.release(held.id)
+        # a new process starts with an empty local cache; the checkpoint is in the database
+        cache.clear()
+        out = StringIO()
+        with override_settings(GEOCODER_BACKEND='tasks.geocoders.OfflineGeocoder', GEOCODER_GAZETTEER=self.gazetteer):
+            call_command('backfill_geocode', '--resume', stdout=out)
+        self.assertIn(f'1 ubicaciones to geocode (id > {lejos.id}', out.getvalue())
+        self.assertIn(f'checkpoint id {held.id}', out.getvalue())
+        held.refresh_from_db()
+        self.assertEqual(held.status, 'ready')
@@ -0,0 +1,129 @@
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from tasks import gpt_jobs
+from tasks.llm import LLMError, StubLLM
+from tasks.models import GPTJob, Report, Task, Ubicacion
+
+
+@override_settings(LLM_BACKEND='tasks.llm.StubLLM')
+@mock.patch('tasks.tasks.generate_gpt_report.delay')
+class GPTJobTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user('gpt', password='pass'))
+
+    def test_prompt_is_queued_then_served_from_cache(self, delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post('/api/v1/gpt-response/', {'prompt': 'Resume la tarea'}, format='json')
+        self.assertEqual(resp.status_code, 202)
+        job_id = resp.json()['id']
+        delay.assert_called_once_with(job_id)
+        self.assertEqual(self.client.get(f'/api/v1/gpt-jobs/{job_id}/').json()['estado'], 'pendiente')
+
+        with mock.patch.object(StubLLM, 'complete', autospec=True, side_effect=StubLLM.complete) as complete:
+            self.assertEqual(gpt_jobs.run_job(job_id), {'status': 'completo'})
+            status_resp = self.client.get(f'/api/v1/gpt-jobs/{job_id}/').json()
+            self.assertEqual(status_resp['estado'], 'completo')
+            self.assertIn('Resume la tarea', status_resp['resultado'])
+
+            delay.reset_mock()
+            again = self.client.post('/api/v1/gpt-response/', {'prompt': 'Resume la tarea'}, format='json')
+            self.assertEqual(again.status_code, 200)
+            self.assertTrue(again.json()['desde_cache'])
+            self.assertEqual(again.json()['response'], status_resp['resultado'])
+            self.assertEqual(complete.call_count, 1)
+        delay.assert_not_called()
+
+    def test_report_creation_queues_job_that_fills_gpt_report(self, delay):
+        ub = Ubicacion.objects.create(nombre='U', lat=20.0, lon=-89.0, status='ready')
+        task = Task.objects.create(title='T', ubicacion=ub)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post('/api/v1/gpt-report/', {'task': task.id, 'title': 'Fuga', 'description': 'Baño 2'})
+        self.assertEqual(resp.status_code, 201, resp.content)
+        job_id = resp.json()['gpt_job']['id']
+        delay.assert_called_once_with(job_id)
+
+        gpt_jobs.run_job(job_id)
+        report = Report.objects.get(pk=resp.json()['report']['id'])
+        self.assertIn('Generate a report', report.gpt_report)
+
+    def test_job_status_is_limited_to_its_owner(self, _delay):
+        job = gpt_jobs.submit('Privado', usuario=User.objects.create_user('otro', password='pass'))
+        self.assertEqual(self.client.get(f'/api/v1/gpt-jobs/{job.pk}/').status_code, 404)
+
+        admin = APIClient()
+        admin.force_authenticate(user=User.objects.create_superuser('admin', password='pass'))
+        self.assertEqual(admin.get(f'/api/v1/gpt-jobs/{job.pk}/').status_code, 200)
+
+    def test_backend_errors_mark_the_job_failed(self, _delay):
+        job = gpt_jobs.submit('Hola')
+        with mock.patch.object(StubLLM, 'complete', side_effect=LLMError('sin cuota')):
+            self.assertEqual(gpt_jobs.run_job(job.pk), {'status': 'error'})
+        job.refresh_from_db()
+        self.assertEqual((job.estado, job.error), ('error', 'sin cuota'))
+        # a failed job is not a cache entry
+        self.assertEqual(gpt_jobs.submit('Hola').estado, 'pendiente')
+        self.assertEqual(GPTJob.objects.count(), 2)
+
+
+def _events(resp):
+    events = []
+    for block in b''.join(resp.streaming_content).decode('utf-8').strip().split('\n\n'):
+        kind, data = block.split('\n')
+        events.append((kind[len('event: '):], json.loads(data[len('data: '):])))
+    return events
+
+
+@override_settings(LLM_BACKEND='tasks.llm.StubLLM')
+class GPTStreamingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user('stream', password='pass'))
+
+    def test_tokens_are_sent_as_the_backend_produces_them(self):
+        produced = []
+
+        def fake_stream(self, prompt, **options):
+            for piece in ('Hola', ' mundo', '!'):
+                produced.append(piece)
+                yield piece
+
+        with mock.patch.object(StubLLM, 'stream', fake_stream):
+            resp = self.client.post('/api/v1/gpt-response/', {'prompt': 'Saluda', 'stream': True}, format='json')
+            self.assertTrue(resp.streaming)
+            self.assertEqual(resp['Content-Type'], 'text/event-stream')
+            body = iter(resp.streaming_content)
+            first = next(body).decode('utf-8')
+            # the first token is on the wire before the backend produced the rest
+            self.assertIn('"Hola"', first)
+            self.assertEqual(produced, ['Hola'])
+            rest = list(body)
+        self.assertEqual(len(rest), 3)
+        job = GPTJob.objects.get()
+        self.assertEqual((job.estado, job.resultado), ('completo', 'Hola mundo!'))
+
+    def test_client_disconnect_cancels_the_job(self):
+        resp = self.client.post('/api/v1/gpt-response/', {'prompt': 'Largo', 'stream': True}, format='json')
+        body = iter(resp.streaming_content)
+        next(body)
+        # what the WSGI server does when the client goes away
+        resp.close()
+        job = GPTJob.objects.get()
+        self.assertEqual((job.estado, job.error), ('cancelado', 'Cliente desconectado'))
+
+    def test_cached_answer_is_streamed_and_errors_are_events(self):
+        first = _events(self.client.post('/api/v1/gpt-response/', {'prompt': 'Uno'}, format='json', HTTP_ACCEPT='text/event-stream'))
+        self.assertFalse(first[-1][1]['desde_cache'])
+        resp = self.client.post('/api/v1/gpt-response/', {'prompt': 'Uno', 'stream': 'true'}, format='json')
+        events = _events(resp)
+        self.assertEqual([kind for kind, _ in events], ['token', 'done'])
+        self.assertTrue(events[1][1]['desde_cache'])
+
+        with mock.patch.object(StubLLM, 'complete', side_effect=LLMError('caído')):
+            events = _events(self.client.post('/api/v1/gpt-response/', {'prompt': 'Dos', 'stream': True}, format='json'))
+        self.assertEqual(events, [('error', {'error': 'caído'})])
@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from tasks.imagenes import build_variants
+from tasks.models import FotoVariante, Task, Ubicacion
+
+
+def _png(size=(2000, 1000)):
+    buf = BytesIO()
+    Image.new('RGBA', size, (200, 30, 30, 255)).save(buf, 'PNG')
+    return SimpleUploadedFile('foto.png', buf.getvalue(), content_type='image/png')
+
+
+@mock.patch('tasks.tasks.generate_image_variants.delay')
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media, TASK_IMAGE_VARIANTS={'thumb': 320, 'medium': 1024})
+        self.override.enable()
+        ub = Ubicacion.objects.create(nombre='U', lat=20.0, lon=-89.0, status='ready')
+        self.task = Task.objects.create(title='Con foto', ubicacion=ub)
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media, ignore_errors=True)
+
+    def test_upload_schedules_job_only_for_changed_photo(self, delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.foto_inicial = _png()
+            self.task.save()
+        delay.assert_called_once_with(self.task.id, 'foto_inicial')
+
+        delay.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.done = True
+            self.task.save()
+        delay.assert_not_called()
+
+    def test_variants_are_generated_served_and_cleared(self, _delay):
+        self.task.foto_inicial = _png()
+        self.task.save()
+
+        self.assertEqual(build_variants(self.task.id, 'foto_inicial'), {'status': 'generated', 'variantes': 4})
+        self.assertEqual(build_variants(self.task.id, 'foto_inicial'), {'status': 'up_to_date'})
+        thumb = FotoVariante.objects.get(task=self.task, variante='thumb', formato='webp')
+        self.assertEqual((thumb.width, thumb.height), (320, 160))
+        self.assertTrue(os.path.exists(thumb.archivo.path))
+        with Image.open(thumb.archivo.path) as img:
+            self.assertEqual(img.format, 'WEBP')
+        jpeg = FotoVariante.objects.get(task=self.task, variante='medium', formato='jpeg')
+        self.assertEqual((jpeg.width, jpeg.height), (1024, 512))
+        self.assertLess(thumb.peso_bytes, self.task.foto_inicial.size)
+
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user('fotos', password='pass'))
+        data = client.get(f'/api/v1/tasks/{self.task.id}/').json()
+        self.assertEqual(
+            sorted((v['variante'], v['formato']) for v in data['foto_variantes']),
+            [('medium', 'jpeg'), ('medium', 'webp'), ('thumb', 'jpeg'), ('thumb', 'webp')],
+        )
+        self.assertTrue(all(v['url'].endswith(('.webp', '.jpeg')) for v in data['foto_variantes']))
+
+        self.task.foto_inicial = None
+        self.task.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(build_variants(self.task.id, 'foto_inicial')['status'], 'cleared')
+        self.assertFalse(FotoVariante.objects.exists())
+        self.assertFalse(os.path.exists(thumb.archivo.path))
@@ -1,3 +1,6 @@
+import time
+
+from django.core import mail
 from django.test import SimpleTestCase, override_settings
 from types import SimpleNamespace
 from django.template.loader import render_to_string
@@ -65,7 +68,7 @@ class NotificationsTests(SimpleTestCase):
 
         sent = {'emails': [], 'whats': []}
 
-        def fake_send_email(subject, text_body, recipient_list, context=None, template_html=None):
+        def fake_send_email(subject, text_body, recipient_list, context=None, template_html=None, connection=None):
             sent['emails'].append({'subject': subject, 'to': tuple(recipient_list), 'template': template_html})
             return True
 
@@ -91,3 +94,60 @@ class NotificationsTests(SimpleTestCase):
         else:
             self.assertIn('+12025550125', targets)
             self.assertIn('+12025550133', targets)
+
+
+@override_settings(
+    WHATSAPP_BACKEND='tasks.whatsapp.FakeWhatsApp', WHATSAPP_FAKE_DELAY=0.2,
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    PHONE_DEFAULT_REGION='US', BACKEND_URL='https://example.com', DEFAULT_FROM_EMAIL='no-reply@example.com',
+)
+class NotificationDispatcherTests(SimpleTestCase):
+    def setUp(self):
+        from tasks.whatsapp import get_whatsapp
+
+        get_whatsapp().outbox.clear()
+
+    def _evento(self, n_participantes):
+        participantes = [SimpleNamespace(celular=f'202-555-01{i:02d}') for i in range(n_participantes)]
+        return SimpleNamespace(
+            reporte=SimpleNamespace(title='Tarea X', id=123),
+            empleado=SimpleNamespace(email='user@example.com', celular=None),
+            participantes=SimpleNamespace(all=lambda: participantes),
+            descripcion='Avance',
+        )
+
+    def test_whatsapp_is_sent_concurrently_with_latencies(self):
+        from tasks.whatsapp import get_whatsapp
+
+        started = time.monotonic()
+        results = notifications.send_notifications_for_event(self._evento(6))
+        elapsed = time.monotonic() - started
+
+        self.assertTrue(results['whatsapp'])
+        self.assertEqual(len(get_whatsapp().outbox), 6)
+        # six 0.2 s sends would take 1.2 s one after another
+        self.assertLess(elapsed, 0.8)
+        whatsapp = [d for d in results['deliveries'] if d['canal'] == 'whatsapp']
+        self.assertEqual(len(whatsapp), 6)
+        self.assertTrue(all(d['ok'] and d['latencia_ms'] >= 150 for d in whatsapp))
+
+    def test_batch_shares_one_mail_connection(self):
+        with patch('tasks.notifications.get_connection', wraps=notifications.get_connection) as get_connection:
+            with notifications.NotificationDispatcher() as dispatcher:
+                notifications.send_notifications_for_event(self._evento(0), dispatcher=dispatcher)
+                notifications.send_notifications_for_event(self._evento(0), dispatcher=dispatcher)
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual([d['canal'] for d in dispatcher.deliveries], ['email', 'email'])
+
+    @override_settings(
+        WHATSAPP_BACKEND='tasks.whatsapp.TwilioWhatsApp',
+        TWILIO_ACCOUNT_SID='AC1', TWILIO_AUTH_TOKEN='t', TWILIO_WHATSAPP_FROM='+10000000000',
+    )
+    def test_twilio_client_is_built_once(self):
+        with patch('twilio.rest.Client') as client_cls:
+            client_cls.return_value.messages.create.return_value = SimpleNamespace(sid='SM1')
+            results = notifications.send_notifications_for_event(self._evento(3))
+        self.assertTrue(results['whatsapp'])
+        client_cls.assert_called_once_with('AC1', 't')
+        self.assertEqual(client_cls.return_value.messages.create.call_count, 3)
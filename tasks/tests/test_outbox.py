@@ -0,0 +1,55 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from tasks import outbox
+from tasks.models import OutboxMensaje
+
+
+@mock.patch('tasks.tasks.send_event_notifications.apply_async')
+class OutboxRelayTests(TestCase):
+    def test_relay_publishes_in_order_and_deletes(self, apply_async):
+        for evento_id in (1, 2, 3):
+            outbox.enqueue('tasks.tasks.send_event_notifications', evento_id, None)
+
+        result = outbox.relay(batch_size=2)
+        self.assertEqual((result['enviados'], result['pendientes']), (2, 1))
+        self.assertEqual(outbox.drain(), 1)
+        self.assertEqual(
+            [c.kwargs['args'] for c in apply_async.call_args_list],
+            [[1, None], [2, None], [3, None]],
+        )
+        self.assertTrue(all(c.kwargs['retry'] is False for c in apply_async.call_args_list))
+        self.assertFalse(OutboxMensaje.objects.exists())
+
+    def test_broker_errors_keep_the_rows_and_back_off(self, apply_async):
+        first = outbox.enqueue('tasks.tasks.send_event_notifications', 1, None)
+        outbox.enqueue('tasks.tasks.send_event_notifications', 2, None)
+        apply_async.side_effect = ConnectionError('redis caído')
+
+        now = timezone.now()
+        result = outbox.relay(now=now)
+        self.assertEqual((result['enviados'], result['fallido'], result['pendientes']), (0, first.pk, 2))
+        # the batch stops at the first failure
+        self.assertEqual(apply_async.call_count, 1)
+        first.refresh_from_db()
+        self.assertEqual((first.intentos, first.error), (1, 'redis caído'))
+        self.assertEqual(first.disponible_en, now + timedelta(seconds=2))
+
+        apply_async.side_effect = None
+        apply_async.reset_mock()
+        # the second row is still due; the failed one waits for its backoff
+        self.assertEqual(outbox.relay(now=now)['enviados'], 1)
+        self.assertEqual(outbox.relay(now=now + timedelta(seconds=3))['enviados'], 1)
+        self.assertEqual([c.kwargs['args'] for c in apply_async.call_args_list], [[2, None], [1, None]])
+
+    def test_command(self, apply_async):
+        outbox.enqueue('tasks.tasks.send_event_notifications', 7, 3)
+        out = StringIO()
+        call_command('relay_outbox', stdout=out)
+        self.assertIn('1 outbox messages published', out.getvalue())
+        apply_async.assert_called_once_with(args=[7, 3], kwargs={}, retry=False)
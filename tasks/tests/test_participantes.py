@@ -0,0 +1,84 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tasks.models import Empleado, Evento, Participante, Task, Ubicacion
+from tasks.participantes import ParticipantesError, resolve_participantes
+
+
+class ResolveParticipantesTests(TestCase):
+    def setUp(self):
+        self.existing = [Participante.objects.create(nombre=f'P{i}') for i in range(3)]
+
+    def test_mixed_payload_costs_two_queries(self):
+        payload = [
+            self.existing[0].id,
+            {'id': self.existing[1].id},
+            {'nombre': 'Nuevo', 'rol': 'Proveedor'},
+            str(self.existing[2].id),
+            999999,
+            self.existing[0].id,
+            'basura',
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            resolved = resolve_participantes(json.dumps(payload))
+        self.assertEqual(len(ctx), 2)
+        self.assertEqual(
+            [p.nombre for p in resolved], ['P0', 'P1', 'Nuevo', 'P2']
+        )
+        self.assertTrue(all(p.pk for p in resolved))
+
+    def test_strict_mode_rejects_unknown_ids(self):
+        with self.assertRaises(ParticipantesError) as ctx:
+            resolve_participantes([self.existing[0].id, 999999, {'id': 888888}], strict=True)
+        self.assertEqual(ctx.exception.ids, [999999, 888888])
+        with self.assertRaises(ParticipantesError):
+            resolve_participantes(['basura'], strict=True)
+
+    def test_invalid_payload_resolves_to_nothing(self):
+        self.assertEqual(resolve_participantes('{no es json'), [])
+        self.assertEqual(resolve_participantes(None), [])
+
+
+class TaskEventsParticipantesTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('field', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.empleado = Empleado.objects.create(
+            user=self.user, nombre_empleado='Field', ubicacion='HQ', campus='Montejo'
+        )
+        ub = Ubicacion.objects.create(nombre='U', lat=20.0, lon=-89.0, status='ready')
+        self.task = Task.objects.create(title='Tarea', ubicacion=ub)
+        self.existing = Participante.objects.create(nombre='Ya existe')
+
+    def test_inline_participantes_are_attached(self):
+        payload = {
+            'descripcion': 'Visita',
+            'reporte': self.task.id,
+            'empleado': self.empleado.id,
+            'participantes': [self.existing.id, {'nombre': 'Ingeniera', 'rol': 'Ingeniero'}],
+        }
+        resp = self.client.post(f'/api/v1/tasks/{self.task.id}/events/', payload, format='json')
+        self.assertEqual(resp.status_code, 201)
+        evento = self.task.eventos.get()
+        self.assertEqual(
+            sorted(evento.participantes.values_list('nombre', flat=True)), ['Ingeniera', 'Ya existe']
+        )
+
+    def test_unknown_ids_are_rejected_with_400(self):
+        payload = {
+            'descripcion': 'Visita',
+            'reporte': self.task.id,
+            'empleado': self.empleado.id,
+            'participantes': [self.existing.id, 999999],
+        }
+        for url in (f'/api/v1/tasks/{self.task.id}/events/', '/api/v1/eventos/'):
+            resp = self.client.post(url, payload, format='json')
+            self.assertEqual(resp.status_code, 400, url)
+            self.assertIn('999999', resp.json()['participantes'][0])
+        self.assertFalse(Evento.objects.exists())
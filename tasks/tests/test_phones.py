@@ -0,0 +1,80 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from tasks import notifications
+from tasks.models import Empleado, Evento, Participante, Task, Ubicacion
+from tasks.participantes import resolve_participantes
+
+
+@override_settings(PHONE_DEFAULT_REGION='US')
+class StoredPhoneTests(TestCase):
+    def setUp(self):
+        self.empleado = Empleado.objects.create(
+            user=User.objects.create_user('tel', password='pass'), nombre_empleado='Ana',
+            ubicacion='HQ', campus='Montejo', celular='2025550125',
+        )
+        ub = Ubicacion.objects.create(nombre='U', lat=20.0, lon=-89.0, status='ready')
+        self.task = Task.objects.create(title='T', ubicacion=ub)
+
+    def test_numbers_are_normalized_on_save_and_bulk_create(self):
+        self.assertEqual(self.empleado.celular_e164, '+12025550125')
+        nuevos = resolve_participantes([{'nombre': 'A', 'celular': '202-555-0133'}, {'nombre': 'B', 'celular': '123'}])
+        self.assertEqual(
+            list(Participante.objects.filter(pk__in=[p.pk for p in nuevos]).values_list('celular_e164', flat=True).order_by('nombre')),
+            ['+12025550133', ''],
+        )
+
+    def test_recipients_resolve_in_two_queries_without_parsing(self):
+        evento = Evento.objects.create(descripcion='Avance', reporte=self.task, empleado=self.empleado)
+        evento.participantes.add(*[
+            Participante.objects.create(nombre=f'P{i}', celular=f'202-555-01{40 + i}') for i in range(5)
+        ])
+        notifications._normalize_phone.cache_clear()
+        with mock.patch('phonenumbers.parse') as parse, self.assertNumQueries(2):
+            evento = notifications.load_evento(evento.id)
+            numbers = notifications._whatsapp_numbers(evento)
+            self.assertEqual(evento.reporte.title, 'T')
+        parse.assert_not_called()
+        self.assertEqual(numbers[0], '+12025550125')
+        self.assertEqual(len(numbers), 6)
+
+    def test_unsaved_numbers_fall_back_to_the_memoized_parser(self):
+        notifications._normalize_phone.cache_clear()
+        for _ in range(3):
+            self.assertEqual(notifications._phone_e164(Participante(celular='202-555-0177')), '+12025550177')
+        info = notifications._normalize_phone.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+
+    def test_stale_stored_numbers_are_not_trusted(self):
+        self.assertEqual(notifications._phone_e164(self.empleado), '+12025550125')
+        # writes that do not refresh celular_e164
+        self.empleado.celular = '2025550144'
+        self.empleado.save(update_fields=['celular'])
+        self.assertEqual(notifications._phone_e164(Empleado.objects.get(pk=self.empleado.pk)), '+12025550144')
+        Empleado.objects.update(celular='123')
+        self.assertIsNone(notifications._phone_e164(Empleado.objects.get(pk=self.empleado.pk)))
+
+        out = StringIO()
+        call_command('backfill_phones', stdout=out)
+        self.assertIn('Empleado: 1 checked, 1 updated, 1 invalid numbers', out.getvalue())
+        self.empleado.refresh_from_db()
+        self.assertEqual((self.empleado.celular_e164, self.empleado.celular_e164_origen), ('', '123'))
+
+    def test_backfill_command(self):
+        Participante.objects.create(nombre='P', celular='202-555-0133')
+        Participante.objects.create(nombre='Sin', celular='')
+        # rows saved before celular_e164 existed
+        Empleado.objects.update(celular_e164='', celular_e164_origen='')
+        Participante.objects.update(celular_e164='', celular_e164_origen='')
+
+        out = StringIO()
+        call_command('backfill_phones', '--chunk-size', '1', stdout=out)
+        self.assertIn('Empleado: 1 checked, 1 updated, 0 invalid numbers', out.getvalue())
+        self.assertIn('Participante: 1 checked, 1 updated, 0 invalid numbers', out.getvalue())
+        self.assertEqual(Participante.objects.get(nombre='P').celular_e164, '+12025550133')
+        self.empleado.refresh_from_db()
+        self.assertEqual(self.empleado.celular_e164, '+12025550125')
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks.models import Task, Ubicacion
+
+
+class TaskListPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('lister', password='pass')
+        self.other = User.objects.create_user('other', password='pass')
+        self.client.force_authenticate(user=self.user)
+
+        base = timezone.now() - timedelta(days=30)
+        self.tasks = []
+        for i in range(7):
+            ub = Ubicacion.objects.create(nombre=f'U{i}', lat=20.0, lon=-89.0, status='ready')
+            self.tasks.append(Task.objects.create(
+                title=f'Tarea {i}',
+                ubicacion=ub,
+                fecha_creacion=base + timedelta(days=i),
+                done=(i % 2 == 0),
+                campus='Norte' if i < 3 else 'Montejo',
+                prioridad='Alta' if i == 6 else 'Media',
+                reportado_por=self.other if i == 1 else self.user,
+            ))
+
+    def _ids(self, resp):
+        return [t['id'] for t in resp.json()['results']]
+
+    def test_cursor_pages_cover_all_rows_newest_first(self):
+        resp = self.client.get('/api/v1/tasks/', {'page_size': 3})
+        self.assertEqual(resp.status_code, 200)
+        seen = self._ids(resp)
+        next_url = resp.json()['next']
+        while next_url:
+            resp = self.client.get(next_url)
+            seen.extend(self._ids(resp))
+            next_url = resp.json()['next']
+        self.assertEqual(seen, [t.id for t in reversed(self.tasks)])
+
+    def test_filters_are_applied(self):
+        resp = self.client.get('/api/v1/tasks/', {'done': 'false', 'campus': 'Montejo'})
+        self.assertEqual(set(self._ids(resp)), {self.tasks[3].id, self.tasks[5].id})
+
+        resp = self.client.get('/api/v1/tasks/', {'prioridad': 'Alta'})
+        self.assertEqual(self._ids(resp), [self.tasks[6].id])
+
+        resp = self.client.get('/api/v1/tasks/', {'reportado_por': self.other.id})
+        self.assertEqual(self._ids(resp), [self.tasks[1].id])
+
+    def test_date_range_filter(self):
+        desde = self.tasks[2].fecha_creacion.date().isoformat()
+        hasta = self.tasks[4].fecha_creacion.isoformat()
+        resp = self.client.get('/api/v1/tasks/', {'fecha_desde': desde, 'fecha_hasta': hasta})
+        self.assertEqual(self._ids(resp), [self.tasks[4].id, self.tasks[3].id, self.tasks[2].id])
+
+    def test_out_of_range_dates_return_400(self):
+        for params in ({'fecha_desde': '2024-13-45'}, {'fecha_hasta': '2024-02-30T10:00'}):
+            resp = self.client.get('/api/v1/tasks/', params)
+            self.assertEqual(resp.status_code, 400, params)
+            resp = self.client.get('/api/v1/tasks/map/', {'bbox': '-90,19,-88,21', 'zoom': 10, **params})
+            self.assertEqual(resp.status_code, 400, params)
+
+    def test_invalid_filter_returns_400(self):
+        resp = self.client.get('/api/v1/tasks/', {'prioridad': 'Urgente', 'fecha_desde': 'ayer'})
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('prioridad', resp.json())
+        self.assertIn('fecha_desde', resp.json())
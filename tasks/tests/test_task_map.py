@@ -0,0 +1,62 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from tasks.models import Task, Ubicacion
+
+
+@override_settings(TASK_MAP_CELLS_PER_TILE=4, TASK_MAP_DETAIL_ZOOM=17, TASK_MAP_MAX_POINTS=2)
+class TaskMapTests(TestCase):
+    url = '/api/v1/tasks/map/'
+    bbox = '-90,20,-89,21'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user('mapa', password='pass'))
+        points = [
+            # two tasks in one building, one open and one closed
+            (20.96710, -89.62370, False),
+            (20.96712, -89.62372, True),
+            # across the city
+            (20.5, -89.5, False),
+            # outside the bbox
+            (19.0, -89.5, False),
+        ]
+        for i, (lat, lon, done) in enumerate(points):
+            ub = Ubicacion.objects.create(nombre=f'U{i}', lat=lat, lon=lon, status='ready')
+            Task.objects.create(title=f'T{i}', ubicacion=ub, done=done, campus='Norte' if i else 'Sur')
+
+    def test_low_zoom_returns_db_clusters(self):
+        with self.assertNumQueries(1):
+            resp = self.client.get(self.url, {'bbox': self.bbox, 'zoom': 12})
+        self.assertEqual(resp.status_code, 200)
+        clusters = sorted(resp.json()['clusters'], key=lambda c: c['count'])
+        self.assertEqual([c['count'] for c in clusters], [1, 2])
+        building = clusters[1]
+        self.assertEqual((building['abiertas'], building['cerradas']), (1, 1))
+        self.assertAlmostEqual(building['lat'], 20.96711, places=5)
+
+    def test_very_low_zoom_merges_everything_in_view(self):
+        resp = self.client.get(self.url, {'bbox': self.bbox, 'zoom': 2})
+        self.assertEqual([c['count'] for c in resp.json()['clusters']], [3])
+
+    def test_filters_apply_to_clusters(self):
+        resp = self.client.get(self.url, {'bbox': self.bbox, 'zoom': 2, 'done': 'false'})
+        self.assertEqual(resp.json()['clusters'][0]['count'], 2)
+
+    def test_high_zoom_returns_individual_tasks(self):
+        resp = self.client.get(self.url, {'bbox': '-89.63,20.96,-89.62,20.97', 'zoom': 18})
+        data = resp.json()
+        self.assertEqual(sorted(t['title'] for t in data['tasks']), ['T0', 'T1'])
+        self.assertFalse(data['truncated'])
+        self.assertIsInstance(data['tasks'][0]['lat'], float)
+
+        data = self.client.get(self.url, {'bbox': self.bbox, 'zoom': 18}).json()
+        self.assertEqual(len(data['tasks']), 2)
+        self.assertTrue(data['truncated'])
+
+    def test_invalid_params(self):
+        resp = self.client.get(self.url, {'bbox': '1,2,3', 'zoom': 'x'})
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(set(resp.json()), {'bbox', 'zoom'})
+        self.assertEqual(self.client.get(self.url, {'bbox': '-89,20,-90,21', 'zoom': 5}).status_code, 400)
@@ -0,0 +1,109 @@
+import base64
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks.models import Compromiso, Empleado, Evento, Participante, Task, Ubicacion
+
+
+class TaskTimelineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user('timeline', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.empleado = Empleado.objects.create(
+            user=self.user, nombre_empleado='Timeline', ubicacion='HQ', campus='Montejo'
+        )
+        ub = Ubicacion.objects.create(nombre='U', lat=20.0, lon=-89.0, status='ready')
+        self.task = Task.objects.create(title='Tarea', ubicacion=ub)
+        self.url = f'/api/v1/tasks/{self.task.id}/timeline/'
+
+        now = timezone.now()
+        p = Participante.objects.create(nombre='P')
+        self.eventos = []
+        for i in range(4):
+            ev = Evento.objects.create(descripcion=f'E{i}', reporte=self.task, empleado=self.empleado)
+            # fecha is auto_now_add; spread them out explicitly
+            Evento.objects.filter(pk=ev.pk).update(fecha=now + timedelta(days=2 * i))
+            ev.participantes.add(p)
+            self.eventos.append(ev)
+        self.compromisos = [
+            Compromiso.objects.create(tarea=self.task, descripcion=f'C{i}', fecha_compromiso=now + timedelta(days=2 * i + 1))
+            for i in range(3)
+        ]
+        Compromiso.objects.create(tarea=self.task, descripcion='Sin fecha')
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def _labels(self, items):
+        return [it['data']['descripcion'] for it in items]
+
+    def test_items_are_merged_chronologically(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            self._labels(resp.json()['timeline']),
+            ['E0', 'C0', 'E1', 'C1', 'E2', 'C2', 'E3', 'Sin fecha'],
+        )
+        self.assertIsNone(resp.json()['next'])
+
+    def test_cursor_pagination(self):
+        labels = []
+        params = {'limit': 3}
+        while True:
+            data = self.client.get(self.url, params).json()
+            labels.extend(self._labels(data['timeline']))
+            if not data['next']:
+                break
+            params = {'limit': 3, 'cursor': data['next']}
+        self.assertEqual(labels, ['E0', 'C0', 'E1', 'C1', 'E2', 'C2', 'E3', 'Sin fecha'])
+
+    def test_invalid_cursor_returns_400(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'nope'}).status_code, 400)
+        # a forged cursor with a naive date must not reach the aware comparison
+        naive = base64.urlsafe_b64encode(b'2024-01-01T00:00:00|evento|1').decode()
+        self.assertEqual(self.client.get(self.url, {'cursor': naive}).status_code, 400)
+
+    def test_snapshot_is_cached_and_invalidated(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url)
+        # only the task existence check hits the database
+        self.assertEqual(len(ctx), 1)
+
+        Evento.objects.create(descripcion='Nuevo', reporte=self.task, empleado=self.empleado)
+        self.assertIn('Nuevo', self._labels(self.client.get(self.url).json()['timeline']))
+
+        self.compromisos[0].delete()
+        self.assertNotIn('C0', self._labels(self.client.get(self.url).json()['timeline']))
+
+    def _evento_participantes(self, evento):
+        items = self.client.get(self.url).json()['timeline']
+        data = next(it['data'] for it in items if it['type'] == 'evento' and it['data']['id'] == evento.id)
+        return [p['nombre'] for p in data['participantes_detail']]
+
+    def test_participante_changes_invalidate_snapshot(self):
+        otro = Participante.objects.create(nombre='Q')
+        self.assertEqual(self._evento_participantes(self.eventos[0]), ['P'])
+        # reverse side of the m2m
+        otro.eventos.add(self.eventos[0])
+        self.assertEqual(sorted(self._evento_participantes(self.eventos[0])), ['P', 'Q'])
+
+        otro.nombre = 'Q2'
+        otro.save()
+        self.assertEqual(sorted(self._evento_participantes(self.eventos[0])), ['P', 'Q2'])
+
+        otro.eventos.clear()
+        self.assertEqual(self._evento_participantes(self.eventos[0]), ['P'])
+
+        Participante.objects.get(nombre='P').delete()
+        self.assertEqual(self._evento_participantes(self.eventos[0]), [])
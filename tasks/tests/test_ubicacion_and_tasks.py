@@ -55,7 +55,7 @@ class ReverseGeocodeTaskTests(TestCase):
         except Exception:
             pass
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_reverse_geocode_updates_name_and_status(self, mock_get):
         mock_resp = mock.Mock()
         mock_resp.ok = True
@@ -17,7 +17,7 @@ class UbicacionFlowTests(TestCase):
         self.client.force_authenticate(user=self.user)
 
     @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
-    @patch('tasks.tasks.requests.get')
+    @patch('requests.Session.get')
     def test_lookup_eager_runs_and_returns_201_ready(self, mock_get):
         # arrange: patch nominatim response
         mock_resp = MagicMock()
@@ -37,7 +37,7 @@ class UbicacionFlowTests(TestCase):
         self.assertIn('Calle Falsa', loc.nombre)
 
     @override_settings(CELERY_TASK_ALWAYS_EAGER=False)
-    @patch('tasks.tasks.requests.get')
+    @patch('requests.Session.get')
     def test_lookup_returns_202_and_polling_updates(self, mock_get):
         # arrange: make reverse geocode return a useful name when run
         mock_resp = MagicMock()
@@ -66,3 +66,9 @@ class UbicacionFlowTests(TestCase):
         self.assertEqual(det2.status_code, 200)
         self.assertEqual(det2.json().get('status'), 'ready')
         self.assertIn('Avenida Simulada', det2.json().get('nombre', ''))
+
+    def test_lookup_rejects_non_string_nombre(self):
+        for nombre in (123, {'x': 1}, ['a']):
+            resp = self.client.post('/api/v1/ubicaciones/lookup/', {'lat': 20.0, 'lon': -89.0, 'nombre': nombre}, format='json')
+            self.assertEqual(resp.status_code, 400)
+        self.assertFalse(Ubicacion.objects.exists())
@@ -0,0 +1,78 @@
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from tasks.models import Ubicacion
+from tasks.pubsub import InProcessPubSub, get_pubsub, ubicacion_channel
+
+
+class InProcessPubSubTests(TestCase):
+    def test_only_current_subscribers_receive_messages(self):
+        hub = InProcessPubSub()
+        self.assertEqual(hub.publish('c', {'n': 0}), 0)
+        with hub.subscribe('c') as sub:
+            hub.publish('c', {'n': 1})
+            self.assertEqual(sub.get(0.1), {'n': 1})
+            self.assertIsNone(sub.get(0.01))
+        self.assertEqual(hub.publish('c', {'n': 2}), 0)
+
+
+@override_settings(PUBSUB_BACKEND='tasks.pubsub.InProcessPubSub', UBICACION_WAIT_TIMEOUT=5)
+@mock.patch('tasks.tasks.reverse_geocode_and_update.delay')
+class UbicacionWaitTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user('wait', password='pass'))
+        self.ub = Ubicacion.objects.create(nombre='Tmp', lat=20.5, lon=-89.5, status='pending')
+        self.url = f'/api/v1/ubicaciones/{self.ub.id}/wait/'
+
+    def test_ready_ubicacion_returns_immediately(self, _delay):
+        Ubicacion.objects.filter(pk=self.ub.pk).update(status='ready')
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.json()['status'], 'ready')
+
+    def test_request_returns_when_status_is_published(self, _delay):
+        payload = {'id': self.ub.id, 'nombre': 'Rectoría', 'status': 'ready'}
+
+        def worker():
+            # wait until the request has subscribed, then publish
+            channel = ubicacion_channel(self.ub.id)
+            hub = get_pubsub()
+            for _ in range(200):
+                if hub.publish(channel, payload):
+                    return
+                time.sleep(0.01)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        start = time.monotonic()
+        resp = self.client.get(self.url)
+        thread.join()
+        self.assertLess(time.monotonic() - start, 4)
+        self.assertEqual(resp.json(), payload)
+
+    def test_timeout_returns_current_state(self, _delay):
+        resp = self.client.get(self.url, {'timeout': '0.05'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['status'], 'pending')
+        self.assertEqual(self.client.get('/api/v1/ubicaciones/999999/wait/', {'timeout': '0'}).status_code, 404)
+
+    def test_saving_final_status_publishes_after_commit(self, _delay):
+        with get_pubsub().subscribe(ubicacion_channel(self.ub.id)) as sub:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.ub.nombre = 'Rectoría'
+                self.ub.status = 'ready'
+                self.ub.save()
+            message = sub.get(0.5)
+        self.assertEqual((message['nombre'], message['status']), ('Rectoría', 'ready'))
+
+    def test_in_process_backend_caps_the_wait(self, _delay):
+        with override_settings(UBICACION_WAIT_LOCAL_TIMEOUT=0.05):
+            start = time.monotonic()
+            resp = self.client.get(self.url, {'timeout': '5'})
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(resp.json()['status'], 'pending')
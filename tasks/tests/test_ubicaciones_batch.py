@@ -0,0 +1,56 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from tasks.models import Ubicacion
+
+
+@override_settings(UBICACIONES_BATCH_MAX=5, UBICACIONES_READY_MAX_AGE=3600)
+@mock.patch('tasks.tasks.reverse_geocode_and_update.delay')
+class UbicacionesBatchTests(TestCase):
+    url = '/api/v1/ubicaciones/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user('batch', password='pass'))
+        self.a = Ubicacion.objects.create(nombre='A', lat=20.1, lon=-89.1, status='ready')
+        self.b = Ubicacion.objects.create(nombre='B', lat=20.2, lon=-89.2, status='ready')
+        self.p = Ubicacion.objects.create(nombre='P', lat=20.3, lon=-89.3, status='pending')
+
+    def test_get_returns_rows_in_requested_order_with_one_query(self, _delay):
+        with self.assertNumQueries(1):
+            resp = self.client.get(self.url, {'ids': f'{self.b.id},{self.a.id},999999'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([r['nombre'] for r in resp.json()['results']], ['B', 'A'])
+        self.assertEqual(resp.json()['missing'], [999999])
+
+    def test_post_accepts_id_list(self, _delay):
+        resp = self.client.post(self.url, {'ids': [self.a.id, self.p.id, self.a.id]}, format='json')
+        self.assertEqual([r['id'] for r in resp.json()['results']], [self.a.id, self.p.id])
+
+    def test_ready_rows_get_long_lived_etag(self, _delay):
+        resp = self.client.get(self.url, {'ids': f'{self.a.id},{self.b.id}'})
+        self.assertIn('max-age=3600', resp['Cache-Control'])
+        self.assertIn('private', resp['Cache-Control'])
+        etag = resp['ETag']
+        self.assertTrue(etag.startswith('"'))
+
+        again = self.client.get(self.url, {'ids': f'{self.a.id},{self.b.id}'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+
+        Ubicacion.objects.filter(pk=self.a.pk).update(nombre='A2')
+        changed = self.client.get(self.url, {'ids': f'{self.a.id},{self.b.id}'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+    def test_pending_rows_must_revalidate(self, _delay):
+        resp = self.client.get(self.url, {'ids': f'{self.a.id},{self.p.id}'})
+        self.assertIn('no-cache', resp['Cache-Control'])
+        self.assertNotIn('max-age', resp['Cache-Control'])
+
+    def test_invalid_requests(self, _delay):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'ids': '1,x'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'ids': '1,2,3,4,5,6'}).status_code, 400)
@@ -0,0 +1,121 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks.models import SubidaFoto, Task, Ubicacion
+from tasks.tests.test_foto_storage import GIF
+from tasks.uploads import UploadError, append_chunk, purge_stale, temp_path
+
+
+@mock.patch('tasks.tasks.generate_image_variants.delay')
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.override = override_settings(
+            MEDIA_ROOT=self.media,
+            CHUNKED_UPLOAD_DIR=os.path.join(self.media, 'tmp'),
+            CHUNKED_UPLOAD_MAX_CHUNK=16,
+        )
+        self.override.enable()
+        self.user = User.objects.create_user('subidor', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        ub = Ubicacion.objects.create(nombre='U', lat=20.0, lon=-89.0, status='ready')
+        self.task = Task.objects.create(title='T', ubicacion=ub)
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media, ignore_errors=True)
+
+    def _open(self, **extra):
+        payload = {'campo': 'foto_final', 'nombre': 'final.gif', 'tamano': len(GIF), **extra}
+        resp = self.client.post(f'/api/v1/tasks/{self.task.id}/uploads/', payload, format='json')
+        self.assertEqual(resp.status_code, 201, resp.content)
+        return resp.json()['upload_url']
+
+    def _put(self, url, offset, data):
+        return self.client.put(f'{url}?offset={offset}', data, content_type='application/octet-stream')
+
+    def test_chunks_resume_and_finalize_attach_the_photo(self, _delay):
+        url = self._open(sha256=hashlib.sha256(GIF).hexdigest(), nombre='final.html')
+        chunks = [GIF[i:i + 16] for i in range(0, len(GIF), 16)]
+
+        self.assertEqual(self._put(url, 0, chunks[0]).json()['offset'], 16)
+        # a retried chunk with a stale offset is rejected with the current one
+        stale = self._put(url, 0, chunks[0])
+        self.assertEqual((stale.status_code, stale.json()['offset']), (409, 16))
+        # finalizing early reports what is missing
+        self.assertEqual(self.client.post(f'{url}finalize/').status_code, 409)
+
+        offset = self.client.get(url).json()['offset']
+        for chunk in chunks[1:]:
+            offset = self._put(url, offset, chunk).json()['offset']
+        self.assertEqual(offset, len(GIF))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(f'{url}finalize/')
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.task.refresh_from_db()
+        # the extension comes from the detected format, not the client's name
+        self.assertTrue(self.task.foto_final.name.endswith('.gif'))
+        with self.task.foto_final.open('rb') as fh:
+            self.assertEqual(fh.read(), GIF)
+        subida = SubidaFoto.objects.get()
+        self.assertEqual(subida.estado, 'completa')
+        self.assertFalse(os.path.exists(temp_path(subida)))
+
+    def test_rejections(self, _delay):
+        bad = self.client.post(f'/api/v1/tasks/{self.task.id}/uploads/', {'campo': 'otro', 'nombre': 'x', 'tamano': 1}, format='json')
+        self.assertEqual(bad.status_code, 400)
+
+        url = self._open(sha256='0' * 64)
+        self.assertEqual(self._put(url, 0, b'x' * 17).status_code, 413)
+        for i in range(0, len(GIF), 16):
+            self._put(url, i, GIF[i:i + 16])
+        self.assertEqual(self.client.post(f'{url}finalize/').status_code, 422)
+
+        # bytes that are not an image are refused even with a matching size
+        html = b'<script>alert(1)</script>'
+        url = self._open(nombre='x.html', tamano=len(html))
+        self._put(url, 0, html[:16])
+        self._put(url, 16, html[16:])
+        self.assertEqual(self.client.post(f'{url}finalize/').status_code, 415)
+        self.task.refresh_from_db()
+        self.assertFalse(self.task.foto_final)
+
+        other = APIClient()
+        other.force_authenticate(user=User.objects.create_user('otro', password='pass'))
+        self.assertEqual(other.get(url).status_code, 404)
+
+    def test_chunk_that_loses_a_race_is_discarded(self, _delay):
+        self._open()
+        subida = SubidaFoto.objects.get()
+
+        class RacingStream(io.BytesIO):
+            def read(self, size=-1):
+                # another PUT for offset 0 is counted while this body arrives
+                SubidaFoto.objects.filter(pk=subida.pk).update(recibido=16)
+                return super().read(size)
+
+        with self.assertRaises(UploadError) as ctx:
+            append_chunk(subida.pk, 0, RacingStream(GIF[:16]), 16)
+        self.assertEqual((ctx.exception.status, ctx.exception.extra['offset']), (409, 16))
+        self.assertEqual(os.listdir(os.path.dirname(temp_path(subida))), [os.path.basename(temp_path(subida))])
+
+    def test_stale_uploads_are_purged(self, _delay):
+        self._open()
+        subida = SubidaFoto.objects.get()
+        SubidaFoto.objects.update(actualizado_en=timezone.now() - timedelta(hours=48))
+        self.assertEqual(purge_stale(24), 1)
+        subida.refresh_from_db()
+        self.assertEqual(subida.estado, 'cancelada')
+        self.assertFalse(os.path.exists(temp_path(subida)))
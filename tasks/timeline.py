@@ -0,0 +1,115 @@
+"""Per-task timeline of eventos and compromisos.
+
+Both streams are read already ordered by date from the database (with their
+participantes prefetched), merged with `heapq.merge` and cached per task as a
+snapshot. Pages are sliced out of the snapshot with an opaque date cursor.
+Signal receivers in `tasks.signals` drop a task's snapshot whenever one of
+its eventos or compromisos, or a participante attached to them, changes.
+"""
+import base64
+import heapq
+from bisect import bisect_right
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .eager_loading import eager_load
+from .models import Compromiso, Evento
+from .serializer import EventoSerializer
+
+_MIN_DATE = datetime.min.replace(tzinfo=dt_timezone.utc)
+
+
+def timeline_cache_key(task_id):
+    return f'tasks:timeline:{task_id}'
+
+
+def _sort_key(date, kind, pk):
+    # undated items (compromisos without fecha) go last
+    return (date is None, date or _MIN_DATE, kind, pk)
+
+
+def _evento_items(task_id):
+    eventos = eager_load(Evento.objects.filter(reporte_id=task_id), EventoSerializer).order_by('fecha', 'id')
+    for evento, data in zip(eventos, EventoSerializer(eventos, many=True).data):
+        yield _sort_key(evento.fecha, 'evento', evento.id), {
+            'type': 'evento',
+            'date': data.get('fecha'),
+            'data': dict(data),
+        }
+
+
+def _compromiso_items(task_id):
+    compromisos = (
+        Compromiso.objects.filter(tarea_id=task_id)
+        .prefetch_related('participantes')
+        .order_by(F('fecha_compromiso').asc(nulls_last=True), 'id')
+    )
+    for c in compromisos:
+        yield _sort_key(c.fecha_compromiso, 'compromiso', c.id), {
+            'type': 'compromiso',
+            'date': c.fecha_compromiso,
+            'data': {
+                'id': c.id,
+                'descripcion': c.descripcion,
+                'fecha_compromiso': c.fecha_compromiso,
+                'creado_por': c.creado_por_id,
+                'participantes': [p.id for p in c.participantes.all()],
+            },
+        }
+
+
+def build_timeline(task_id):
+    """Return the full timeline as a list of (sort_key, item) pairs."""
+    return list(heapq.merge(_evento_items(task_id), _compromiso_items(task_id), key=lambda pair: pair[0]))
+
+
+def get_timeline(task_id):
+    key = timeline_cache_key(task_id)
+    entries = cache.get(key)
+    if entries is None:
+        entries = build_timeline(task_id)
+        cache.set(key, entries, getattr(settings, 'TIMELINE_CACHE_TIMEOUT', 600))
+    return entries
+
+
+def invalidate_timeline(task_id):
+    if task_id is not None:
+        cache.delete(timeline_cache_key(task_id))
+
+
+def encode_cursor(sort_key):
+    undated, date, kind, pk = sort_key
+    raw = f"{'' if undated else date.isoformat()}|{kind}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return the sort key encoded in `cursor`; raise ValueError if invalid."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        date_raw, kind, pk = raw.split('|')
+        date = parse_datetime(date_raw) if date_raw else None
+        if date_raw and (date is None or timezone.is_naive(date)):
+            # entries hold aware datetimes; a naive one cannot be compared
+            raise ValueError(cursor)
+        return _sort_key(date, kind, int(pk))
+    except (TypeError, ValueError, UnicodeError) as exc:
+        raise ValueError(f'Invalid cursor: {cursor}') from exc
+
+
+def timeline_page(task_id, cursor=None, limit=100):
+    """Return (items, next_cursor) for the page after `cursor`."""
+    entries = get_timeline(task_id)
+    start = 0
+    if cursor:
+        start = bisect_right(entries, decode_cursor(cursor), key=lambda pair: pair[0])
+    page = entries[start:start + limit]
+    next_cursor = None
+    if page and start + limit < len(entries):
+        next_cursor = encode_cursor(page[-1][0])
+    return [item for _, item in page], next_cursor
@@ -0,0 +1,227 @@
+"""Resumable chunked uploads for Task photos.
+
+Protocol (all under /api/v1/):
+
+1. POST tasks/<id>/uploads/ {campo, nombre, tamano[, sha256]} opens a session.
+2. PUT uploads/<uuid>/?offset=N with the raw bytes of the next chunk; N must
+   equal the bytes received so far, otherwise 409 with the current offset.
+3. GET uploads/<uuid>/ tells a reconnecting client where to resume.
+4. POST uploads/<uuid>/finalize/ checks size (and sha256), checks with
+   Pillow that the file is an image (415 otherwise) and attaches it to the
+   Task field, named after the detected format rather than the client's name.
+
+Each chunk is streamed from the request to a file of its own in
+CHUNKED_UPLOAD_DIR and then, under a short row lock, appended to the
+session's temporary file, so memory use is bounded by UPLOAD_READ_SIZE and
+no worker is held between chunks.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .imagenes import FOTO_FIELDS
+from .models import SubidaFoto
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_READ_SIZE = 64 * 1024
+
+# Pillow format -> extension of the stored file; anything else is rejected
+IMAGE_EXTENSIONS = {
+    'JPEG': '.jpg',
+    'MPO': '.jpg',
+    'PNG': '.png',
+    'GIF': '.gif',
+    'WEBP': '.webp',
+}
+
+
+class UploadError(Exception):
+    """Rejected chunk or finalize request; `status` is the HTTP status to return."""
+
+    def __init__(self, message, status=400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+
+def _upload_dir():
+    path = getattr(settings, 'CHUNKED_UPLOAD_DIR', None) or os.path.join(settings.BASE_DIR, 'uploads_tmp')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def temp_path(subida):
+    return os.path.join(_upload_dir(), f'{subida.id}.part')
+
+
+def open_upload(*, task, campo, nombre, tamano, usuario=None, sha256=''):
+    if campo not in FOTO_FIELDS:
+        raise UploadError(f'campo debe ser uno de {", ".join(FOTO_FIELDS)}')
+    if not nombre:
+        raise UploadError('nombre es requerido')
+    try:
+        tamano = int(tamano)
+    except (TypeError, ValueError):
+        raise UploadError('tamano debe ser un entero')
+    max_size = int(getattr(settings, 'CHUNKED_UPLOAD_MAX_SIZE', 50 * 1024 * 1024))
+    if not 0 < tamano <= max_size:
+        raise UploadError(f'tamano debe estar entre 1 y {max_size} bytes')
+    subida = SubidaFoto.objects.create(
+        task=task, campo=campo, usuario=usuario, nombre_archivo=os.path.basename(str(nombre))[:255],
+        tamano=tamano, sha256=(sha256 or '').lower()[:64],
+    )
+    open(temp_path(subida), 'wb').close()
+    return subida
+
+
+def _check_offset(subida, offset, length):
+    if subida.estado != 'abierta':
+        raise UploadError('La subida ya no está abierta', status=409, offset=subida.recibido)
+    if offset != subida.recibido:
+        raise UploadError('Offset incorrecto', status=409, offset=subida.recibido)
+    if offset + length > subida.tamano:
+        raise UploadError('El fragmento excede el tamaño declarado', status=413, offset=subida.recibido)
+
+
+def append_chunk(subida_id, offset, stream, length):
+    """Append `length` bytes from `stream` at `offset`; return the new offset.
+
+    The body is first read into a file of its own without holding any lock,
+    so a slow client does not keep the SubidaFoto row locked. The row lock is
+    taken only to re-check the offset and move the chunk onto the end of the
+    upload; a chunk that lost the race to a concurrent PUT is discarded.
+    """
+    max_chunk = int(getattr(settings, 'CHUNKED_UPLOAD_MAX_CHUNK', 8 * 1024 * 1024))
+    if length is None or length <= 0:
+        raise UploadError('Content-Length requerido', status=411)
+    if length > max_chunk:
+        raise UploadError(f'El fragmento supera {max_chunk} bytes', status=413)
+
+    # fail fast, before reading the body, when the offset is already wrong
+    _check_offset(SubidaFoto.objects.get(pk=subida_id), offset, length)
+
+    fd, chunk_path = tempfile.mkstemp(dir=_upload_dir(), prefix=f'{subida_id}.', suffix='.chunk')
+    try:
+        written = 0
+        with os.fdopen(fd, 'wb') as fh:
+            while written < length:
+                data = stream.read(min(UPLOAD_READ_SIZE, length - written))
+                if not data:
+                    break
+                fh.write(data)
+                written += len(data)
+        if written != length:
+            subida = SubidaFoto.objects.get(pk=subida_id)
+            raise UploadError('Fragmento incompleto', status=400, offset=subida.recibido)
+
+        with transaction.atomic():
+            # the row lock serializes concurrent PUTs for the same session
+            subida = SubidaFoto.objects.select_for_update().get(pk=subida_id)
+            _check_offset(subida, offset, length)
+            path = temp_path(subida)
+            with open(path, 'r+b' if os.path.exists(path) else 'wb') as out, open(chunk_path, 'rb') as chunk:
+                # drop bytes of an earlier chunk that failed before being counted
+                out.truncate(subida.recibido)
+                out.seek(subida.recibido)
+                try:
+                    shutil.copyfileobj(chunk, out, UPLOAD_READ_SIZE)
+                except Exception:
+                    out.truncate(subida.recibido)
+                    raise
+            subida.recibido += written
+            subida.save(update_fields=['recibido', 'actualizado_en'])
+    finally:
+        os.unlink(chunk_path)
+    return subida.recibido
+
+
+def image_extension(path):
+    """Extension for the image at `path`, or UploadError(415) if it is not one."""
+    from PIL import Image
+
+    try:
+        with Image.open(path) as image:
+            fmt = image.format
+            image.verify()
+    except Exception:
+        raise UploadError('El archivo no es una imagen válida', status=415)
+    if fmt not in IMAGE_EXTENSIONS:
+        raise UploadError(f'Formato de imagen no admitido: {fmt}', status=415)
+    return IMAGE_EXTENSIONS[fmt]
+
+
+def finalize(subida_id):
+    """Attach the assembled file to its Task field; return the Task."""
+    with transaction.atomic():
+        subida = SubidaFoto.objects.select_for_update().select_related('task').get(pk=subida_id)
+        if subida.estado != 'abierta':
+            raise UploadError('La subida ya no está abierta', status=409, offset=subida.recibido)
+        if subida.recibido != subida.tamano:
+            raise UploadError('Faltan bytes por subir', status=409, offset=subida.recibido)
+
+        path = temp_path(subida)
+        if subida.sha256:
+            digest = hashlib.sha256()
+            with open(path, 'rb') as fh:
+                for block in iter(lambda: fh.read(UPLOAD_READ_SIZE), b''):
+                    digest.update(block)
+            if digest.hexdigest() != subida.sha256:
+                raise UploadError('sha256 no coincide', status=422)
+
+        # the stored name keeps the extension, so it must come from the content
+        stem = os.path.splitext(subida.nombre_archivo)[0] or 'foto'
+        nombre = f'{stem}{image_extension(path)}'
+
+        task = subida.task
+        with open(path, 'rb') as fh:
+            getattr(task, subida.campo).save(nombre, File(fh), save=False)
+        task.save(update_fields=[subida.campo])
+        subida.estado = 'completa'
+        subida.save(update_fields=['estado', 'actualizado_en'])
+        transaction.on_commit(lambda: _remove(path))
+    return task
+
+
+def cancel(subida_id):
+    subida = SubidaFoto.objects.get(pk=subida_id)
+    if subida.estado == 'abierta':
+        subida.estado = 'cancelada'
+        subida.save(update_fields=['estado', 'actualizado_en'])
+    _remove(temp_path(subida))
+    return subida
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        logger.exception('No se pudo borrar la subida temporal %s', path)
+
+
+def purge_stale(hours):
+    """Cancel open sessions idle for more than `hours` and drop their files."""
+    cutoff = timezone.now() - timedelta(hours=hours)
+    stale = list(SubidaFoto.objects.filter(estado='abierta', actualizado_en__lt=cutoff).values_list('pk', flat=True))
+    for pk in stale:
+        cancel(pk)
+    # chunks left behind by a worker that died while reading the body
+    directory = _upload_dir()
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.endswith('.chunk') and os.path.getmtime(path) < cutoff.timestamp():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+    return len(stale)
@@ -8,6 +8,12 @@ from .views import (
 )
 from .views import ubicacion_lookup
 from .views import ubicacion_detail
+from .views import ubicacion_wait
+from .views import ubicaciones_batch
+from .views import task_upload_open, upload_chunk, upload_finalize
+from .views import gpt_job_status
+from .views import geocode_cache_stats
+from .views import notification_metrics
 
 from .views import dashboard_overview, task_timeline
 
@@ -23,6 +29,7 @@ eventos_router.register(r'eventos', EventoView, basename='eventos')
 
 urlpatterns = [
     path('', include(router.urls)),  # Incluye las rutas del router principal
+    path('', include(eventos_router.urls)),
     path('health/', health, name='health'),
     path('tasks/<int:task_id>/events/', task_events, name='task_events'),  # Ruta personalizada para eventos de tareas
     path('tasks/<int:task_id>/compromisos/', task_compromisos, name='task_compromisos'),
@@ -36,9 +43,17 @@ urlpatterns = [
     path('docs/', include_docs_urls(title='Tasks API')),  # Documentación de la API
     path('gpt-response/', GPTResponseView.as_view(), name='gpt_response'),
     path('gpt-report/', ReportCreateView.as_view(), name='gpt-report'),
+    path('gpt-jobs/<uuid:job_id>/', gpt_job_status, name='gpt_job_status'),
     path('informe-gpt/<int:id>/', GPTReportDetailView.as_view(), name='gpt_report_detail'), 
     path('tasks/<int:pk>/delete-image/<str:image_field>/', delete_task_image, name='delete-task-image'),
+    path('tasks/<int:task_id>/uploads/', task_upload_open, name='task_upload_open'),
+    path('uploads/<uuid:upload_id>/', upload_chunk, name='upload_chunk'),
+    path('uploads/<uuid:upload_id>/finalize/', upload_finalize, name='upload_finalize'),
     path('empleado-detail/', empleado_detail, name='empleado_detail'),
+    path('ubicaciones/', ubicaciones_batch, name='ubicaciones_batch'),
     path('ubicaciones/lookup/', ubicacion_lookup, name='ubicacion_lookup'),
     path('ubicaciones/<int:pk>/', ubicacion_detail, name='ubicacion_detail'),
+    path('ubicaciones/<int:pk>/wait/', ubicacion_wait, name='ubicacion_wait'),
+    path('ubicaciones/geocode-cache/', geocode_cache_stats, name='geocode_cache_stats'),
+    path('notifications/metrics/', notification_metrics, name='notification_metrics'),
 ]
\ No newline at end of file
@@ -1,20 +1,25 @@
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.decorators import api_view, permission_classes
-from django.db import transaction
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.views import APIView
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate
 from django.shortcuts import get_object_or_404
 from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework.generics import RetrieveAPIView
+from datetime import datetime, time
+import json
 import logging
 import openai
-import json
 
-from .models import Task, Empleado, Evento, Report, Compromiso, Participante
+from .models import Task, Empleado, Evento, Report, Participante
 from .serializer import (
     TaskSerializer,
     EmpleadoSerializer,
@@ -23,9 +28,16 @@ from .serializer import (
     ReportSerializer,
 )
 from .notifications import send_notifications_for_event
-from .tasks import send_event_notifications
 from .serializer import ParticipanteSerializer
 from .serializer import UbicacionSerializer
+from .pagination import TaskCursorPagination
+from .eager_loading import EagerLoadingMixin, eager_load
+from .dashboard import get_dashboard_overview
+from .timeline import timeline_page
+from .participantes import ParticipantesError, split_participantes
+from .eventos import create_evento
+from . import task_map
+from . import gpt_jobs
 from django.views.decorators.csrf import csrf_exempt
 
 logger = logging.getLogger(__name__)
@@ -70,124 +82,40 @@ class ReportCreateView(APIView):
                         )
                         logger.info(f'Empleado auto-creado id={empleado.id} para user {request.user.username}')
 
-                    evento_descr = f"Seguimiento iniciado desde informe {report.id}"
-                    evento = Evento.objects.create(descripcion=evento_descr, reporte=related_task, empleado=empleado)
-                    logger.info(f"Evento de seguimiento creado (id={evento.id}) para tarea {related_task.id}")
-
-                    # If the request included participantes, create or link them and attach to the evento
-                    try:
-                        participantes_data = request.data.get('participantes')
-                        participantes_instances = []
-                        if participantes_data:
-                            # participantes_data may be a JSON string or a list
-                            if isinstance(participantes_data, str):
-                                try:
-                                    participantes_data = json.loads(participantes_data)
-                                except Exception:
-                                    participantes_data = None
-
-                            if isinstance(participantes_data, list):
-                                from .models import Participante
-                                for p in participantes_data:
-                                    if isinstance(p, dict):
-                                        pid = p.get('id')
-                                        if pid:
-                                            try:
-                                                part = Participante.objects.get(pk=pid)
-                                            except Participante.DoesNotExist:
-                                                part = None
-                                        else:
-                                            # create a new participante record
-                                            part = Participante.objects.create(
-                                                nombre=p.get('nombre', 'Sin nombre'),
-                                                rol=p.get('rol', 'Otro'),
-                                                organizacion=p.get('organizacion', ''),
-                                                email=p.get('email', ''),
-                                                celular=p.get('celular', ''),
-                                            )
-                                        if part:
-                                            participantes_instances.append(part)
-                                    else:
-                                        # assume it's an id
-                                        try:
-                                            part = Participante.objects.get(pk=int(p))
-                                            participantes_instances.append(part)
-                                        except Exception:
-                                            continue
-
-                        if participantes_instances:
-                            evento.participantes.set(participantes_instances)
-                    except Exception:
-                        logger.exception('Error procesando participantes inline para el evento')
-
-                    # Create a default compromiso 7 days in the future
-                    try:
-                        from datetime import timedelta, datetime
-                        fecha_compromiso = datetime.now() + timedelta(days=7)
-                        compromiso = Compromiso.objects.create(
-                            tarea=related_task,
-                            evento=evento,
-                            descripcion=f"Compromiso generado automáticamente tras registro de informe {report.id}",
-                            fecha_compromiso=fecha_compromiso,
-                            creado_por=empleado,
-                        )
-                        # attach same participantes to compromiso
-                        try:
-                            if participantes_instances:
-                                compromiso.participantes.set(participantes_instances)
-                        except Exception:
-                            logger.exception('No se pudo asignar participantes al compromiso')
-                        logger.info(f"Compromiso creado id={compromiso.id} para tarea {related_task.id}")
-                    except Exception as e:
-                        logger.exception(f"No se pudo crear compromiso automático: {e}")
-
-                    # Enqueue notifications (email/WhatsApp) for the created evento
-                    try:
-                        send_event_notifications.delay(evento.id, report.id)
-                    except Exception:
-                        logger.exception('Error encolando notificaciones tras crear evento desde informe')
+                    evento, compromiso = create_evento(
+                        task=related_task,
+                        empleado=empleado,
+                        descripcion=f"Seguimiento iniciado desde informe {report.id}",
+                        user=request.user,
+                        participantes=request.data.get('participantes'),
+                        report=report,
+                        compromiso_descripcion=f"Compromiso generado automáticamente tras registro de informe {report.id}",
+                    )
                 else:
                     logger.debug('Report has no related task; skipping seguimiento event creation')
             except Exception as e:
                 logger.error(f"No se pudo crear evento de seguimiento tras guardar report {report.id}: {e}")
         
-            # Construct the initial message for the GPT model
-            prompt = (
-                f"Generate a report with the following details:\n"
-                f"Title: {report.title}\n"
-                f"Description: {report.description}\n"
-                f"Fecha de Resolución: {report.fecha_resolucion.isoformat() if report.fecha_resolucion else 'No especificada'}\n"
-                f"URL de la Imagen Inicial: {report.foto_inicial_url if report.foto_inicial_url else 'No se proporcionó imagen'}\n"
-            )
-
+            # Generate the GPT report in the background; the response carries
+            # the job so the client can follow it on gpt-jobs/<id>/
+            payload = {"report": ReportSerializer(report).data}
             try:
-                # Retrieve the pre-defined assistant
-                assistant_id = "asst_dcExn8qhMa97OCBxqOOHxI4m"
-
-                # If we created an evento/compromiso above, include them in the response
-                try:
-                    from .serializer import EventoSerializer, CompromisoSerializer
-                    evento_ser = EventoSerializer(evento)
-                    compromiso_ser = CompromisoSerializer(compromiso)
-                    return Response(
-                        {
-                            "report": ReportSerializer(report).data,
-                            "evento": evento_ser.data,
-                            "compromiso": compromiso_ser.data,
-                        },
-                        status=status.HTTP_201_CREATED,
-                    )
-                except Exception:
-                    return Response(
-                        {"report": ReportSerializer(report).data},
-                        status=status.HTTP_201_CREATED,
-                    )
-
+                job = gpt_jobs.submit_for_report(report, usuario=request.user)
+                payload["gpt_job"] = gpt_jobs.job_payload(job)
             except Exception as e:
-                logger.error(f"Error en la solicitud al asistente: {e}")
-                return Response(
-                    {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
+                logger.error(f"No se pudo programar el informe GPT del report {report.id}: {e}")
+
+            # If we created an evento/compromiso above, include them in the response
+            try:
+                from .serializer import EventoSerializer, CompromisoSerializer
+                seguimiento = {
+                    "evento": EventoSerializer(evento).data,
+                    "compromiso": CompromisoSerializer(compromiso).data,
+                }
+                payload.update(seguimiento)
+            except Exception:
+                pass
+            return Response(payload, status=status.HTTP_201_CREATED)
 
         else:
             logger.error(f"Errores del serializador: {serializer.errors}")
@@ -236,10 +164,122 @@ class LoginView(APIView):
             {"error": "Credenciales inválidas"}, status=status.HTTP_400_BAD_REQUEST
         )
 
-class TaskView(viewsets.ModelViewSet):
+def _parse_task_list_filters(params):
+    """Translate TaskView list query params into ORM lookups.
+
+    Supported params: done, campus, prioridad, reportado_por, fecha_desde and
+    fecha_hasta (ISO date or datetime, applied to fecha_creacion). Returns a
+    (lookups, errors) tuple; errors maps param name to a message.
+    """
+    lookups = {}
+    errors = {}
+
+    done = params.get('done')
+    if done not in (None, ''):
+        value = str(done).strip().lower()
+        if value in ('1', 'true', 'si', 'sí'):
+            lookups['done'] = True
+        elif value in ('0', 'false', 'no'):
+            lookups['done'] = False
+        else:
+            errors['done'] = 'Valor inválido; use true o false'
+
+    campus = params.get('campus')
+    if campus not in (None, ''):
+        lookups['campus'] = campus.strip()
+
+    prioridad = params.get('prioridad')
+    if prioridad not in (None, ''):
+        if prioridad in dict(Task.PRIORIDAD_CHOICES):
+            lookups['prioridad'] = prioridad
+        else:
+            errors['prioridad'] = 'Prioridad inválida'
+
+    reportado_por = params.get('reportado_por')
+    if reportado_por not in (None, ''):
+        try:
+            lookups['reportado_por_id'] = int(reportado_por)
+        except (TypeError, ValueError):
+            errors['reportado_por'] = 'Debe ser un id numérico'
+
+    for param, lookup in (('fecha_desde', 'fecha_creacion__gte'), ('fecha_hasta', 'fecha_creacion__lte')):
+        raw = params.get(param)
+        if raw in (None, ''):
+            continue
+        try:
+            parsed = parse_datetime(raw)
+            if parsed is None:
+                day = parse_date(raw)
+                if day is not None:
+                    # a bare date covers the whole day
+                    parsed = datetime.combine(day, time.max if param == 'fecha_hasta' else time.min)
+        except ValueError:
+            # well formed but out of range, e.g. 2024-13-45 or 2024-02-30T10:00
+            parsed = None
+        if parsed is None:
+            errors[param] = 'Fecha inválida; use formato ISO 8601'
+            continue
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        lookups[lookup] = parsed
+
+    return lookups, errors
+
+
+class TaskView(EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     queryset = Task.objects.all()
     permission_classes = [IsAuthenticated]
+    pagination_class = TaskCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # parsed and validated once in list()
+            lookups = getattr(self, '_list_lookups', None)
+            if lookups is None:
+                lookups, _ = _parse_task_list_filters(self.request.query_params)
+            queryset = queryset.filter(**lookups)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        self._list_lookups, errors = _parse_task_list_filters(request.query_params)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'], url_path='map')
+    def map_clusters(self, request):
+        """Tasks inside a bounding box, clustered by zoom level.
+
+        Params: bbox=min_lon,min_lat,max_lon,max_lat, zoom (0-22) and the list
+        filters. Below TASK_MAP_DETAIL_ZOOM returns grid `clusters` (count,
+        centroid, abiertas/cerradas); at or above it returns individual
+        `tasks`, capped at TASK_MAP_MAX_POINTS.
+        """
+        lookups, errors = _parse_task_list_filters(request.query_params)
+        bbox, bbox_error = task_map.parse_bbox(request.query_params.get('bbox'))
+        if bbox_error:
+            errors['bbox'] = bbox_error
+        try:
+            zoom = int(request.query_params.get('zoom', ''))
+            if not 0 <= zoom <= task_map.MAX_ZOOM:
+                raise ValueError
+        except ValueError:
+            errors['zoom'] = f'zoom debe ser un entero entre 0 y {task_map.MAX_ZOOM}'
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Task.objects.filter(**lookups)
+        if zoom >= int(getattr(settings, 'TASK_MAP_DETAIL_ZOOM', 17)):
+            limit = int(getattr(settings, 'TASK_MAP_MAX_POINTS', 1000))
+            points, truncated = task_map.task_points(queryset, bbox, limit)
+            return Response({'zoom': zoom, 'tasks': points, 'truncated': truncated})
+        return Response({
+            'zoom': zoom,
+            'cell_deg': task_map.cell_degrees(zoom),
+            'clusters': task_map.cluster_tasks(queryset, bbox, zoom),
+        })
 
     def perform_update(self, serializer):
         instance = serializer.save()
@@ -253,111 +293,43 @@ class EmpleadoView(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
 
-class ParticipanteView(viewsets.ModelViewSet):
+class ParticipanteView(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Participante.objects.all()
     serializer_class = ParticipanteSerializer
     permission_classes = [IsAuthenticated]
 
-class EventoView(viewsets.ModelViewSet):
+class EventoView(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Evento.objects.all()
     serializer_class = EventoSerializer
     permission_classes = [IsAuthenticated]
 
     def perform_create(self, serializer):
-        instance = serializer.save()
-        # attach participantes if provided
-        try:
-            participantes_data = self.request.data.get('participantes')
-            participantes_instances = []
-            if participantes_data:
-                if isinstance(participantes_data, str):
-                    try:
-                        participantes_data = json.loads(participantes_data)
-                    except Exception:
-                        participantes_data = None
-
-                if isinstance(participantes_data, list):
-                    from .models import Participante
-                    for p in participantes_data:
-                        if isinstance(p, dict):
-                            pid = p.get('id')
-                            if pid:
-                                try:
-                                    part = Participante.objects.get(pk=pid)
-                                except Participante.DoesNotExist:
-                                    part = None
-                            else:
-                                part = Participante.objects.create(
-                                    nombre=p.get('nombre', 'Sin nombre'),
-                                    rol=p.get('rol', 'Otro'),
-                                    organizacion=p.get('organizacion', ''),
-                                    email=p.get('email', ''),
-                                    celular=p.get('celular', ''),
-                                )
-                            if part:
-                                participantes_instances.append(part)
-                        else:
-                            try:
-                                part = Participante.objects.get(pk=int(p))
-                                participantes_instances.append(part)
-                            except Exception:
-                                continue
-
-            if participantes_instances:
-                instance.participantes.set(participantes_instances)
-        except Exception:
-            logger.exception('Error procesando participantes inline en EventoView.perform_create')
-        # create compromiso 7 days ahead
-        try:
-            from datetime import datetime, timedelta
-            empleado = None
-            try:
-                empleado = Empleado.objects.get(user=self.request.user)
-            except Empleado.DoesNotExist:
-                empleado = None
-            fecha_compromiso = datetime.now() + timedelta(days=7)
-            compromiso = Compromiso.objects.create(
-                tarea=instance.reporte,
-                evento=instance,
-                descripcion=f"Compromiso automático tras registrar avance (evento {instance.id})",
-                fecha_compromiso=fecha_compromiso,
-                creado_por=empleado,
-            )
-            logger.info(f"Compromiso creado id={compromiso.id} para tarea {instance.reporte.id}")
-        except Exception:
-            logger.exception('Error creando compromiso automático en EventoView.perform_create')
-
-        try:
-            send_event_notifications.delay(instance.id, None)
-        except Exception:
-            logger.exception('Error encolando notificaciones desde EventoView.perform_create')
+        data = serializer.validated_data
+        serializer.instance, self._compromiso = create_evento(
+            task=data['reporte'],
+            empleado=data['empleado'],
+            descripcion=data['descripcion'],
+            user=self.request.user,
+            participantes=getattr(self, '_participantes_raw', None),
+            strict_participantes=True,
+        )
 
     def create(self, request, *args, **kwargs):
         try:
-            serializer = self.get_serializer(data=request.data)
+            data, self._participantes_raw = split_participantes(request.data)
+            serializer = self.get_serializer(data=data)
             serializer.is_valid(raise_exception=True)
-            instance = serializer.save()
-            # ensure perform_create logic runs
-            try:
-                self.perform_create(serializer)
-            except Exception:
-                logger.exception('Error en perform_create dentro de EventoView.create')
+            self.perform_create(serializer)
 
-            # build compromiso if created by perform_create
-            try:
-                from .serializer import EventoSerializer, CompromisoSerializer
-                evento_ser = EventoSerializer(instance)
-                # try to fetch a compromiso related to this evento
-                compromiso = instance.compromisos.first()
-                compromiso_ser = CompromisoSerializer(compromiso) if compromiso else None
-                payload = {"evento": evento_ser.data}
-                if compromiso_ser:
-                    payload["compromiso"] = compromiso_ser.data
-                headers = self.get_success_headers(serializer.data)
-                return Response(payload, status=status.HTTP_201_CREATED, headers=headers)
-            except Exception:
-                headers = self.get_success_headers(serializer.data)
-                return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+            from .serializer import CompromisoSerializer
+            payload = {
+                "evento": serializer.data,
+                "compromiso": CompromisoSerializer(self._compromiso).data,
+            }
+            headers = self.get_success_headers(serializer.data)
+            return Response(payload, status=status.HTTP_201_CREATED, headers=headers)
+        except ParticipantesError as e:
+            return Response({"participantes": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception('Unhandled exception in EventoView.create')
             return Response({"error": "Internal server error", "detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -373,97 +345,32 @@ def task_events(request, task_id):
         )
 
     if request.method == "GET":
-        events = task.eventos.all()
+        events = eager_load(task.eventos.all(), EventoSerializer)
         serializer = EventoSerializer(events, many=True)
         return Response(serializer.data)
     elif request.method == "POST":
         try:
-            serializer = EventoSerializer(data=request.data)
+            data, participantes_raw = split_participantes(request.data)
+            serializer = EventoSerializer(data=data)
             if serializer.is_valid():
-                event = serializer.save(reporte=task)
-                # If participantes were included in the request, attach/create them
-                try:
-                    participantes_data = request.data.get('participantes')
-                    participantes_instances = []
-                    if participantes_data:
-                        if isinstance(participantes_data, str):
-                            try:
-                                participantes_data = json.loads(participantes_data)
-                            except Exception:
-                                participantes_data = None
-
-                        if isinstance(participantes_data, list):
-                            from .models import Participante
-                            for p in participantes_data:
-                                if isinstance(p, dict):
-                                    pid = p.get('id')
-                                    if pid:
-                                        try:
-                                            part = Participante.objects.get(pk=pid)
-                                        except Participante.DoesNotExist:
-                                            part = None
-                                    else:
-                                        part = Participante.objects.create(
-                                            nombre=p.get('nombre', 'Sin nombre'),
-                                            rol=p.get('rol', 'Otro'),
-                                            organizacion=p.get('organizacion', ''),
-                                            email=p.get('email', ''),
-                                            celular=p.get('celular', ''),
-                                        )
-                                    if part:
-                                        participantes_instances.append(part)
-                                else:
-                                    try:
-                                        part = Participante.objects.get(pk=int(p))
-                                        participantes_instances.append(part)
-                                    except Exception:
-                                        continue
-
-                    if participantes_instances:
-                        event.participantes.set(participantes_instances)
-                except Exception:
-                    logger.exception('Error procesando participantes inline en task_events POST')
-                # create a compromiso 7 days ahead
-                compromiso = None
-                try:
-                    from datetime import datetime, timedelta
-                    empleado = None
-                    try:
-                        empleado = Empleado.objects.get(user=request.user)
-                    except Empleado.DoesNotExist:
-                        empleado = None
-                    fecha_compromiso = datetime.now() + timedelta(days=7)
-                    compromiso = Compromiso.objects.create(
-                        tarea=task,
-                        evento=event,
-                        descripcion=f"Compromiso automático tras registrar avance (evento {event.id})",
-                        fecha_compromiso=fecha_compromiso,
-                        creado_por=empleado,
-                    )
-                    logger.info(f"Compromiso creado id={compromiso.id} para tarea {task.id}")
-                except Exception:
-                    logger.exception('Error creando compromiso automático en task_events POST')
-
-                # send notifications asynchronously
-                try:
-                    send_event_notifications.delay(event.id, None)
-                except Exception:
-                    logger.exception('Error encolando notificaciones tras crear evento')
-
-                try:
-                    from .serializer import EventoSerializer, CompromisoSerializer
-                    evento_ser = EventoSerializer(event)
-                    payload = {"evento": evento_ser.data}
-                    if compromiso is not None:
-                        try:
-                            compromiso_ser = CompromisoSerializer(compromiso)
-                            payload["compromiso"] = compromiso_ser.data
-                        except Exception:
-                            logger.exception('Error serializing compromiso in task_events POST')
-                    return Response(payload, status=status.HTTP_201_CREATED)
-                except Exception:
-                    return Response(serializer.data, status=status.HTTP_201_CREATED)
+                event, compromiso = create_evento(
+                    task=task,
+                    empleado=serializer.validated_data['empleado'],
+                    descripcion=serializer.validated_data['descripcion'],
+                    user=request.user,
+                    participantes=participantes_raw,
+                    strict_participantes=True,
+                )
+
+                from .serializer import CompromisoSerializer
+                payload = {
+                    "evento": EventoSerializer(event).data,
+                    "compromiso": CompromisoSerializer(compromiso).data,
+                }
+                return Response(payload, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except ParticipantesError as e:
+            return Response({"participantes": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception('Unhandled exception in task_events POST')
             return Response({"error": "Internal server error", "detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -480,7 +387,7 @@ def task_compromisos(request, task_id):
     from .serializer import CompromisoSerializer
 
     if request.method == "GET":
-        compromisos = task.compromisos.all()
+        compromisos = eager_load(task.compromisos.all(), CompromisoSerializer)
         serializer = CompromisoSerializer(compromisos, many=True)
         return Response(serializer.data)
     else:
@@ -519,38 +426,12 @@ def dashboard_overview(request):
     - closed_tasks
     - upcoming_compromisos (next 7 days)
     - recent_eventos (last 20)
-    """
-    from django.utils import timezone
-    from datetime import timedelta
-
-    now = timezone.now()
-    next_week = now + timedelta(days=7)
-
-    total_tasks = Task.objects.count()
-    open_tasks = Task.objects.filter(done=False).count()
-    closed_tasks = Task.objects.filter(done=True).count()
-
-    upcoming_compromisos_qs = Compromiso.objects.filter(fecha_compromiso__gte=now, fecha_compromiso__lte=next_week).order_by('fecha_compromiso')[:50]
-    upcoming_compromisos = []
-    for c in upcoming_compromisos_qs:
-        upcoming_compromisos.append({
-            'id': c.id,
-            'tarea': c.tarea.id if c.tarea else None,
-            'descripcion': c.descripcion,
-            'fecha_compromiso': c.fecha_compromiso,
-        })
+    - por_campus (open/closed/by-priority counters from CampusStats)
 
-    recent_eventos_qs = Evento.objects.all().order_by('-fecha')[:20]
-    recent_eventos = EventoSerializer(recent_eventos_qs, many=True).data
-
-    payload = {
-        'total_tasks': total_tasks,
-        'open_tasks': open_tasks,
-        'closed_tasks': closed_tasks,
-        'upcoming_compromisos': upcoming_compromisos,
-        'recent_eventos': recent_eventos,
-    }
-    return Response(payload)
+    The payload is shared by all supervisors and served from the cache; see
+    `tasks.dashboard`.
+    """
+    return Response(get_dashboard_overview())
 
 
 @api_view(["GET"])
@@ -559,47 +440,87 @@ def task_timeline(request, task_id):
     """Return a timeline (events + compromisos) for a given task.
 
     The response is ordered chronologically and suitable for a timeline UI.
+    Query params: `limit` (page size, default 100, max 500) and `cursor`
+    (the `next` value of the previous page).
     """
-    try:
-        task = Task.objects.get(pk=task_id)
-    except Task.DoesNotExist:
+    if not Task.objects.filter(pk=task_id).exists():
         return Response({'error': 'Tarea no encontrada'}, status=status.HTTP_404_NOT_FOUND)
 
-    eventos = Evento.objects.filter(reporte=task).order_by('fecha')
-    compromisos = Compromiso.objects.filter(tarea=task).order_by('fecha_compromiso')
-
-    eventos_ser = EventoSerializer(eventos, many=True).data
-    compromisos_ser = []
-    for c in compromisos:
-        compromisos_ser.append({
-            'id': c.id,
-            'descripcion': c.descripcion,
-            'fecha_compromiso': c.fecha_compromiso,
-            'creado_por': c.creado_por.id if c.creado_por else None,
-            'participantes': [p.id for p in c.participantes.all()],
-        })
+    try:
+        limit = min(max(int(request.query_params.get('limit', 100)), 1), 500)
+    except (TypeError, ValueError):
+        return Response({'error': 'limit debe ser un número'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Merge and sort by date to create a timeline
-    timeline_items = []
-    for e in eventos_ser:
-        timeline_items.append({
-            'type': 'evento',
-            'date': e.get('fecha'),
-            'data': e,
-        })
-    for c in compromisos_ser:
-        timeline_items.append({
-            'type': 'compromiso',
-            'date': c.get('fecha_compromiso'),
-            'data': c,
-        })
+    try:
+        items, next_cursor = timeline_page(task_id, cursor=request.query_params.get('cursor'), limit=limit)
+    except ValueError:
+        return Response({'error': 'cursor inválido'}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({'timeline': items, 'next': next_cursor})
+
+def _sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets `Accept: text/event-stream` pass content negotiation.
+
+    Streamed answers bypass renderers; plain responses (e.g. a 400) are
+    sent as a single `error` event.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
 
-    # sort by date (None values will be pushed to the end)
-    timeline_items.sort(key=lambda it: it.get('date') or '')
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return _sse_event('error', data).encode('utf-8')
 
-    return Response({'timeline': timeline_items})
 
 class GPTResponseView(APIView):
+    """Queue a GPT answer for `prompt` and return the job to follow.
+
+    Answers already produced for the same prompt come back at once (200);
+    otherwise the job is generated by a Celery worker (202) and its status
+    is available on gpt-jobs/<id>/.
+
+    With `"stream": true` (or `Accept: text/event-stream`) the answer is
+    generated in the request and sent as Server-Sent Events instead: one
+    `token` event per piece as the model produces it, then `done` with the
+    job id, or `error`.
+    """
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer]
+
+    def _wants_stream(self, request):
+        flag = request.data.get("stream")
+        if isinstance(flag, str):
+            flag = flag.strip().lower() in ("1", "true", "si", "sí")
+        return bool(flag) or 'text/event-stream' in request.headers.get('Accept', '')
+
+    def _stream(self, prompt, usuario):
+        def events():
+            generation = gpt_jobs.stream(prompt, usuario=usuario)
+            try:
+                for kind, value in generation:
+                    if kind == 'token':
+                        yield _sse_event('token', {'token': value})
+                    elif kind == 'done':
+                        yield _sse_event('done', {'id': str(value.pk), 'desde_cache': value.desde_cache})
+                    else:
+                        yield _sse_event('error', {'error': value})
+            except Exception as e:
+                logger.error(f"Error en la consulta al GPT: {e}")
+                yield _sse_event('error', {'error': str(e)})
+            finally:
+                # the server closes this generator when the client goes away;
+                # close the generation too so its GPTJob is marked cancelado
+                generation.close()
+
+        response = StreamingHttpResponse(events(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # ask nginx not to buffer, so each token reaches the client immediately
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
     def post(self, request, *args, **kwargs):
         prompt = request.data.get("prompt")
 
@@ -608,26 +529,39 @@ class GPTResponseView(APIView):
                 {"error": "El prompt es requerido."}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            response = openai.Completion.create(
-                model="gpt-3.5-turbo", prompt=prompt, max_tokens=150, temperature=0.7
-            )
-
-            if response and "choices" in response and len(response["choices"]) > 0:
-                gpt_response = response["choices"][0]["text"].strip()
-                return Response({"response": gpt_response}, status=status.HTTP_200_OK)
-            else:
-                return Response(
-                    {"error": "Formato de respuesta inválido del GPT"},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                )
+        if self._wants_stream(request):
+            return self._stream(prompt, request.user if request.user.is_authenticated else None)
 
+        try:
+            job = gpt_jobs.submit(prompt, usuario=request.user if request.user.is_authenticated else None)
         except Exception as e:
-            logger.error(f"Error en la consulta al GPT: {e}")
+            logger.error(f"Error programando la consulta al GPT: {e}")
             return Response(
                 {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+        payload = gpt_jobs.job_payload(job)
+        if job.estado == 'completo':
+            payload["response"] = job.resultado
+            return Response(payload, status=status.HTTP_200_OK)
+        return Response(payload, status=status.HTTP_202_ACCEPTED, headers={"Location": payload["status_url"]})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def gpt_job_status(request, job_id):
+    """Status and, once complete, the answer of a GPT job (owner or superuser only)."""
+    from .models import GPTJob
+
+    jobs = GPTJob.objects.filter(pk=job_id)
+    if not request.user.is_superuser:
+        jobs = jobs.filter(usuario=request.user)
+    job = jobs.first()
+    if job is None:
+        return Response({'error': 'Trabajo no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(gpt_jobs.job_payload(job))
+
+
 class GPTReportDetailView(RetrieveAPIView):
     queryset = Report.objects.all()
     serializer_class = ReportSerializer
@@ -640,11 +574,110 @@ def delete_task_image(request, pk, image_field):
     except Task.DoesNotExist:
         return Response(status=status.HTTP_404_NOT_FOUND)
     
-    if image_field == 'foto_final':
-        task.foto_final.delete()
+    if image_field not in ('foto_inicial', 'foto_final'):
+        return Response({'error': 'Campo de imagen inválido'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Clear the reference only; the shared file is unlinked once no task
+    # field points at it any more (see tasks/storage.py)
+    if getattr(task, image_field):
+        setattr(task, image_field, None)
+        task.save(update_fields=[image_field])
     
     return Response(status=status.HTTP_204_NO_CONTENT)
 
+def _upload_response(subida, status_code=status.HTTP_200_OK):
+    data = {
+        'id': str(subida.id),
+        'task': subida.task_id,
+        'campo': subida.campo,
+        'tamano': subida.tamano,
+        'offset': subida.recibido,
+        'estado': subida.estado,
+        'upload_url': f'/api/v1/uploads/{subida.id}/',
+    }
+    return Response(data, status=status_code, headers={'Upload-Offset': str(subida.recibido)})
+
+
+def _get_subida(request, upload_id):
+    from .models import SubidaFoto
+
+    subida = SubidaFoto.objects.filter(pk=upload_id).first()
+    if subida is None or not (request.user.is_superuser or subida.usuario_id == request.user.id):
+        return None
+    return subida
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def task_upload_open(request, task_id):
+    """Open a resumable chunked upload for a Task photo (see tasks/uploads.py)."""
+    from . import uploads
+
+    try:
+        task = Task.objects.get(pk=task_id)
+    except Task.DoesNotExist:
+        return Response({'error': 'Tarea no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        subida = uploads.open_upload(
+            task=task,
+            campo=request.data.get('campo'),
+            nombre=request.data.get('nombre'),
+            tamano=request.data.get('tamano'),
+            sha256=request.data.get('sha256', ''),
+            usuario=request.user,
+        )
+    except uploads.UploadError as exc:
+        return Response({'error': str(exc), **exc.extra}, status=exc.status)
+    return _upload_response(subida, status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'PUT', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def upload_chunk(request, upload_id):
+    """GET: current offset; PUT ?offset=N: append the raw body; DELETE: cancel."""
+    from . import uploads
+
+    subida = _get_subida(request, upload_id)
+    if subida is None:
+        return Response({'error': 'Subida no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+    if request.method == 'GET':
+        return _upload_response(subida)
+    if request.method == 'DELETE':
+        uploads.cancel(subida.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    raw_offset = request.query_params.get('offset', request.headers.get('Upload-Offset'))
+    try:
+        offset = int(raw_offset)
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except (TypeError, ValueError):
+        return Response({'error': 'offset debe ser un entero', 'offset': subida.recibido},
+                        status=status.HTTP_400_BAD_REQUEST)
+    try:
+        # read the body as a stream; request.data would buffer it
+        uploads.append_chunk(subida.pk, offset, request.stream, length)
+    except uploads.UploadError as exc:
+        return Response({'error': str(exc), **exc.extra}, status=exc.status)
+    subida.refresh_from_db()
+    return _upload_response(subida)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_finalize(request, upload_id):
+    """Attach a fully received upload to its Task field and return the Task."""
+    from . import uploads
+
+    subida = _get_subida(request, upload_id)
+    if subida is None:
+        return Response({'error': 'Subida no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        task = uploads.finalize(subida.pk)
+    except uploads.UploadError as exc:
+        return Response({'error': str(exc), **exc.extra}, status=exc.status)
+    return Response(TaskSerializer(task, context={'request': request}).data)
+
+
 @api_view(['GET'])
 def empleado_detail(request):
     try:
@@ -660,14 +693,21 @@ def empleado_detail(request):
 def ubicacion_lookup(request):
     """Create an Ubicacion from coordinates and schedule a reverse-geocode job.
 
-    POST payload: { lat: number, lon: number, nombre: string }
+    POST payload: { lat: number, lon: number, nombre: string, nombre_explicito: bool }
 
     Behavior:
-    - nombre is required.
-    - always create a new Ubicacion with status='pending'.
+    - nombre is required. It is a provisional label that the reverse-geocoded
+      name replaces, unless nombre_explicito is true: then it is kept as-is
+      and the Ubicacion is created ready without geocoding.
+    - if a ready Ubicacion with a geocoded name lies within
+      UBICACION_REUSE_RADIUS_M, or the geocode cache has an entry for the
+      coordinates' grid cell, create the Ubicacion as ready with that name and
+      return 201 right away.
+    - otherwise create a new Ubicacion with status='pending'.
     - schedule `reverse_geocode_and_update` after DB commit (transaction.on_commit).
     - if the background work runs synchronously (CELERY_TASK_ALWAYS_EAGER), return 201 when ready.
-    - otherwise return 202 Accepted and a Location header pointing to the detail endpoint.
+    - otherwise return 202 Accepted and a Location header pointing to the detail endpoint;
+      clients wait for the result on `ubicaciones/<pk>/wait/` instead of polling it.
     """
     try:
         data = request.data
@@ -684,11 +724,45 @@ def ubicacion_lookup(request):
         except Exception:
             return Response({'error': 'lat y lon deben ser números'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if not nombre or str(nombre).strip() == "":
-            return Response({'error': 'nombre es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(nombre, str) or not nombre.strip():
+            return Response({'error': 'nombre es requerido y debe ser texto'}, status=status.HTTP_400_BAD_REQUEST)
 
         from .models import Ubicacion
-        from .tasks import reverse_geocode_and_update
+        from . import geocode_cache
+        from .spatial import nearest_ready_ubicacion
+
+        if str(data.get('nombre_explicito', '')).lower() in ('1', 'true'):
+            # the user chose this name; nothing may replace it
+            try:
+                new_loc = Ubicacion.objects.create(nombre=nombre.strip(), lat=lat_f, lon=lon_f, status='ready')
+            except Exception:
+                logger.exception('Error creando Ubicacion')
+                return Response({'error': 'No se pudo crear ubicación'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return Response(UbicacionSerializer(new_loc).data, status=status.HTTP_201_CREATED)
+
+        # A ready location a few metres away, or a cached reverse-geocode for
+        # this grid cell, resolves the name now without an external call
+        cached_nombre = None
+        try:
+            nearby = nearest_ready_ubicacion(lat_f, lon_f)
+            if nearby is not None:
+                cached_nombre = nearby.nombre
+        except Exception:
+            logger.exception('Error buscando ubicaciones cercanas')
+        if not cached_nombre:
+            try:
+                cached_nombre = geocode_cache.lookup(lat_f, lon_f)
+            except Exception:
+                logger.exception('Error consultando la caché de geocodificación')
+        if cached_nombre:
+            try:
+                new_loc = Ubicacion.objects.create(
+                    nombre=cached_nombre, nombre_geocodificado=True, lat=lat_f, lon=lon_f, status='ready',
+                )
+            except Exception:
+                logger.exception('Error creando Ubicacion')
+                return Response({'error': 'No se pudo crear ubicación'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return Response(UbicacionSerializer(new_loc).data, status=status.HTTP_201_CREATED)
 
         try:
             # create as pending; reverse-geocode will refine the name/status
@@ -697,21 +771,8 @@ def ubicacion_lookup(request):
             logger.exception('Error creando Ubicacion')
             return Response({'error': 'No se pudo crear ubicación'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        # Enqueue the reverse-geocode only after the DB transaction commits
-        try:
-            def _enqueue():
-                try:
-                    # If tests or local config use eager execution, run synchronously
-                    if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False):
-                        reverse_geocode_and_update(new_loc.id)
-                    else:
-                        reverse_geocode_and_update.delay(new_loc.id)
-                except Exception:
-                    logger.exception('Error encolando reverse_geocode task')
-
-            transaction.on_commit(_enqueue)
-        except Exception:
-            logger.exception('Error programando encolado post-commit')
+        # The post_save receiver schedules the reverse-geocode once the
+        # transaction commits; asking again here only counted as suppressed
 
         # If the task was executed eagerly it may already be ready in DB; refresh
         try:
@@ -745,6 +806,148 @@ def ubicacion_detail(request, pk):
     return Response(serializer.data)
 
 
+def _parse_ubicacion_ids(raw):
+    """Normalize ids from '1,2,3', ['1', '2'] or [1, 2]; return (ids, error)."""
+    if isinstance(raw, (list, tuple)):
+        parts = []
+        for item in raw:
+            parts.extend(str(item).split(','))
+    else:
+        parts = str(raw or '').split(',')
+    ids = []
+    for part in parts:
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            pk = int(part)
+        except ValueError:
+            return None, f'id inválido: {part}'
+        if pk not in ids:
+            ids.append(pk)
+    return ids, None
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def ubicaciones_batch(request):
+    """Return many Ubicaciones in one query.
+
+    GET ?ids=1,2,3 (or repeated ids=), or POST {"ids": [...]} for long lists.
+    Rows come back in the requested order; unknown ids are listed in
+    `missing`. The response carries a strong ETag (If-None-Match gets a 304)
+    and, when every row is ready, a long private max-age since ready
+    locations no longer change.
+    """
+    import hashlib
+    from django.utils.cache import patch_cache_control
+    from django.utils.http import quote_etag
+    from .models import Ubicacion
+
+    if request.method == 'POST':
+        raw = request.data.get('ids') if hasattr(request.data, 'get') else None
+    else:
+        raw = request.query_params.getlist('ids')
+    ids, error = _parse_ubicacion_ids(raw)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    if not ids:
+        return Response({'error': 'ids es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+    max_ids = int(getattr(settings, 'UBICACIONES_BATCH_MAX', 500))
+    if len(ids) > max_ids:
+        return Response({'error': f'máximo {max_ids} ids por petición'}, status=status.HTTP_400_BAD_REQUEST)
+
+    found = Ubicacion.objects.in_bulk(ids)
+    results = UbicacionSerializer([found[pk] for pk in ids if pk in found], many=True).data
+    data = {'results': results, 'missing': [pk for pk in ids if pk not in found]}
+
+    digest = hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    etag = quote_etag(digest[:32])
+    if all(row['status'] == 'ready' for row in results) and not data['missing']:
+        cache_control = {'private': True, 'max_age': int(getattr(settings, 'UBICACIONES_READY_MAX_AGE', 86400))}
+    else:
+        cache_control = {'private': True, 'no_cache': True}
+
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in [tag.strip() for tag in if_none_match.split(',')]:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    patch_cache_control(response, **cache_control)
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def ubicacion_wait(request, pk):
+    """Long-poll a Ubicacion until it leaves pending/processing.
+
+    Responds as soon as the background geocode publishes the new state, or
+    after `timeout` seconds (default UBICACION_WAIT_TIMEOUT) with the current
+    one; the client repeats the request while `status` is still pending.
+    Replaces repeated ubicacion_detail polling with one open request.
+
+    Each open wait holds a worker thread, so the web process must run a
+    threaded worker class (see Procfile). With a pub/sub backend that cannot
+    hear other processes (InProcessPubSub) the wait is capped at
+    UBICACION_WAIT_LOCAL_TIMEOUT and the client simply re-polls.
+    """
+    from .models import Ubicacion
+    from .pubsub import get_pubsub, ubicacion_channel
+
+    default_timeout = float(getattr(settings, 'UBICACION_WAIT_TIMEOUT', 25))
+    try:
+        timeout = float(request.query_params.get('timeout', default_timeout))
+    except (TypeError, ValueError):
+        return Response({'error': 'timeout debe ser un número'}, status=status.HTTP_400_BAD_REQUEST)
+    timeout = min(max(timeout, 0), default_timeout)
+
+    pubsub = get_pubsub()
+    if not getattr(pubsub, 'cross_process', False):
+        # a Celery worker's publish would never reach this process
+        timeout = min(timeout, float(getattr(settings, 'UBICACION_WAIT_LOCAL_TIMEOUT', 2)))
+
+    # subscribe before reading so a publish in between is not missed
+    with pubsub.subscribe(ubicacion_channel(pk)) as subscription:
+        try:
+            u = Ubicacion.objects.get(pk=pk)
+        except Ubicacion.DoesNotExist:
+            return Response({'error': 'Ubicación no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+        if u.status in ('pending', 'processing') and timeout:
+            message = subscription.get(timeout)
+            if message is not None:
+                return Response(message)
+    return Response(UbicacionSerializer(u).data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def geocode_cache_stats(request):
+    """Return reverse-geocode cache counters and job enqueue/suppression counts."""
+    from . import geocode_cache, geocode_queue
+    data = geocode_cache.stats()
+    data['jobs'] = geocode_queue.stats()
+    return Response(data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def notification_metrics(request):
+    """Per-channel notification volume, p95 send latency and failure rate.
+
+    ?minutes= sets the window (default 60, at most 7 days).
+    """
+    from . import deliveries
+    try:
+        minutes = int(request.query_params.get('minutes', 60))
+    except (TypeError, ValueError):
+        return Response({'error': 'minutes debe ser un entero'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= minutes <= 7 * 24 * 60:
+        return Response({'error': 'minutes debe estar entre 1 y 10080'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(deliveries.summary(minutes))
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def health(request):
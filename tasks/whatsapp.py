@@ -0,0 +1,104 @@
+"""WhatsApp senders used by event notifications.
+
+The backend is chosen with the WHATSAPP_BACKEND setting (dotted path):
+
+- TwilioWhatsApp (default): Twilio Messages API. One `twilio.rest.Client`
+  (and with it one pooled HTTP session) is built per process and shared by
+  every send, including concurrent ones from the dispatcher's thread pool.
+- FakeWhatsApp: records messages in memory (`outbox`), optionally after a
+  delay; for development and tests.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class WhatsAppError(Exception):
+    """The message could not be sent."""
+
+
+class BaseWhatsApp:
+    def send(self, to_number, body):
+        """Send body to an E.164 number; return the provider message id."""
+        raise NotImplementedError
+
+
+class TwilioWhatsApp(BaseWhatsApp):
+    def __init__(self):
+        self.account_sid = getattr(settings, 'TWILIO_ACCOUNT_SID', None)
+        self.auth_token = getattr(settings, 'TWILIO_AUTH_TOKEN', None)
+        self.whatsapp_from = getattr(settings, 'TWILIO_WHATSAPP_FROM', None)
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def configured(self):
+        return bool(self.account_sid and self.auth_token and self.whatsapp_from)
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                from twilio.rest import Client
+
+                self._client = Client(self.account_sid, self.auth_token)
+            return self._client
+
+    def send(self, to_number, body):
+        if not self.configured:
+            raise WhatsAppError('Twilio no configurado')
+        try:
+            message = self._get_client().messages.create(
+                body=body,
+                from_=f'whatsapp:{self.whatsapp_from}',
+                to=f'whatsapp:{to_number}',
+            )
+        except Exception as exc:
+            raise WhatsAppError(str(exc)) from exc
+        return message.sid
+
+
+class FakeWhatsApp(BaseWhatsApp):
+    """In-memory sender. `delay` simulates network latency in seconds;
+    numbers listed in `failing` raise WhatsAppError."""
+
+    def __init__(self, delay=None, failing=()):
+        self.delay = float(getattr(settings, 'WHATSAPP_FAKE_DELAY', 0) if delay is None else delay)
+        self.failing = set(failing)
+        self.outbox = []
+        self._lock = threading.Lock()
+
+    def send(self, to_number, body):
+        if self.delay:
+            time.sleep(self.delay)
+        if to_number in self.failing:
+            raise WhatsAppError(f'Número rechazado: {to_number}')
+        with self._lock:
+            self.outbox.append({'to': to_number, 'body': body})
+            return f'fake-{len(self.outbox)}'
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_whatsapp():
+    """Return the process-wide sender configured by WHATSAPP_BACKEND."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = import_string(getattr(settings, 'WHATSAPP_BACKEND', 'tasks.whatsapp.TwilioWhatsApp'))()
+        return _backend
+
+
+@receiver(setting_changed)
+def _reset_backend(setting, **kwargs):
+    global _backend
+    if setting.startswith('WHATSAPP_') or setting.startswith('TWILIO_'):
+        _backend = None